@@ -1,23 +1,22 @@
 #!/usr/bin/env python3
 """Optimization utility for DOOMED BY PYTHON."""
 
-import json
 import os
 import sys
-from pathlib import Path
+
+from src.config_store import config_path, read_config, write_json_atomic
 
 def optimize_config():
     """Apply performance optimizations to config.json."""
-    config_path = Path("config.json")
+    path = config_path()
     
     # Load existing config or create new one
-    if config_path.exists():
-        with open(config_path, 'r') as f:
-            config = json.load(f)
-        print("✓ Loaded existing config.json")
+    config = read_config()
+    if config is not None:
+        print(f"✓ Loaded existing {path}")
     else:
         config = {}
-        print("✓ Creating new config.json")
+        print(f"✓ Creating new {path}")
     
     # Apply performance optimizations
     optimizations = {
@@ -32,10 +31,9 @@ def optimize_config():
         print(f"  {key}: {old_value} → {value}")
     
     # Save optimized config
-    with open(config_path, 'w') as f:
-        json.dump(config, f, indent=2)
+    write_json_atomic(path, config)
     
-    print(f"\n✓ Optimized config saved to {config_path}")
+    print(f"\n✓ Optimized config saved to {path}")
 
 def set_env_vars():
     """Show environment variables for maximum performance."""
@@ -0,0 +1,244 @@
+"""Batch timedemo benchmarks over ports, mod sets and options.
+
+A spec file describes the matrix::
+
+    {
+      "demo": "demo1",
+      "runs": 5,
+      "jobs": 1,
+      "ports": ["/usr/bin/gzdoom", "~/builds/gzdoom-dev/gzdoom"],
+      "sets": [{"name": "doom2", "iwad": "DOOM2.WAD"},
+               {"name": "sigil", "iwad": "DOOM.WAD", "pwads": ["SIGIL.WAD"]}],
+      "options": ["+vid_rendermode 4", "+vid_rendermode 1"]
+    }
+
+Every port x set x options cell is run ``runs`` times with the same
+argument assembly as the launcher (:class:`src.profiles.LaunchProfile`)
+plus ``-timedemo <demo>``. At most ``jobs`` ports run at once; keep it
+at 1 unless the machine has cores to spare, or runs skew each other.
+The ``timed N gametics in M realtics`` line is parsed from the output.
+
+A port may be given as a list, program first, to run a script; the
+built-in stand-in port prints a plausible result without a game::
+
+    "ports": [["python3", "-m", "src.benchmark", "--fake-port"]]
+
+Usage: python -m src.benchmark <spec.json> [--json out.json]
+       [--csv summary.csv] [--runs-csv runs.csv]
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import re
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from src.profiles import LaunchProfile
+
+TICRATE = 35
+RUN_TIMEOUT = 600
+
+# Vanilla/ZDoom: "timed 2134 gametics in 1000 realtics (74.7 fps)";
+# PrBoom+: "Timed 2134 gametics in 1000 realtics = 74.7 frames per second"
+TIMEDEMO = re.compile(
+    r'timed\s+(\d+)\s+gametics\s+in\s+(\d+)\s+realtics'
+    r'(?:[^\n\d]*([\d.]+)\s*(?:fps|frames per second))?',
+    re.IGNORECASE)
+
+RUN_FIELDS = ('run', 'port', 'set', 'options', 'exit_code', 'seconds',
+              'gametics', 'realtics', 'fps', 'error')
+SUMMARY_FIELDS = ('port', 'set', 'options', 'runs', 'failed', 'fps_mean',
+                  'fps_stdev', 'fps_variance', 'fps_cv', 'fps_min', 'fps_max',
+                  'seconds_mean')
+
+
+def parse_timedemo(output: str) -> Optional[Dict[str, float]]:
+    """Return ``{gametics, realtics, fps}`` from the last timedemo line."""
+    matches = TIMEDEMO.findall(output)
+    if not matches:
+        return None
+    gametics, realtics, fps = matches[-1]
+    gametics, realtics = int(gametics), int(realtics)
+    if fps:
+        fps = float(fps)
+    else:
+        fps = gametics * TICRATE / realtics if realtics else 0.0
+    return {'gametics': gametics, 'realtics': realtics, 'fps': fps}
+
+
+def _port_command(port) -> List[str]:
+    if isinstance(port, str):
+        return [os.path.expanduser(port)]
+    return [os.path.expanduser(part) for part in port]
+
+
+def _label(port) -> str:
+    return port if isinstance(port, str) else ' '.join(port)
+
+
+def build_matrix(spec: dict) -> List[dict]:
+    """Expand a spec into one cell per port x set x options."""
+    cells = []
+    for port in spec['ports']:
+        for mods in spec['sets']:
+            for options in spec.get('options') or ['']:
+                cells.append({'port': port, 'set': mods, 'options': options})
+    return cells
+
+
+def run_once(cell: dict, demo: str, flag: str = '-timedemo',
+             timeout: float = RUN_TIMEOUT) -> dict:
+    """Run one timedemo and return its result record."""
+    mods = cell['set']
+    command = _port_command(cell['port'])
+    profile = LaunchProfile(
+        mods.get('name', ''), command[0],
+        os.path.expanduser(mods.get('iwad', '')),
+        [os.path.expanduser(p) for p in mods.get('pwads', ())],
+        f"{cell['options']} {flag} {demo}".strip(), mods.get('env'))
+    launch = profile.compile()
+    record = {'port': _label(cell['port']), 'set': mods.get('name') or mods.get('iwad', ''),
+              'options': cell['options'], 'exit_code': None, 'seconds': None,
+              'gametics': None, 'realtics': None, 'fps': None, 'error': None}
+    if launch.errors:
+        record['error'] = '; '.join(launch.errors)
+        return record
+    started = time.perf_counter()
+    try:
+        result = subprocess.run(
+            [launch.program, *command[1:], *launch.args],
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            timeout=timeout, env={**os.environ, **profile.env})
+    except subprocess.TimeoutExpired:
+        record['error'] = f'Timed out after {timeout} s'
+        return record
+    except OSError as exc:
+        record['error'] = str(exc)
+        return record
+    record['seconds'] = time.perf_counter() - started
+    record['exit_code'] = result.returncode
+    timing = parse_timedemo(result.stdout.decode('utf-8', 'replace'))
+    if timing is None:
+        record['error'] = 'No timedemo result in output'
+    else:
+        record.update(timing)
+    return record
+
+
+def summarize(records: List[dict]) -> List[dict]:
+    """Mean, spread and variance of the fps of each cell."""
+    cells: Dict[tuple, List[dict]] = {}
+    for record in records:
+        key = (record['port'], record['set'], record['options'])
+        cells.setdefault(key, []).append(record)
+    summary = []
+    for (port, mods, options), runs in cells.items():
+        fps = [r['fps'] for r in runs if r['fps'] is not None]
+        seconds = [r['seconds'] for r in runs if r['seconds'] is not None]
+        row = dict.fromkeys(SUMMARY_FIELDS)
+        row.update(port=port, set=mods, options=options, runs=len(runs),
+                   failed=len(runs) - len(fps))
+        if fps:
+            mean = statistics.fmean(fps)
+            stdev = statistics.stdev(fps) if len(fps) > 1 else 0.0
+            row.update(fps_mean=mean, fps_stdev=stdev, fps_variance=stdev ** 2,
+                       fps_cv=stdev / mean if mean else None,
+                       fps_min=min(fps), fps_max=max(fps))
+        if seconds:
+            row['seconds_mean'] = statistics.fmean(seconds)
+        summary.append(row)
+    return summary
+
+
+def run_benchmark(spec: dict, progress=None) -> dict:
+    """Run every cell ``runs`` times; returns ``{runs, summary}``.
+
+    ``progress(record)`` is called as each run finishes.
+    """
+    demo = spec.get('demo', 'demo1')
+    flag = spec.get('timedemo_flag', '-timedemo')
+    timeout = spec.get('timeout', RUN_TIMEOUT)
+    repeats = spec.get('runs', 3)
+    jobs = []
+    # Interleave the repeats so slow drift (thermals, caches) hits every cell
+    for repeat in range(repeats):
+        for cell in build_matrix(spec):
+            jobs.append((repeat, cell))
+    records = []
+    with ThreadPoolExecutor(max(1, spec.get('jobs', 1))) as pool:
+        futures = [pool.submit(run_once, cell, demo, flag, timeout) for _r, cell in jobs]
+        for (repeat, _cell), future in zip(jobs, futures):
+            record = future.result()
+            record['run'] = repeat
+            records.append(record)
+            if progress is not None:
+                progress(record)
+    return {'runs': records, 'summary': summarize(records)}
+
+
+def write_csv(path: str, rows: List[dict], fields):
+    with open(path, 'w', newline='') as fh:
+        writer = csv.DictWriter(fh, fieldnames=list(fields))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def fake_port(argv: List[str]) -> int:
+    """Stand-in port: prints a timedemo result for the given arguments."""
+    demo = argv[argv.index('-timedemo') + 1] if '-timedemo' in argv else None
+    print('W_Init: Init WADfiles.')
+    if demo is None:
+        return 0
+    gametics = 2000 + sum(map(ord, demo)) % 1000
+    realtics = int(gametics * random.uniform(0.4, 0.6))
+    time.sleep(0.05)
+    print(f'timed {gametics} gametics in {realtics} realtics '
+          f'({gametics * TICRATE / realtics:.1f} fps)')
+    return 0
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ['--fake-port']:
+        return fake_port(argv[1:])
+    parser = argparse.ArgumentParser(prog='python -m src.benchmark')
+    parser.add_argument('spec', help='JSON file describing the matrix')
+    parser.add_argument('--json', help='write every run and the summary here')
+    parser.add_argument('--csv', help='write the per-cell summary here')
+    parser.add_argument('--runs-csv', help='write every run here')
+    args = parser.parse_args(argv)
+    with open(args.spec, 'r') as fh:
+        spec = json.load(fh)
+
+    def progress(record):
+        result = f"{record['fps']:.1f} fps" if record['fps'] is not None else record['error']
+        print(f"[{record['run'] + 1}] {record['port']} | {record['set']} | "
+              f"{record['options'] or '-'}: {result}", file=sys.stderr)
+
+    results = run_benchmark(spec, progress)
+    if args.json:
+        with open(args.json, 'w') as fh:
+            json.dump(results, fh, indent=2)
+    if args.csv:
+        write_csv(args.csv, results['summary'], SUMMARY_FIELDS)
+    if args.runs_csv:
+        write_csv(args.runs_csv, results['runs'], RUN_FIELDS)
+    for row in results['summary']:
+        if row['fps_mean'] is None:
+            print(f"{row['port']} | {row['set']} | {row['options'] or '-'}: all runs failed")
+        else:
+            print(f"{row['port']} | {row['set']} | {row['options'] or '-'}: "
+                  f"{row['fps_mean']:.1f} fps ± {row['fps_stdev']:.1f} "
+                  f"({row['runs'] - row['failed']}/{row['runs']} runs)")
+    return 0 if all(row['failed'] == 0 for row in results['summary']) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""Launcher settings, saved atomically and at most once per short window."""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from PyQt5.QtCore import QObject, QTimer
+
+from src.paths import config_dir
+
+CONFIG_NAME = 'config.json'
+SAVE_DELAY_MS = 500
+
+
+def default_config() -> Dict[str, Any]:
+    home = str(Path.home())
+    return {
+        "sourcePortDir": home,
+        "iwadDir": home,
+        "pwadDir": home,
+        "lastIWad": "",
+        "lastPWads": [],
+        "lastSourcePort": "gzdoom",
+        "lastOptions": "",
+        "animatedBackground": False,
+    }
+
+
+def config_path() -> Path:
+    return config_dir() / CONFIG_NAME
+
+
+def write_json_atomic(path, data: Any):
+    """Write ``data`` as JSON so that ``path`` is never left half written.
+
+    The data goes to a temporary file in the same directory, is fsynced
+    and then renamed over ``path``; the directory is synced as well so
+    the rename survives a crash.
+    """
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(prefix=f'.{path.name}.', dir=str(path.parent))
+    try:
+        with os.fdopen(fd, 'w') as fh:
+            json.dump(data, fh, indent=2)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    if os.name != 'nt':
+        dirfd = os.open(str(path.parent), os.O_RDONLY)
+        try:
+            os.fsync(dirfd)
+        finally:
+            os.close(dirfd)
+
+
+def read_config(path=None) -> Optional[Dict[str, Any]]:
+    """Return the stored settings, or None if there are none yet.
+
+    A ``config.json`` in the working directory, where older versions
+    kept it, is picked up when the per-user file does not exist.
+    """
+    candidates = [Path(path)] if path else [config_path(), Path(CONFIG_NAME)]
+    for candidate in candidates:
+        try:
+            with open(candidate, 'r') as fp:
+                data = json.load(fp)
+        except (OSError, ValueError):
+            continue
+        if isinstance(data, dict):
+            return data
+    return None
+
+
+class ConfigStore(QObject):
+    """Dict-like settings store with debounced, crash-safe saving.
+
+    The file is read on first access. Assigning a changed value marks
+    the store dirty and (re)starts a short timer; when it fires the
+    whole config is written once with :func:`write_json_atomic`, so a
+    burst of changes costs a single write. Call :meth:`flush` before
+    exiting to write anything still pending.
+    """
+
+    def __init__(self, path=None, parent=None, delay: int = SAVE_DELAY_MS):
+        super().__init__(parent)
+        self.path = Path(path) if path else None
+        self._data: Optional[Dict[str, Any]] = None
+        self._dirty = False
+        self.writes = 0
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay)
+        self._timer.timeout.connect(self.flush)
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        if self._data is None:
+            self._data = read_config(self.path) or default_config()
+        return self._data
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.data.get(key, default)
+
+    def __getitem__(self, key: str) -> Any:
+        return self.data[key]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.data
+
+    def __setitem__(self, key: str, value: Any):
+        if key in self.data and self.data[key] == value:
+            return
+        self.data[key] = value
+        self._dirty = True
+        self._timer.start()
+
+    def update(self, values: Dict[str, Any]):
+        for key, value in values.items():
+            self[key] = value
+
+    def flush(self):
+        """Write pending changes now."""
+        self._timer.stop()
+        if not self._dirty:
+            return
+        path = self.path or config_path()
+        write_json_atomic(path, self.data)
+        self._dirty = False
+        self.writes += 1
@@ -0,0 +1,211 @@
+"""Load-order conflict analysis: which mods override whose lumps."""
+
+import os
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from src.file_info import stat_cache
+from src.lump_index import lump_name, read_directory
+from src.pk3 import is_zip
+from src.wad import MAP_LUMPS
+from src.workers import BackgroundJobs
+
+# Text lumps the port reads from every mod and merges, so a later copy
+# adds to an earlier one instead of replacing it
+CUMULATIVE_LUMPS = frozenset({
+    'DECORATE', 'ZSCRIPT', 'MAPINFO', 'ZMAPINFO', 'EMAPINFO', 'SNDINFO',
+    'SNDSEQ', 'GLDEFS', 'KEYCONF', 'LANGUAGE', 'TEXTURES', 'ANIMDEFS',
+    'DECALDEF', 'LOCKDEFS', 'TERRAIN', 'FONTDEFS', 'MENUDEF', 'CVARINFO',
+    'MODELDEF', 'VOXELDEF', 'REVERBS', 'TRNSLATE', 'LOADACS', 'DEHACKED',
+    'ALTHUDCF', 'TEXTCOLO', 'SECRETS', 'SPLASHES', 'XHAIRS',
+})
+
+# Lumps every map or namespace carries; they never override anything
+IGNORED_LUMPS = MAP_LUMPS | CUMULATIVE_LUMPS | {
+    'TEXTMAP', 'ENDMAP', 'ZNODES', 'DIALOGUE', ''}
+
+
+def override_names(path: str) -> FrozenSet[str]:
+    """Return the set of lump names ``path`` contributes to the namespace."""
+    names, _offsets, _sizes = read_directory(path)
+    try:
+        zipped = is_zip(path)
+    except OSError:
+        zipped = False
+    result = set()
+    for name in names:
+        # ZIP entries are listed under their full path as well; only the
+        # short name takes part in overriding
+        short = lump_name(name) if zipped else name
+        if short in IGNORED_LUMPS or short.endswith(('_START', '_END')):
+            continue
+        result.add(short)
+    return frozenset(result)
+
+
+class ConflictAnalyzer:
+    """Tracks lump overrides across an ordered list of mods.
+
+    Intersections are cached per unordered pair of mods that share at
+    least one lump, found through a lump name -> mods index, so adding
+    a mod only touches the mods it actually overlaps with. Reordering
+    just recombines cached sets and removing a mod drops its pairs.
+    """
+
+    def __init__(self):
+        self.order: List[str] = []
+        self.names: Dict[str, FrozenSet[str]] = {}
+        self._position: Dict[str, int] = {}
+        self._owners: Dict[str, Set[str]] = {}
+        self._partners: Dict[str, Dict[str, FrozenSet[str]]] = {}
+
+    def add(self, path: str, names: Iterable[str]):
+        """Register the lump names of ``path``."""
+        self.discard(path)
+        names = frozenset(names)
+        self.names[path] = names
+        partners = self._partners.setdefault(path, {})
+        shared: Dict[str, Set[str]] = {}
+        for name in names:
+            owners = self._owners.setdefault(name, set())
+            for other in owners:
+                shared.setdefault(other, set()).add(name)
+            owners.add(path)
+        for other, common in shared.items():
+            common = frozenset(common)
+            partners[other] = common
+            self._partners[other][path] = common
+
+    def discard(self, path: str):
+        names = self.names.pop(path, None)
+        if names is None:
+            return
+        for name in names:
+            owners = self._owners.get(name)
+            if owners is not None:
+                owners.discard(path)
+                if not owners:
+                    del self._owners[name]
+        for other in self._partners.pop(path, {}):
+            self._partners[other].pop(path, None)
+
+    def set_order(self, paths: Iterable[str]) -> List[str]:
+        """Set the load order; returns the paths whose names are unknown."""
+        self.order = list(paths)
+        self._position = {p: i for i, p in enumerate(self.order)}
+        for path in [p for p in self.names if p not in self._position]:
+            self.discard(path)
+        return [p for p in self.order if p not in self.names]
+
+    def _shared(self, path: str, later: bool) -> List[Tuple[str, FrozenSet[str]]]:
+        # Partners on one side of ``path`` in load order, in that order
+        pos = self._position.get(path)
+        if pos is None:
+            return []
+        found = [
+            (self._position[other], other, common)
+            for other, common in self._partners.get(path, {}).items()
+            if other in self._position and (self._position[other] > pos) == later
+        ]
+        return [(other, common) for _pos, other, common in sorted(found)]
+
+    def overridden_by(self, path: str) -> Dict[str, str]:
+        """Map each lump of ``path`` shadowed later on to the mod that wins."""
+        result = {}
+        for later, shared in self._shared(path, True):
+            for name in shared:
+                result[name] = later
+        return result
+
+    def overrides(self, path: str) -> Dict[str, List[str]]:
+        """Map each earlier mod to the lumps ``path`` replaces from it."""
+        return {earlier: sorted(shared) for earlier, shared in self._shared(path, False)}
+
+    def summary(self, path: str, limit: int = 10) -> Optional[str]:
+        """Return a short text report for the info panel."""
+        if path not in self.names:
+            return None
+        lines = []
+        replaced = self.overrides(path)
+        if replaced:
+            total = len(set().union(*replaced.values()))
+            lines.append(f'Overrides {total} lumps from earlier mods:')
+            for earlier, names in replaced.items():
+                shown = ', '.join(names[:limit])
+                more = ' ...' if len(names) > limit else ''
+                lines.append(f' {os.path.basename(earlier)}: {shown}{more}')
+        shadowed = self.overridden_by(path)
+        if shadowed:
+            lines.append(f'{len(shadowed)} lumps overridden by later mods:')
+            names = sorted(shadowed)
+            for name in names[:limit]:
+                lines.append(f' {name} <- {os.path.basename(shadowed[name])}')
+            if len(names) > limit:
+                lines.append(' ...')
+        return '\n'.join(lines) if lines else 'No load-order conflicts'
+
+
+class ConflictTracker(QObject):
+    """Keeps a :class:`ConflictAnalyzer` in step with the PWAD list.
+
+    Directories of newly added mods are read on the worker pool, and
+    read again when a mod's size or mtime has changed since;
+    ``conflictsChanged`` fires whenever the report may have changed,
+    at most once per short batching window.
+    """
+
+    conflictsChanged = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.analyzer = ConflictAnalyzer()
+        self.jobs = BackgroundJobs(self)
+        self.jobs.resultReady.connect(self._onLoaded)
+        self._loading = set()
+        self._stamps: Dict[str, Optional[Tuple[int, int]]] = {}
+        self._notify = QTimer(self)
+        self._notify.setSingleShot(True)
+        self._notify.setInterval(100)
+        self._notify.timeout.connect(self.conflictsChanged)
+
+    @staticmethod
+    def _stamp(path: str) -> Optional[Tuple[int, int]]:
+        st = stat_cache.stat(path)
+        return None if st is None else (st.st_size, st.st_mtime_ns)
+
+    def _load(self, path: str):
+        if path not in self._loading:
+            self._loading.add(path)
+            self._stamps[path] = self._stamp(path)
+            self.jobs.submit(path, override_names, path)
+
+    def setOrder(self, paths: Iterable[str]):
+        missing = self.analyzer.set_order(paths)
+        ordered = set(self.analyzer.order)
+        for path in [p for p in self._stamps if p not in ordered]:
+            del self._stamps[path]
+        for path in missing:
+            self._load(path)
+        for path in self.analyzer.order:
+            if path in self.analyzer.names:
+                self._refresh(path)
+        self._notify.start()
+
+    def _refresh(self, path: str):
+        # The old names stay in use until the new ones are read
+        if self._stamps.get(path) != self._stamp(path):
+            self._load(path)
+
+    def _onLoaded(self, path, names):
+        self._loading.discard(path)
+        if isinstance(names, Exception) or path not in self.analyzer.order:
+            return
+        self.analyzer.add(path, names)
+        if not self._notify.isActive():
+            self._notify.start()
+
+    def summary(self, path: str) -> Optional[str]:
+        if path in self.analyzer.names:
+            self._refresh(path)
+        return self.analyzer.summary(path)
@@ -0,0 +1,103 @@
+"""Shared stat cache and cheap per-file metadata for list rows."""
+
+import os
+import struct
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.wad import HEADER
+
+# End of central directory record; a trailing comment may follow it
+EOCD = struct.Struct('<4s4H2LH')
+EOCD_MAGIC = b'PK\x05\x06'
+EOCD_SEARCH = 64 * 1024 + EOCD.size
+
+
+def read_kind(path: str) -> Tuple[str, Optional[int]]:
+    """Return ``(type, entry_count)`` from a file's header or ZIP trailer.
+
+    Only the 12-byte WAD header, or the end record of a ZIP, is read, so
+    this stays cheap on network filesystems.
+    """
+    with open(path, 'rb') as fh:
+        head = fh.read(HEADER.size)
+        if len(head) == HEADER.size and head[:4] in (b'IWAD', b'PWAD'):
+            _ident, count, _offset = HEADER.unpack(head)
+            return head[:4].decode('ascii'), count
+        if head[:2] != b'PK':
+            return '?', None
+        size = fh.seek(0, os.SEEK_END)
+        span = min(size, EOCD_SEARCH)
+        fh.seek(size - span)
+        tail = fh.read(span)
+    pos = tail.rfind(EOCD_MAGIC)
+    if pos < 0 or pos + EOCD.size > len(tail):
+        return 'PK3', None
+    return 'PK3', EOCD.unpack_from(tail, pos)[4]
+
+
+class StatCache:
+    """Thread-safe ``os.stat`` results and row records, shared by widgets.
+
+    Stat results are reused for ``ttl`` seconds, so the list, the info
+    panel and the launcher don't each hit a slow filesystem for the same
+    file. Row records are kept per ``(size, mtime)`` and survive until
+    the file changes.
+    """
+
+    def __init__(self, ttl: float = 5.0):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Tuple[float, Optional[os.stat_result]]] = {}
+        self._records: Dict[str, Tuple[Tuple[int, int], dict]] = {}
+
+    def stat(self, path: str) -> Optional[os.stat_result]:
+        """Return ``os.stat(path)``, or None if the file is missing."""
+        now = time.monotonic()
+        with self._lock:
+            hit = self._stats.get(path)
+        if hit is not None and now - hit[0] < self.ttl:
+            return hit[1]
+        try:
+            st = os.stat(path)
+        except OSError:
+            st = None
+        with self._lock:
+            self._stats[path] = (now, st)
+        return st
+
+    def invalidate(self, path: Optional[str] = None):
+        with self._lock:
+            if path is None:
+                self._stats.clear()
+            else:
+                self._stats.pop(path, None)
+
+    def info(self, path: str) -> Optional[dict]:
+        """Return ``{size, mtime, type, lumps}`` for a mod, or None."""
+        st = self.stat(path)
+        if st is None:
+            return None
+        key = (st.st_size, st.st_mtime_ns)
+        with self._lock:
+            hit = self._records.get(path)
+        if hit is not None and hit[0] == key:
+            return hit[1]
+        try:
+            kind, lumps = read_kind(path)
+        except OSError:
+            kind, lumps = '?', None
+        record = {'size': st.st_size, 'mtime': st.st_mtime,
+                  'type': kind, 'lumps': lumps}
+        with self._lock:
+            self._records[path] = (key, record)
+        return record
+
+    def infos(self, paths: Iterable[str]) -> List[Tuple[str, Optional[dict]]]:
+        """Batch form of :meth:`info`, for one worker job per batch."""
+        return [(path, self.info(path)) for path in paths]
+
+
+# Global instance shared by every widget
+stat_cache = StatCache()
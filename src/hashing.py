@@ -0,0 +1,178 @@
+"""Content hashing of mods and duplicate detection across the library."""
+
+import hashlib
+import os
+import sqlite3
+import sys
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from src.library import process_pool, scan_directory
+from src.paths import cache_dir
+from src.wad import WadFile, WadError
+
+CHUNK_SIZE = 4 * 1024 * 1024
+LUMP_DIGEST_SIZE = 8
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS hashes (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    lumps BLOB NOT NULL
+)
+"""
+
+# path, size, mtime_ns, whole-file digest, per-lump digests (uint64)
+HashRecord = Tuple[str, int, int, str, np.ndarray]
+
+
+def _lump_digests(wad: WadFile) -> np.ndarray:
+    # Name and data together, so a renamed lump counts as a change
+    digests = bytearray()
+    for i in range(len(wad)):
+        h = hashlib.blake2b(wad.name(i).encode('latin-1'),
+                            digest_size=LUMP_DIGEST_SIZE)
+        h.update(wad.lump(i))
+        digests += h.digest()
+    return np.frombuffer(bytes(digests), dtype='<u8')
+
+
+def hash_file(path: str) -> Optional[HashRecord]:
+    """Hash a file in large chunks; WADs also get one digest per lump."""
+    digest = hashlib.blake2b(digest_size=20)
+    lumps = np.empty(0, dtype='<u8')
+    try:
+        st = os.stat(path)
+        try:
+            # WADs are hashed straight from the mapping, read only once
+            with WadFile(path) as wad:
+                raw = wad.raw()
+                for start in range(0, len(raw), CHUNK_SIZE):
+                    digest.update(raw[start:start + CHUNK_SIZE])
+                # The whole-file digest is complete; a bad lump only
+                # costs the per-lump digests
+                try:
+                    lumps = _lump_digests(wad)
+                except WadError:
+                    pass
+        except WadError:
+            with open(path, 'rb') as fh:
+                for chunk in iter(lambda: fh.read(CHUNK_SIZE), b''):
+                    digest.update(chunk)
+    except OSError:
+        return None
+    return path, st.st_size, st.st_mtime_ns, digest.hexdigest(), lumps
+
+
+class HashCache:
+    """SQLite store of hash records, valid while size and mtime match."""
+
+    def __init__(self, path: Optional[str] = None):
+        self._path = path or str(cache_dir() / 'hashes.sqlite')
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self._path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(SCHEMA)
+
+    def get(self, path: str, size: int, mtime_ns: int) -> Optional[HashRecord]:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT digest, lumps FROM hashes '
+                'WHERE path = ? AND size = ? AND mtime_ns = ?',
+                (path, size, mtime_ns)).fetchone()
+        if row is None:
+            return None
+        return path, size, mtime_ns, row[0], np.frombuffer(row[1], dtype='<u8')
+
+    def put(self, records: Iterable[HashRecord]):
+        rows = [(p, s, m, d, l.tobytes()) for p, s, m, d, l in records]
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    'INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?)', rows)
+
+    def hash_paths(self, paths: Iterable[str],
+                   workers: Optional[int] = None) -> List[HashRecord]:
+        """Return records for ``paths``, hashing only uncached files."""
+        records, todo = [], []
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            hit = self.get(path, st.st_size, st.st_mtime_ns)
+            if hit is None:
+                todo.append(path)
+            else:
+                records.append(hit)
+        if todo:
+            with process_pool(len(todo), workers) as pool:
+                fresh = [r for r in pool.map(hash_file, todo, chunksize=4) if r]
+            self.put(fresh)
+            records.extend(fresh)
+        return records
+
+
+def duplicate_report(records: Iterable[HashRecord], max_diff: int = 8,
+                     common_limit: int = 64) -> Dict[str, list]:
+    """Group identical files and pair up WADs that differ in few lumps.
+
+    ``identical`` lists groups of paths with the same digest.
+    ``near`` lists ``(path_a, path_b, differing_lumps)`` for WADs whose
+    lump digest sets differ in at most ``max_diff`` lumps. Candidates
+    must share a lump digest that occurs in at most ``common_limit``
+    files, which keeps stock lumps like PLAYPAL from pairing everything.
+    """
+    records = list(records)
+    by_digest = defaultdict(list)
+    for path, _size, _mtime, digest, _lumps in records:
+        by_digest[digest].append(path)
+    identical = [sorted(g) for g in by_digest.values() if len(g) > 1]
+
+    # One representative per distinct file content
+    wads = {}
+    for path, _size, _mtime, digest, lumps in records:
+        if len(lumps) and digest not in wads:
+            wads[digest] = (path, np.unique(lumps))
+    keys = list(wads)
+    owners = defaultdict(list)
+    for i, key in enumerate(keys):
+        for lump in wads[key][1].tolist():
+            owners[lump].append(i)
+    candidates = set()
+    for group in owners.values():
+        if 1 < len(group) <= common_limit:
+            for a in range(len(group)):
+                for b in range(a + 1, len(group)):
+                    candidates.add((group[a], group[b]))
+
+    near = []
+    for a, b in sorted(candidates):
+        path_a, lumps_a = wads[keys[a]]
+        path_b, lumps_b = wads[keys[b]]
+        if abs(len(lumps_a) - len(lumps_b)) > max_diff:
+            continue
+        diff = len(np.setxor1d(lumps_a, lumps_b, assume_unique=True))
+        if diff <= max_diff:
+            near.append((path_a, path_b, diff))
+    near.sort(key=lambda item: item[2])
+    return {'identical': sorted(identical), 'near': near}
+
+
+if __name__ == '__main__':
+    # python -m src.hashing <folder> [...]
+    paths = []
+    for folder in sys.argv[1:] or ['.']:
+        paths.extend(f[0] for f in scan_directory(os.path.abspath(folder))[0])
+    report = duplicate_report(HashCache().hash_paths(paths))
+    print('Identical files:')
+    for group in report['identical']:
+        print('  ' + '\n  = '.join(group))
+    print('Near duplicates:')
+    for a, b, diff in report['near']:
+        print(f'  {a}\n  ~ {b} ({diff} differing lumps)')
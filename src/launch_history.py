@@ -0,0 +1,78 @@
+"""Record of past launches per file set, kept in the cache directory."""
+
+import hashlib
+import json
+import os
+import statistics
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from src.config_store import read_config, write_json_atomic
+from src.paths import cache_dir
+
+HISTORY_NAME = 'launch_history.json'
+KEEP_RECORDS = 20
+
+
+def history_key(files: Iterable[str]) -> str:
+    """Key launches by the files they load, in load order."""
+    return hashlib.sha1(json.dumps(list(files)).encode('utf-8')).hexdigest()[:16]
+
+
+def files_version(files: Iterable[str]) -> str:
+    """Fingerprint the size and mtime of ``files``; changes with any mod update."""
+    digest = hashlib.sha1()
+    for path in files:
+        try:
+            st = os.stat(path)
+            digest.update(f'{path}\0{st.st_size}\0{st.st_mtime_ns}\0'.encode('utf-8'))
+        except OSError:
+            digest.update(f'{path}\0-\0'.encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+class LaunchHistory:
+    """The last ``keep`` launch records of every file set.
+
+    Records are plain dicts; :meth:`record` adds a timestamp and saves
+    the whole file atomically, so it should be called off the GUI thread.
+    """
+
+    def __init__(self, path=None, keep: int = KEEP_RECORDS):
+        self._path = path
+        self.keep = keep
+        self._lock = threading.Lock()
+        self._data: Optional[Dict[str, List[dict]]] = None
+
+    @property
+    def path(self) -> str:
+        return self._path or str(cache_dir() / HISTORY_NAME)
+
+    def _load(self) -> Dict[str, List[dict]]:
+        if self._data is None:
+            self._data = read_config(self.path) or {}
+        return self._data
+
+    def records(self, key: str) -> List[dict]:
+        with self._lock:
+            return list(self._load().get(key, ()))
+
+    def record(self, key: str, fields: dict):
+        with self._lock:
+            data = self._load()
+            records = data.setdefault(key, [])
+            records.append(dict(fields, time=time.time()))
+            del records[:-self.keep]
+            write_json_atomic(self.path, data)
+
+    def median(self, key: str, field: str, **match) -> Optional[float]:
+        """Median of ``field`` over the records whose fields equal ``match``."""
+        values = [r[field] for r in self.records(key)
+                  if r.get(field) is not None
+                  and all(r.get(k) == v for k, v in match.items())]
+        return statistics.median(values) if values else None
+
+
+# Global instance shared by the launcher widgets
+launch_history = LaunchHistory()
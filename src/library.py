@@ -0,0 +1,322 @@
+"""Indexed library of the mods found below configured folders."""
+
+import hashlib
+import multiprocessing
+import os
+import sqlite3
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from PyQt5.QtCore import QObject, QTimer, QFileSystemWatcher, pyqtSignal
+
+from src.paths import config_dir
+from src.workers import BackgroundJobs
+
+MOD_EXTENSIONS = ('.wad', '.pk3', '.zip')
+FINGERPRINT_SPAN = 64 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    dir TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    fingerprint TEXT NOT NULL
+)
+"""
+
+FileStat = Tuple[str, int, int]
+
+
+def scan_directory(path: str, recursive: bool = True) -> Tuple[List[FileStat], List[str]]:
+    """Return ``(files, dirs)`` found below ``path`` using os.scandir.
+
+    ``files`` holds ``(path, size, mtime_ns)`` for every mod archive and
+    ``dirs`` every directory visited, ``path`` included. Hidden
+    directories are skipped.
+    """
+    files: List[FileStat] = []
+    dirs: List[str] = []
+    stack = [path]
+    while stack:
+        current = stack.pop()
+        dirs.append(current)
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if recursive and not entry.name.startswith('.'):
+                                stack.append(entry.path)
+                        elif entry.name.lower().endswith(MOD_EXTENSIONS):
+                            st = entry.stat()
+                            files.append((entry.path, st.st_size, st.st_mtime_ns))
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return files, dirs
+
+
+def _scan_task(task: Tuple[str, bool]):
+    return scan_directory(*task)
+
+
+def fingerprint(path: str) -> Tuple[str, str, str]:
+    """Return ``(path, kind, digest)`` from the size, head and tail of a file.
+
+    This is a cheap identity for change detection, not a content hash.
+    """
+    try:
+        with open(path, 'rb') as fh:
+            size = os.fstat(fh.fileno()).st_size
+            head = fh.read(FINGERPRINT_SPAN)
+            tail = b''
+            if size > 2 * FINGERPRINT_SPAN:
+                fh.seek(-FINGERPRINT_SPAN, os.SEEK_END)
+                tail = fh.read(FINGERPRINT_SPAN)
+    except OSError:
+        return path, 'unreadable', ''
+    if head[:4] in (b'IWAD', b'PWAD'):
+        kind = 'wad'
+    elif head[:2] == b'PK':
+        kind = 'zip'
+    else:
+        kind = 'unknown'
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(size.to_bytes(8, 'little'))
+    digest.update(head)
+    digest.update(tail)
+    return path, kind, digest.hexdigest()
+
+
+def process_pool(jobs: int, workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """Return a process pool sized for ``jobs`` tasks.
+
+    Workers are spawned rather than forked so starting them from inside
+    a threaded Qt process is safe.
+    """
+    workers = workers or min(os.cpu_count() or 1, 8)
+    return ProcessPoolExecutor(
+        max_workers=max(1, min(workers, jobs)),
+        mp_context=multiprocessing.get_context('spawn'),
+    )
+
+
+def _is_below(path: str, roots: Iterable[str]) -> bool:
+    return any(path == r or path.startswith(r.rstrip(os.sep) + os.sep) for r in roots)
+
+
+class LibraryIndex:
+    """Persistent index of mod archives, updated incrementally.
+
+    Only files whose size or mtime differ from the stored row are
+    fingerprinted again; directory walks and fingerprinting are spread
+    over a process pool.
+    """
+
+    def __init__(self, path: Optional[str] = None, workers: Optional[int] = None):
+        self._path = path or str(config_dir() / 'library.sqlite')
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self._path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(SCHEMA)
+        self._conn.execute('CREATE INDEX IF NOT EXISTS files_dir ON files(dir)')
+
+    def entries(self) -> List[Tuple[str, int, int, str, str]]:
+        """Return ``(path, size, mtime_ns, kind, fingerprint)`` rows."""
+        with self._lock:
+            return self._conn.execute(
+                'SELECT path, size, mtime_ns, kind, fingerprint FROM files '
+                'ORDER BY path').fetchall()
+
+    def _known(self, where: str, args: tuple) -> Dict[str, Tuple[int, int]]:
+        with self._lock:
+            rows = self._conn.execute(
+                f'SELECT path, size, mtime_ns FROM files WHERE {where}', args)
+            return {p: (s, m) for p, s, m in rows}
+
+    def scan(self, roots: Iterable[str]) -> Tuple[Dict[str, int], List[str]]:
+        """Walk ``roots`` recursively and bring the index up to date.
+
+        Returns ``(changes, dirs)`` where ``changes`` counts added,
+        updated and removed files and ``dirs`` lists every directory seen.
+        """
+        roots = [os.path.abspath(r) for r in roots if os.path.isdir(r)]
+        tasks = []
+        for root in roots:
+            # The root's own files in one task, each subtree in another
+            tasks.append((root, False))
+            try:
+                with os.scandir(root) as it:
+                    tasks.extend(
+                        (e.path, True) for e in it
+                        if e.is_dir(follow_symlinks=False)
+                        and not e.name.startswith('.'))
+            except OSError:
+                continue
+        if not tasks:
+            return {'added': 0, 'updated': 0, 'removed': 0}, []
+        files: List[FileStat] = []
+        dirs: List[str] = []
+        with process_pool(len(tasks), self.workers) as pool:
+            for found, seen in pool.map(_scan_task, tasks):
+                files.extend(found)
+                dirs.extend(seen)
+            known = {}
+            for root in roots:
+                known.update(self._below(root))
+            changes = self._apply(files, known, pool)
+        return changes, sorted(set(dirs))
+
+    def _below(self, directory: str) -> Dict[str, Tuple[int, int]]:
+        # Range query instead of LIKE so '_' and '%' in paths stay literal
+        prefix = directory.rstrip(os.sep) + os.sep
+        upper = prefix[:-1] + chr(ord(os.sep) + 1)
+        return self._known('path >= ? AND path < ?', (prefix, upper))
+
+    def rescan_directory(self, directory: str) -> Dict[str, int]:
+        """Refresh the files directly inside ``directory``.
+
+        If the directory is gone, everything indexed below it is dropped.
+        """
+        directory = os.path.abspath(directory)
+        if not os.path.isdir(directory):
+            return self._apply([], self._below(directory), None)
+        files, _dirs = scan_directory(directory, recursive=False)
+        known = self._known('dir = ?', (directory,))
+        changed = [f for f in files if known.get(f[0]) != (f[1], f[2])]
+        if len(changed) > 16:
+            with process_pool(len(changed), self.workers) as pool:
+                return self._apply(files, known, pool)
+        return self._apply(files, known, None)
+
+    def _apply(self, files: List[FileStat], known: Dict[str, Tuple[int, int]], pool) -> Dict[str, int]:
+        seen = {path: (size, mtime) for path, size, mtime in files}
+        changed = [p for p, key in seen.items() if known.get(p) != key]
+        removed = [p for p in known if p not in seen]
+        if pool is not None:
+            prints = list(pool.map(fingerprint, changed, chunksize=32))
+        else:
+            prints = [fingerprint(p) for p in changed]
+        rows = [
+            (path, os.path.dirname(path), *seen[path], kind, digest)
+            for path, kind, digest in prints
+        ]
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    'INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)', rows)
+                self._conn.executemany(
+                    'DELETE FROM files WHERE path = ?', [(p,) for p in removed])
+        added = sum(1 for p in changed if p not in known)
+        return {
+            'added': added,
+            'updated': len(changed) - added,
+            'removed': len(removed),
+        }
+
+    def prune(self, roots: Iterable[str]):
+        """Forget files that are no longer below any of ``roots``."""
+        roots = [os.path.abspath(r) for r in roots]
+        with self._lock:
+            paths = [p for (p,) in self._conn.execute('SELECT path FROM files')]
+            stale = [(p,) for p in paths if not _is_below(p, roots)]
+            with self._conn:
+                self._conn.executemany('DELETE FROM files WHERE path = ?', stale)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class LibraryService(QObject):
+    """Keeps a :class:`LibraryIndex` current in the background.
+
+    A full incremental scan runs off the GUI thread when roots are set;
+    afterwards QFileSystemWatcher notifications trigger debounced
+    rescans of just the directories that changed.
+    """
+
+    libraryChanged = pyqtSignal(dict)
+    lumpIndexReady = pyqtSignal(object)
+
+    RESCAN_DELAY_MS = 500
+
+    def __init__(self, parent=None, index: Optional[LibraryIndex] = None):
+        super().__init__(parent)
+        self.index = index or LibraryIndex()
+        self.roots: List[str] = []
+        self.lumpIndex = None
+        self.jobs = BackgroundJobs(self, maxThreads=1)
+        self.jobs.resultReady.connect(self._onResult)
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self._onDirectoryChanged)
+        self._dirty = set()
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.timeout.connect(self._rescanDirty)
+
+    def setRoots(self, roots: Iterable[str]):
+        """Replace the scanned roots and start a background scan."""
+        roots = sorted({os.path.abspath(r) for r in roots if r and os.path.isdir(r)})
+        if roots == self.roots:
+            return
+        self.roots = roots
+        watched = self.watcher.directories()
+        if watched:
+            self.watcher.removePaths(watched)
+        self.jobs.cancel()
+        self.jobs.submit('scan', self._fullScan, list(roots))
+
+    def _fullScan(self, roots):
+        self.index.prune(roots)
+        return self.index.scan(roots)
+
+    def _buildLumpIndex(self, previous):
+        from src.lump_index import LumpIndex
+        if previous is None:
+            previous = LumpIndex.load()
+        files = [(path, kind, fp) for path, _s, _m, kind, fp in self.index.entries()]
+        index = LumpIndex.build(files, previous, self.index.workers)
+        index.save()
+        return index
+
+    def _onResult(self, key, result):
+        if isinstance(result, Exception):
+            return
+        if key == 'lumps':
+            self.lumpIndex = result
+            self.lumpIndexReady.emit(result)
+            return
+        changes, dirs = result
+        if dirs:
+            self.watcher.addPaths(dirs)
+        self.libraryChanged.emit(changes)
+        if self.lumpIndex is None or any(changes.values()):
+            self.jobs.submit('lumps', self._buildLumpIndex, self.lumpIndex)
+
+    def _onDirectoryChanged(self, directory):
+        self._dirty.add(directory)
+        self._debounce.start(self.RESCAN_DELAY_MS)
+
+    def _rescanDirty(self):
+        dirty, self._dirty = self._dirty, set()
+        watched = set(self.watcher.directories())
+        for directory in dirty:
+            self.jobs.submit(directory, self._rescan, directory, watched)
+
+    def _rescan(self, directory, watched):
+        changes = self.index.rescan_directory(directory)
+        if not os.path.isdir(directory):
+            return changes, []
+        # Subdirectories created since the last scan are indexed and watched
+        _files, dirs = scan_directory(directory, recursive=True)
+        new = [d for d in dirs if d not in watched]
+        for d in new:
+            for key, value in self.index.rescan_directory(d).items():
+                changes[key] += value
+        return changes, new
@@ -0,0 +1,110 @@
+"""Incremental classification of source-port output lines."""
+
+import re
+from bisect import bisect_right
+from typing import Dict, Iterable, List
+
+# A line goes to the first category that matches anywhere in it
+CATEGORIES = (
+    ('script_error', 'Script errors', (
+        r'script error',
+        r'\berror\b.*\b(?:zscript|decorate|acs)\b',
+        r'\b(?:zscript|decorate|acs)\b.*\berror\b',
+        r'execution could not continue',
+        r'vm execution aborted',
+        r'^[ \t]*fatal error',
+        r'\d+ errors? while parsing',
+    )),
+    ('missing_texture', 'Missing textures', (
+        r'unknown (?:texture|flat|patch)',
+        r'(?:texture|flat|patch|sprite) .*\bnot found',
+        r'could not find (?:texture|flat|patch)',
+        r'bad texture name',
+    )),
+    ('script_warning', 'Script warnings', (
+        r'script warning',
+        r'\bwarning\b.*\b(?:zscript|decorate)\b',
+        r'\b(?:zscript|decorate)\b.*\bwarning\b',
+        r'^[ \t]*warning:',
+    )),
+    ('map_load', 'Map loads', (
+        r'^[ \t]*(?:MAP\d\d|E\dM\d)[ \t]+-[ \t]',
+        r'^[ \t]*(?:loading|entering) (?:map|level)\b',
+    )),
+    ('timing', 'Timing', (
+        r'timed \d+ gametics',
+        r'\d+(?:\.\d+)? fps\b',
+        r'\btook \d+(?:\.\d+)? ?(?:ms|s|sec|seconds)\b',
+        r'level (?:completed|time)\b',
+    )),
+)
+
+# Keywords that every pattern above needs. Most output lines contain
+# none of them, so one pass of this over the lowercased chunk skips them
+# without trying each category in turn.
+TRIGGER = re.compile(
+    r'error|warn|continue|abort|texture|flat|patch|sprite'
+    r'|map|e\dm\d|level|gametics|fps|took')
+CATEGORY_PATTERNS = [
+    (key, re.compile('|'.join(patterns), re.IGNORECASE))
+    for key, _label, patterns in CATEGORIES]
+LABELS = {key: label for key, label, _patterns in CATEGORIES}
+
+
+def classify(line: str):
+    """Return the category of ``line``, or None."""
+    for key, pattern in CATEGORY_PATTERNS:
+        if pattern.search(line):
+            return key
+    return None
+
+
+class OutputClassifier:
+    """Sorts port output into categories as it arrives.
+
+    Lines are numbered from 0 in the order they are fed, matching the
+    session log. :meth:`feed` scans only the new lines, once with the
+    keyword pattern and then per candidate line with the category
+    patterns, and appends line numbers to ``hits[category]``; earlier
+    output is never scanned again.
+    """
+
+    def __init__(self):
+        self.lines = 0
+        self.hits: Dict[str, List[int]] = {key: [] for key in LABELS}
+
+    def counts(self) -> Dict[str, int]:
+        return {key: len(hits) for key, hits in self.hits.items()}
+
+    def feed(self, lines: Iterable[str]) -> int:
+        """Classify ``lines``; returns how many of them matched."""
+        lines = list(lines)
+        text = '\n'.join(lines).lower()
+        line, pos, last = 0, 0, -1
+        found = 0
+        for match in TRIGGER.finditer(text):
+            line += text.count('\n', pos, match.start())
+            pos = match.start()
+            if line == last:
+                continue
+            last = line
+            category = classify(lines[line])
+            if category is not None:
+                self.hits[category].append(self.lines + line)
+                found += 1
+        self.lines += len(lines)
+        return found
+
+    def next_hit(self, category: str, after: int) -> int:
+        """Return the first ``category`` line after ``after``, wrapping
+        around to the first one; -1 when there are none."""
+        hits = self.hits[category]
+        if not hits:
+            return -1
+        pos = bisect_right(hits, after)
+        return hits[pos] if pos < len(hits) else hits[0]
+
+    def reset(self):
+        self.lines = 0
+        for hits in self.hits.values():
+            hits.clear()
@@ -0,0 +1,240 @@
+"""Inverted index from lump/entry names to the archives containing them."""
+
+import fnmatch
+import os
+import re
+import sys
+import zipfile
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from src.library import process_pool
+from src.paths import cache_dir
+from src.wad import WadFile, WadError
+
+Posting = Tuple[str, str, int, int]
+
+
+def lump_name(filename: str) -> str:
+    """Return the short lump name a port derives from a PK3 entry path."""
+    base = filename.rsplit('/', 1)[-1]
+    return base.split('.', 1)[0][:8].upper()
+
+
+def read_directory(path: str, kind: str = '') -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """Return ``(names, offsets, sizes)`` for every lump or entry of ``path``.
+
+    ZIP entries are listed under their full upper-cased path and, when
+    different, under their short lump name as well.
+    """
+    try:
+        if kind != 'zip':
+            try:
+                with WadFile(path) as wad:
+                    return (wad.names.tolist(), wad.offsets.astype(np.int64),
+                            wad.sizes.astype(np.int64))
+            except WadError:
+                if kind == 'wad':
+                    raise
+        with zipfile.ZipFile(path) as zf:
+            names, offsets, sizes = [], [], []
+            for zi in zf.infolist():
+                if zi.is_dir():
+                    continue
+                full = zi.filename.upper()
+                for name in {full, lump_name(zi.filename)}:
+                    names.append(name)
+                    offsets.append(zi.header_offset)
+                    sizes.append(zi.file_size)
+            return (names, np.array(offsets, dtype=np.int64),
+                    np.array(sizes, dtype=np.int64))
+    except (OSError, WadError, zipfile.BadZipFile):
+        pass
+    empty = np.empty(0, dtype=np.int64)
+    return [], empty, empty
+
+
+def _read_task(task):
+    return read_directory(*task)
+
+
+def _pack(strings: Iterable[str]) -> np.ndarray:
+    # Every string is NUL terminated so empty names survive the round trip
+    blob = ''.join(s + '\0' for s in strings).encode('utf-8')
+    return np.frombuffer(blob, dtype=np.uint8)
+
+
+def _unpack(blob: np.ndarray) -> List[str]:
+    parts = blob.tobytes().decode('utf-8').split('\0')[:-1]
+    return [sys.intern(s) for s in parts]
+
+
+class LumpIndex:
+    """Sorted name table plus postings ``(archive, offset, size)``.
+
+    Unique names are kept sorted in an array of interned strings so
+    exact, prefix and glob queries are binary searches over it; each
+    name's postings are a contiguous slice of flat NumPy arrays.
+    """
+
+    def __init__(self, archives, fingerprints, names, name_ids, archive_ids,
+                 offsets, sizes):
+        self.archives = list(archives)
+        self.fingerprints = list(fingerprints)
+        self.names = names
+        self.name_ids = name_ids
+        self.archive_ids = archive_ids
+        self.offsets = offsets
+        self.sizes = sizes
+        self.starts = np.searchsorted(name_ids, np.arange(len(names) + 1))
+
+    @classmethod
+    def empty(cls):
+        ints = np.empty(0, dtype=np.int64)
+        return cls([], [], np.empty(0, dtype=object), ints, ints, ints, ints)
+
+    def __len__(self):
+        return len(self.name_ids)
+
+    @classmethod
+    def build(cls, files: Iterable[Tuple[str, str, str]],
+              previous: Optional['LumpIndex'] = None,
+              workers: Optional[int] = None) -> 'LumpIndex':
+        """Build an index for ``(path, kind, fingerprint)`` files.
+
+        Archives whose fingerprint is unchanged in ``previous`` reuse its
+        postings; only the rest are read, across a process pool.
+        """
+        files = list(files)
+        reuse = {}
+        if previous is not None:
+            reuse = {
+                (path, fp): i for i, (path, fp)
+                in enumerate(zip(previous.archives, previous.fingerprints))
+            }
+            # Group the old postings by archive once, so each reused
+            # archive is a slice rather than a scan of every posting
+            by_archive = np.argsort(previous.archive_ids, kind='stable')
+            bounds = np.searchsorted(previous.archive_ids[by_archive],
+                                     np.arange(len(previous.archives) + 1))
+        parts = [None] * len(files)
+        todo = []
+        for i, (path, kind, fp) in enumerate(files):
+            old = reuse.get((path, fp))
+            if old is None:
+                todo.append(i)
+            else:
+                rows = by_archive[bounds[old]:bounds[old + 1]]
+                parts[i] = (previous.names[previous.name_ids[rows]],
+                            previous.offsets[rows], previous.sizes[rows])
+        if todo:
+            tasks = [(files[i][0], files[i][1]) for i in todo]
+            with process_pool(len(tasks), workers) as pool:
+                for i, (names, offsets, sizes) in zip(
+                        todo, pool.map(_read_task, tasks, chunksize=16)):
+                    parts[i] = (np.array(names, dtype=object), offsets, sizes)
+        if not parts:
+            return cls.empty()
+
+        all_names = np.concatenate([p[0] for p in parts])
+        archive_ids = np.repeat(
+            np.arange(len(parts), dtype=np.int64), [len(p[0]) for p in parts])
+        offsets = np.concatenate([p[1] for p in parts]).astype(np.int64)
+        sizes = np.concatenate([p[2] for p in parts]).astype(np.int64)
+        names, name_ids = np.unique(all_names, return_inverse=True)
+        order = np.argsort(name_ids, kind='stable')
+        names = np.array([sys.intern(n) for n in names.tolist()], dtype=object)
+        return cls(
+            [f[0] for f in files], [f[2] for f in files], names,
+            name_ids[order].astype(np.int64), archive_ids[order],
+            offsets[order], sizes[order],
+        )
+
+    def save(self, path: Optional[str] = None):
+        path = path or default_path()
+        tmp = f'{path}.tmp.npz'
+        np.savez(
+            tmp,
+            archives=_pack(self.archives),
+            fingerprints=_pack(self.fingerprints),
+            names=_pack(self.names.tolist()),
+            name_ids=self.name_ids, archive_ids=self.archive_ids,
+            offsets=self.offsets, sizes=self.sizes,
+        )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> Optional['LumpIndex']:
+        path = path or default_path()
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                return cls(
+                    _unpack(data['archives']), _unpack(data['fingerprints']),
+                    np.array(_unpack(data['names']), dtype=object),
+                    data['name_ids'], data['archive_ids'],
+                    data['offsets'], data['sizes'],
+                )
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def _postings(self, lo: int, hi: int) -> List[Posting]:
+        start, stop = self.starts[lo], self.starts[hi]
+        names = self.names[self.name_ids[start:stop]]
+        return [
+            (self.archives[a], n, o, s) for a, n, o, s in zip(
+                self.archive_ids[start:stop].tolist(), names.tolist(),
+                self.offsets[start:stop].tolist(), self.sizes[start:stop].tolist())
+        ]
+
+    def _range(self, prefix: str) -> Tuple[int, int]:
+        lo = int(np.searchsorted(self.names, prefix, side='left'))
+        hi = int(np.searchsorted(self.names, prefix + '\U0010ffff', side='left'))
+        return lo, hi
+
+    def lookup(self, name: str) -> List[Posting]:
+        """Return ``(archive, name, offset, size)`` for an exact name."""
+        name = name.upper()
+        lo = int(np.searchsorted(self.names, name, side='left'))
+        if lo < len(self.names) and self.names[lo] == name:
+            return self._postings(lo, lo + 1)
+        return []
+
+    def prefix(self, prefix: str) -> List[Posting]:
+        """Return postings of every name starting with ``prefix``."""
+        return self._postings(*self._range(prefix.upper()))
+
+    def glob(self, pattern: str) -> List[Posting]:
+        """Return postings of every name matching a shell-style pattern."""
+        pattern = pattern.upper()
+        literal = re.split(r'[*?\[]', pattern, 1)[0]
+        lo, hi = self._range(literal)
+        match = re.compile(fnmatch.translate(pattern)).match
+        result = []
+        for i, name in enumerate(self.names[lo:hi].tolist(), lo):
+            if match(name):
+                result.extend(self._postings(i, i + 1))
+        return result
+
+    def archives_with(self, names: Iterable[str]) -> Dict[str, List[str]]:
+        """Map each name or pattern to the sorted archives that contain it."""
+        result = {}
+        for name in names:
+            hits = self.glob(name) if re.search(r'[*?\[]', name) else self.lookup(name)
+            result[name] = sorted({h[0] for h in hits})
+        return result
+
+
+def default_path() -> str:
+    return str(cache_dir() / 'lump_index.npz')
+
+
+if __name__ == '__main__':
+    # python -m src.lump_index PLAYPAL DEHACKED 'MAP0*'
+    index = LumpIndex.load()
+    if index is None:
+        sys.exit('No lump index yet; start the launcher to build one.')
+    for name, archives in index.archives_with(sys.argv[1:]).items():
+        print(f'{name}:')
+        for archive in archives:
+            print(f'  {archive}')
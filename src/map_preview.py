@@ -0,0 +1,205 @@
+"""Automap-style overview images of maps, rendered in batched NumPy ops."""
+
+import hashlib
+import os
+import struct
+import sys
+import zipfile
+from typing import Optional, Tuple
+
+import numpy as np
+
+from src.library import fingerprint
+from src.map_stats import UDMF_BLOCK, UDMF_COMMENTS, UDMF_FIELD
+from src.paths import cache_dir
+from src.pk3 import is_zip
+from src.thumbnails import ThumbnailCache
+from src.wad import WadBuffer, WadDirectory, WadFile, WadError
+
+PREVIEW_SIZE = (320, 240)
+MARGIN = 4
+
+VERTEX = np.dtype([('x', '<i2'), ('y', '<i2')])
+DOOM_LINEDEF = np.dtype([
+    ('v1', '<u2'), ('v2', '<u2'), ('flags', '<u2'),
+    ('special', '<u2'), ('tag', '<u2'), ('front', '<u2'), ('back', '<u2'),
+])
+HEXEN_LINEDEF = np.dtype([
+    ('v1', '<u2'), ('v2', '<u2'), ('flags', '<u2'),
+    ('special', 'u1'), ('args', 'u1', (5,)), ('front', '<u2'), ('back', '<u2'),
+])
+TWO_SIDED = 0x0004
+
+# Automap colours: background, two-sided lines, one-sided walls
+COLORS = np.array([
+    (0, 0, 0, 255),
+    (140, 100, 60, 255),
+    (252, 0, 0, 255),
+], dtype=np.uint8)
+
+# vertices (N, 2) float, lines (M, 2) vertex indices, two-sided flags (M,)
+Geometry = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+def _records(data, dtype: np.dtype) -> np.ndarray:
+    return np.frombuffer(data, dtype, count=len(data) // dtype.itemsize)
+
+
+def _binary_geometry(wad: WadDirectory, mapname: str) -> Geometry:
+    vidx = wad.map_lump(mapname, 'VERTEXES')
+    lidx = wad.map_lump(mapname, 'LINEDEFS')
+    if vidx is None or lidx is None:
+        raise WadError(f'{mapname} has no VERTEXES/LINEDEFS')
+    hexen = wad.map_lump(mapname, 'BEHAVIOR') is not None
+    verts = _records(wad.lump(vidx), VERTEX)
+    lines = _records(wad.lump(lidx), HEXEN_LINEDEF if hexen else DOOM_LINEDEF)
+    vertices = np.stack([verts['x'], verts['y']], axis=1).astype(np.float32)
+    ends = np.stack([lines['v1'], lines['v2']], axis=1)
+    return vertices, ends, (lines['flags'] & TWO_SIDED) != 0
+
+
+def _udmf_geometry(text: str) -> Geometry:
+    text = UDMF_COMMENTS.sub('', text)
+    vertices, ends, two_sided = [], [], []
+    for match in UDMF_BLOCK.finditer(text):
+        kind = match.group(1).lower()
+        if kind not in ('vertex', 'linedef'):
+            continue
+        fields = dict(UDMF_FIELD.findall(match.group(2)))
+        try:
+            if kind == 'vertex':
+                vertices.append((float(fields['x']), float(fields['y'])))
+            else:
+                ends.append((int(fields['v1']), int(fields['v2'])))
+                two_sided.append(
+                    fields.get('twosided', '').strip().lower() == 'true'
+                    or 'sideback' in fields)
+        except (KeyError, ValueError):
+            continue
+    return (np.array(vertices, dtype=np.float32).reshape(-1, 2),
+            np.array(ends, dtype=np.int64).reshape(-1, 2),
+            np.array(two_sided, dtype=bool))
+
+
+def map_geometry(wad: WadDirectory, mapname: str) -> Geometry:
+    """Return the vertices and linedefs of a binary or UDMF map."""
+    textmap = wad.map_lump(mapname, 'TEXTMAP')
+    if textmap is not None:
+        return _udmf_geometry(bytes(wad.lump(textmap)).decode('utf-8', 'replace'))
+    return _binary_geometry(wad, mapname)
+
+
+def rasterize(vertices: np.ndarray, lines: np.ndarray, two_sided: np.ndarray,
+              size: Tuple[int, int] = PREVIEW_SIZE) -> np.ndarray:
+    """Draw every linedef into a ``size`` RGBA image at once.
+
+    Each line is sampled once per pixel along its major axis; all samples
+    of all lines are generated with repeat/cumsum arithmetic and written
+    with a single scatter into a two-layer mask, so one-sided walls are
+    drawn over two-sided lines regardless of linedef order.
+    """
+    width, height = size
+    image = np.zeros((2, height, width), dtype=bool)
+    if len(lines) and (lines.min() < 0 or lines.max() >= len(vertices)):
+        # Negative indices would silently wrap to the last vertices
+        valid = ((lines >= 0) & (lines < len(vertices))).all(axis=1)
+        lines, two_sided = lines[valid], two_sided[valid]
+    if len(lines):
+        used = np.zeros(len(vertices), dtype=bool)
+        used[lines.ravel()] = True
+        used = vertices[used]
+        lo, hi = used.min(axis=0), used.max(axis=0)
+        span = np.maximum(hi - lo, 1)
+        scale = min((width - 2 * MARGIN - 1) / span[0],
+                    (height - 2 * MARGIN - 1) / span[1])
+        # Centre the map and flip y, since map space grows upwards
+        offset = (np.array([width, height], np.float32) - span * scale) / 2
+        points = ((vertices - lo) * scale + offset).astype(np.float32)
+        points[:, 1] = height - 1 - points[:, 1]
+
+        x0, y0 = points[lines[:, 0]].T
+        x1, y1 = points[lines[:, 1]].T
+        dx, dy = x1 - x0, y1 - y0
+        counts = np.ceil(np.maximum(np.abs(dx), np.abs(dy))).astype(np.int64) + 1
+        length = np.maximum(counts - 1, 1).astype(np.float32)
+        step = np.arange(counts.sum(), dtype=np.float32)
+        step -= np.repeat((np.cumsum(counts) - counts).astype(np.float32), counts)
+        x = np.repeat(x0, counts) + np.repeat(dx / length, counts) * step
+        y = np.repeat(y0, counts) + np.repeat(dy / length, counts) * step
+        pixels = np.repeat(
+            np.where(two_sided, 0, height * width).astype(np.int32), counts)
+        pixels += np.clip(np.rint(y).astype(np.int32), 0, height - 1) * width
+        pixels += np.clip(np.rint(x).astype(np.int32), 0, width - 1)
+        image.reshape(-1)[pixels] = True
+    index = np.where(image[1], 2, image[0].astype(np.uint8))
+    return COLORS[index]
+
+
+def _open_map(path: str, map_id: str):
+    """Return a WAD directory holding ``map_id`` and the map's marker name.
+
+    ``map_id`` is ``MAP01`` for maps in a WAD, or ``member:MAP01`` for
+    maps in a WAD stored inside a PK3.
+    """
+    member, _, mapname = map_id.rpartition(':')
+    if not member:
+        return WadFile(path), mapname
+    with zipfile.ZipFile(path) as zf:
+        return WadBuffer(zf.read(member)), mapname
+
+
+def _cache_key(path: str, map_id: str, size: Tuple[int, int]) -> Optional[str]:
+    _path, _kind, digest = fingerprint(path)
+    if not digest:
+        return None
+    key = hashlib.blake2b(digest_size=16)
+    key.update(digest.encode('ascii'))
+    key.update(map_id.upper().encode('utf-8'))
+    key.update(struct.pack('<II', *size))
+    return key.hexdigest()
+
+
+def render_map(path: str, map_id: str,
+               size: Tuple[int, int] = PREVIEW_SIZE) -> np.ndarray:
+    """Render a map of ``path`` into an RGBA array, without caching."""
+    if ':' in map_id and not is_zip(path):
+        raise WadError(f'{path} is not a PK3')
+    wad, mapname = _open_map(path, map_id)
+    try:
+        if mapname.upper() not in wad.maps():
+            raise WadError(f'No map {mapname} in {os.path.basename(path)}')
+        geometry = map_geometry(wad, mapname)
+    finally:
+        if isinstance(wad, WadFile):
+            wad.close()
+    return rasterize(*geometry, size)
+
+
+def render_preview(path: str, map_id: str, size: Tuple[int, int] = PREVIEW_SIZE,
+                   cache: Optional[ThumbnailCache] = None) -> Optional[str]:
+    """Return the path of a cached PNG overview of a map, or None.
+
+    Previews are keyed by the archive fingerprint, map and size, so
+    flipping back to a map or reopening the launcher skips rendering.
+    """
+    cache = cache or ThumbnailCache(str(cache_dir() / 'maps'))
+    key = _cache_key(path, map_id, size)
+    if key is None:
+        return None
+    hit = cache.get(key)
+    if hit:
+        return hit
+    try:
+        rgba = render_map(path, map_id, size)
+    except (OSError, WadError, KeyError, zipfile.BadZipFile):
+        return None
+    return cache.put(key, rgba)
+
+
+if __name__ == '__main__':
+    # python -m src.map_preview <wad> <map> [out.png]
+    from PIL import Image
+    target, map_id = sys.argv[1], sys.argv[2]
+    out = sys.argv[3] if len(sys.argv) > 3 else f'{map_id.replace(":", "_")}.png'
+    Image.fromarray(render_map(target, map_id), 'RGBA').save(out)
+    print(out)
@@ -0,0 +1,194 @@
+"""Per-map statistics for WADs: geometry counts and things per skill."""
+
+import os
+import re
+import sys
+import json
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+import numpy as np
+
+from src.wad import WadDirectory, WadFile, WadError
+
+DOOM_THING = np.dtype([
+    ('x', '<i2'), ('y', '<i2'), ('angle', '<i2'),
+    ('type', '<u2'), ('flags', '<u2'),
+])
+
+HEXEN_THING = np.dtype([
+    ('tid', '<i2'), ('x', '<i2'), ('y', '<i2'), ('z', '<i2'),
+    ('angle', '<i2'), ('type', '<u2'), ('flags', '<u2'),
+    ('special', 'u1'), ('args', 'u1', (5,)),
+])
+
+# Record sizes of the binary map lumps (Doom, Hexen)
+LUMP_RECORDS = {
+    'LINEDEFS': (14, 16),
+    'SIDEDEFS': (30, 30),
+    'VERTEXES': (4, 4),
+    'SECTORS': (26, 26),
+}
+
+# Thing flag bits shared by both binary formats
+SKILL_BITS = (('easy', 0x0001), ('medium', 0x0002), ('hard', 0x0004))
+DOOM_MULTI_ONLY = 0x0010
+HEXEN_SINGLE = 0x0100
+
+MONSTER, ITEM, KEY = 1, 2, 4
+
+MONSTER_TYPES = (
+    7, 9, 16, 58, 64, 65, 66, 67, 68, 69, 71, 72, 84,
+    3001, 3002, 3003, 3004, 3005, 3006,
+)
+ITEM_TYPES = (
+    8, 17, 82, 83,
+    2001, 2002, 2003, 2004, 2005, 2006, 2007, 2008, 2010, 2011, 2012,
+    2013, 2014, 2015, 2018, 2019, 2022, 2023, 2024, 2025, 2026, 2045,
+    2046, 2047, 2048, 2049,
+)
+KEY_TYPES = (5, 6, 13, 38, 39, 40)
+
+# Category bitmask for every possible 16-bit editor number
+THING_CATEGORIES = np.zeros(0x10000, dtype=np.uint8)
+THING_CATEGORIES[list(MONSTER_TYPES)] |= MONSTER
+THING_CATEGORIES[list(ITEM_TYPES)] |= ITEM
+THING_CATEGORIES[list(KEY_TYPES)] |= KEY
+
+UDMF_COMMENTS = re.compile(r'//[^\n]*|/\*.*?\*/', re.S)
+UDMF_BLOCK = re.compile(r'\b(thing|linedef|sidedef|vertex|sector)\s*\{([^}]*)\}',
+                        re.I)
+UDMF_FIELD = re.compile(r'(\w+)\s*=\s*([^;]+);')
+
+
+def count_things(types: np.ndarray, flags: np.ndarray,
+                 single: np.ndarray) -> Dict[str, Dict[str, int]]:
+    """Count monsters, items and keys per skill using array masks."""
+    cats = THING_CATEGORIES[types]
+    monsters = (cats & MONSTER) != 0
+    items = (cats & ITEM) != 0
+    keys = (cats & KEY) != 0
+    result = {}
+    for skill, bit in SKILL_BITS:
+        present = single & ((flags & bit) != 0)
+        result[skill] = {
+            'monsters': int(np.count_nonzero(present & monsters)),
+            'items': int(np.count_nonzero(present & items)),
+            'keys': int(np.count_nonzero(present & keys)),
+        }
+    return result
+
+
+def _binary_map(wad: WadFile, start: int, stop: int) -> dict:
+    names = wad.names[start + 1:stop].tolist()
+    hexen = 'BEHAVIOR' in names
+    lumps = {name: start + 1 + i for i, name in enumerate(names)}
+    stats = {'format': 'hexen' if hexen else 'doom'}
+    for lump, sizes in LUMP_RECORDS.items():
+        idx = lumps.get(lump)
+        size = int(wad.sizes[idx]) if idx is not None else 0
+        stats[lump.lower()] = size // sizes[hexen]
+
+    idx = lumps.get('THINGS')
+    dtype = HEXEN_THING if hexen else DOOM_THING
+    data = wad.lump(idx) if idx is not None else b''
+    things = np.frombuffer(data, dtype, count=len(data) // dtype.itemsize)
+    flags = things['flags']
+    if hexen:
+        single = (flags & HEXEN_SINGLE) != 0
+    else:
+        single = (flags & DOOM_MULTI_ONLY) == 0
+    stats['things'] = len(things)
+    stats['skills'] = count_things(things['type'], flags, single)
+    return stats
+
+
+def _udmf_bool(value: str) -> bool:
+    return value.strip().lower() == 'true'
+
+
+def _udmf_map(text: str) -> dict:
+    text = UDMF_COMMENTS.sub('', text)
+    counts = {'linedefs': 0, 'sidedefs': 0, 'vertexes': 0, 'sectors': 0}
+    plural = {'linedef': 'linedefs', 'sidedef': 'sidedefs',
+              'vertex': 'vertexes', 'sector': 'sectors'}
+    types, flags, single = [], [], []
+    for match in UDMF_BLOCK.finditer(text):
+        kind = match.group(1).lower()
+        if kind != 'thing':
+            counts[plural[kind]] += 1
+            continue
+        fields = dict(UDMF_FIELD.findall(match.group(2)))
+        try:
+            thing_type = int(fields.get('type', '0')) & 0xFFFF
+        except ValueError:
+            continue  # a malformed thing; count the rest of the map
+        bits = 0
+        for (skill, bit), field in zip(SKILL_BITS, ('skill2', 'skill3', 'skill4')):
+            if _udmf_bool(fields.get(field, 'false')):
+                bits |= bit
+        types.append(thing_type)
+        flags.append(bits)
+        single.append(_udmf_bool(fields.get('single', 'false')))
+    stats = {'format': 'udmf', **counts, 'things': len(types)}
+    stats['skills'] = count_things(
+        np.array(types, dtype=np.uint16),
+        np.array(flags, dtype=np.uint16),
+        np.array(single, dtype=bool),
+    )
+    return stats
+
+
+def analyze_wad(wad: WadDirectory) -> Dict[str, dict]:
+    """Return ``{mapname: stats}`` for every map block in ``wad``."""
+    results = {}
+    for name, (start, stop) in wad.maps().items():
+        if start + 1 < len(wad) and wad.name(start + 1) == 'TEXTMAP':
+            text = bytes(wad.lump(start + 1)).decode('utf-8', 'replace')
+            results[name] = _udmf_map(text)
+        else:
+            results[name] = _binary_map(wad, start, stop)
+    return results
+
+
+def analyze_file(path: str) -> Optional[Dict[str, dict]]:
+    """Return map statistics for a WAD on disk, or None if unreadable."""
+    try:
+        with WadFile(path) as wad:
+            return analyze_wad(wad)
+    except (OSError, WadError):
+        return None
+
+
+def analyze_folder(folder: str, workers: Optional[int] = None) -> Dict[str, dict]:
+    """Analyze every ``.wad`` below ``folder`` across a process pool."""
+    paths = []
+    for root, _dirs, files in os.walk(folder):
+        paths.extend(
+            os.path.join(root, f) for f in files if f.lower().endswith('.wad'))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(analyze_file, paths, chunksize=8)
+        return {p: r for p, r in zip(paths, results) if r}
+
+
+def format_stats(name: str, stats: dict) -> str:
+    """Render one map's statistics as a single line for the info panel."""
+    skills = stats['skills']
+    monsters = '/'.join(str(skills[s]['monsters']) for s, _ in SKILL_BITS)
+    items = '/'.join(str(skills[s]['items']) for s, _ in SKILL_BITS)
+    return (
+        f' {name}: {stats["things"]} things, {stats["linedefs"]} lines, '
+        f'{stats["sectors"]} sectors; monsters {monsters}, '
+        f'items {items}, keys {skills["hard"]["keys"]}'
+    )
+
+
+if __name__ == '__main__':
+    # Batch mode: python -m src.map_stats <folder-or-wad>
+    target = sys.argv[1] if len(sys.argv) > 1 else '.'
+    if os.path.isdir(target):
+        report = analyze_folder(target)
+    else:
+        report = {target: analyze_file(target)}
+    json.dump(report, sys.stdout, indent=2)
+    print()
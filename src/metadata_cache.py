@@ -0,0 +1,87 @@
+"""Persistent cache of parsed mod metadata."""
+
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Optional
+
+from src.paths import config_dir
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS metadata (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    record TEXT NOT NULL
+)
+"""
+
+
+class MetadataCache:
+    """SQLite-backed store of per-file records keyed by path.
+
+    A record is only returned while the file's ``(st_size, st_mtime_ns)``
+    still match what was stored, so edits on disk invalidate it. Hits are
+    served from an in-memory dict in front of the database.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self._path = path
+        self._conn = None
+        self._memory: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            path = self._path or str(config_dir() / 'metadata.sqlite')
+            conn = sqlite3.connect(path, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def get(self, path: str, stat: os.stat_result) -> Optional[Dict[str, Any]]:
+        """Return the cached record for ``path`` if it is still fresh."""
+        key = (stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            hit = self._memory.get(path)
+            if hit is None:
+                try:
+                    row = self._connect().execute(
+                        'SELECT size, mtime_ns, record FROM metadata '
+                        'WHERE path = ?', (path,)).fetchone()
+                except sqlite3.Error:
+                    return None
+                if row is None:
+                    return None
+                hit = ((row[0], row[1]), json.loads(row[2]))
+                self._memory[path] = hit
+        if hit[0] != key:
+            return None
+        return hit[1]
+
+    def put(self, path: str, stat: os.stat_result, record: Dict[str, Any]):
+        """Store ``record`` for ``path`` as of ``stat``."""
+        key = (stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            self._memory[path] = (key, record)
+            try:
+                conn = self._connect()
+                conn.execute(
+                    'INSERT OR REPLACE INTO metadata VALUES (?, ?, ?, ?)',
+                    (path, key[0], key[1], json.dumps(record)))
+                conn.commit()
+            except sqlite3.Error:
+                pass  # The in-memory copy still serves this session
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# Global cache instance, connected on first use
+metadata_cache = MetadataCache()
@@ -0,0 +1,31 @@
+"""Per-user locations for launcher configuration and caches."""
+
+import os
+from pathlib import Path
+
+APP_NAME = 'doomed-by-python'
+
+
+def _base(env_var: str, xdg_var: str, xdg_default: Path, win_var: str) -> Path:
+    override = os.getenv(env_var)
+    if override:
+        return Path(override).expanduser()
+    if os.name == 'nt':
+        return Path(os.getenv(win_var) or Path.home()) / APP_NAME
+    return Path(os.getenv(xdg_var) or xdg_default) / APP_NAME
+
+
+def config_dir() -> Path:
+    """Return (and create) the configuration directory."""
+    path = _base('DOOMED_CONFIG_DIR', 'XDG_CONFIG_HOME',
+                 Path.home() / '.config', 'APPDATA')
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def cache_dir() -> Path:
+    """Return (and create) the cache directory."""
+    path = _base('DOOMED_CACHE_DIR', 'XDG_CACHE_HOME',
+                 Path.home() / '.cache', 'LOCALAPPDATA')
+    path.mkdir(parents=True, exist_ok=True)
+    return path
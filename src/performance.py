@@ -16,6 +16,14 @@ class PerformanceSettings:
         'sprite_frame_caching': True,
         'reduce_paint_events': True,
         'optimize_visibility_checks': True,
+        'log_capacity': 5000,  # Lines kept by the log window
+        'prefetch_enabled': True,  # Warm the page cache before launching
+        'prefetch_rate_mb': 200,  # Prefetch read limit in MB/s (0 = unlimited)
+        'prefetch_threads': 4,  # Files prefetched in parallel
+        'telemetry_interval_ms': 500,  # Port resource sampling interval
+        'telemetry_samples': 3600,  # Samples kept per launch
+        'max_instances': 4,  # Source ports allowed to run at once
+        'pixmap_cache_mb': 32,  # Memory shared by generated textures and sprites
     }
     
     def __init__(self):
@@ -30,6 +38,12 @@ class PerformanceSettings:
             'DOOMED_SCALING_QUALITY': ('skull_scaling_quality', str),
             'DOOMED_ANTIALIASING': ('enable_antialiasing', lambda x: x.lower() == 'true'),
             'DOOMED_BACKGROUND_ANIM': ('background_animation_enabled', lambda x: x.lower() == 'true'),
+            'DOOMED_LOG_LINES': ('log_capacity', int),
+            'DOOMED_PREFETCH': ('prefetch_enabled', lambda x: x.lower() == 'true'),
+            'DOOMED_PREFETCH_RATE': ('prefetch_rate_mb', float),
+            'DOOMED_TELEMETRY_MS': ('telemetry_interval_ms', int),
+            'DOOMED_MAX_INSTANCES': ('max_instances', int),
+            'DOOMED_PIXMAP_CACHE_MB': ('pixmap_cache_mb', float),
         }
         
         for env_var, (setting_key, converter) in env_mappings.items():
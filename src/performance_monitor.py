@@ -6,6 +6,8 @@ import os
 from typing import Dict, List
 from PyQt5.QtCore import QTimer, QObject, pyqtSignal
 
+from src.pixmap_cache import pixmap_cache
+
 class PerformanceMonitor(QObject):
     """Monitor application performance metrics."""
     
@@ -66,7 +68,8 @@ class PerformanceMonitor(QObject):
                 'cpu_percent': round(cpu_percent, 1),
                 'paint_events_per_sec': self.paint_count,
                 'timer_events_per_sec': self.timer_count,
-                'frame_count': len(self.frame_times)
+                'frame_count': len(self.frame_times),
+                'pixmap_cache': pixmap_cache.stats()
             }
             
             # Reset counters
@@ -0,0 +1,104 @@
+"""Generated pixmaps shared by the widgets, bounded by memory."""
+
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional
+
+from PyQt5.QtGui import QImage
+
+# Import performance settings with fallback
+try:
+    from src.performance import perf_settings
+except ImportError:
+    class FallbackPerfSettings:
+        def get(self, key, default=None):
+            return default
+    perf_settings = FallbackPerfSettings()
+
+
+def pixmap_bytes(pixmap) -> int:
+    """Approximate memory held by a QPixmap or QImage."""
+    if isinstance(pixmap, QImage):
+        return pixmap.sizeInBytes()
+    return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+
+
+class PixmapCache:
+    """LRU cache of pixmaps and images with a byte budget.
+
+    Keys are tuples starting with the kind of texture, e.g.
+    ``('blood', width, height, frame)``, so every widget can share one
+    envelope without colliding. Entries are evicted least recently used
+    first until the total fits ``budget``; an entry larger than the
+    whole budget is returned but not kept. Pixmaps may only be used on
+    the GUI thread, so the cache takes no lock.
+    """
+
+    def __init__(self, budget: Optional[int] = None):
+        if budget is None:
+            budget = int(perf_settings.get('pixmap_cache_mb', 32) * 1024 * 1024)
+        self.budget = budget
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key: Hashable):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key: Hashable, pixmap):
+        self.discard(key)
+        cost = pixmap_bytes(pixmap)
+        if cost > self.budget:
+            return pixmap
+        self._entries[key] = (pixmap, cost)
+        self.bytes += cost
+        self._trim()
+        return pixmap
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], object]):
+        """Return the cached entry for ``key``, creating it on a miss."""
+        pixmap = self.get(key)
+        if pixmap is None:
+            pixmap = self.put(key, factory())
+        return pixmap
+
+    def discard(self, key: Hashable):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[1]
+
+    def set_budget(self, budget: int):
+        self.budget = budget
+        self._trim()
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+
+    def _trim(self):
+        while self.bytes > self.budget and self._entries:
+            _key, (_pixmap, cost) = self._entries.popitem(last=False)
+            self.bytes -= cost
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {'entries': len(self._entries), 'bytes': self.bytes,
+                'budget': self.budget, 'hits': self.hits,
+                'misses': self.misses, 'evictions': self.evictions}
+
+
+# Global instance shared by every widget
+pixmap_cache = PixmapCache()
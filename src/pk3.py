@@ -0,0 +1,136 @@
+"""PK3 inspection, including WADs nested inside the archive."""
+
+import os
+import struct
+import zipfile
+import zlib
+from typing import BinaryIO, Dict, List
+
+from src.wad import ENTRY_SIZE, HEADER, WadDirectory, WadError, parse_directory, read_header
+
+LOCAL_HEADER = struct.Struct('<4s5H3I2H')
+LOCAL_MAGIC = b'PK\x03\x04'
+SKIP_CHUNK = 1024 * 1024
+
+
+def is_zip(path: str) -> bool:
+    """Sniff the local-header magic instead of scanning for the end record."""
+    with open(path, 'rb') as fh:
+        return fh.read(4) in (LOCAL_MAGIC, b'PK\x05\x06')
+
+
+def _read_exact(fh: BinaryIO, size: int) -> bytes:
+    data = fh.read(size)
+    if len(data) != size:
+        raise WadError('Nested WAD is truncated')
+    return data
+
+
+def _skip(fh: BinaryIO, size: int):
+    # Decompressing streams only move forward, so discard in chunks
+    while size > 0:
+        chunk = fh.read(min(size, SKIP_CHUNK))
+        if not chunk:
+            raise WadError('Nested WAD is truncated')
+        size -= len(chunk)
+
+
+class Pk3Inspector:
+    """Reads a PK3's central directory once and looks inside nested WADs.
+
+    Stored members are read by seeking straight to their bytes in the
+    archive; compressed members are decompressed as a stream, keeping
+    only the WAD header and directory. Nothing is extracted to disk and
+    no member is held in memory whole.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.zip = zipfile.ZipFile(path)
+        try:
+            self.infos = self.zip.infolist()
+            self._raw = open(path, 'rb')
+        except BaseException:
+            self.zip.close()
+            raise
+        self._size = os.fstat(self._raw.fileno()).st_size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._raw.close()
+        self.zip.close()
+
+    def files(self) -> List[zipfile.ZipInfo]:
+        return [zi for zi in self.infos if not zi.is_dir()]
+
+    def folders(self) -> Dict[str, int]:
+        """Count entries per top-level folder (``''`` for the root)."""
+        counts: Dict[str, int] = {}
+        for zi in self.files():
+            top = zi.filename.split('/', 1)[0].lower() if '/' in zi.filename else ''
+            counts[top] = counts.get(top, 0) + 1
+        return counts
+
+    def nested_wads(self) -> List[zipfile.ZipInfo]:
+        return [
+            zi for zi in self.files()
+            if zi.filename.lower().endswith('.wad') and not zi.flag_bits & 0x1
+        ]
+
+    def _data_offset(self, zi: zipfile.ZipInfo) -> int:
+        # The central directory is not trusted to point inside the file
+        if zi.header_offset + LOCAL_HEADER.size > self._size:
+            raise WadError(f'Local header of {zi.filename} lies past end of file')
+        self._raw.seek(zi.header_offset)
+        fields = LOCAL_HEADER.unpack(_read_exact(self._raw, LOCAL_HEADER.size))
+        if fields[0] != LOCAL_MAGIC:
+            raise WadError(f'Bad local header for {zi.filename}')
+        name_len, extra_len = fields[-2], fields[-1]
+        start = zi.header_offset + LOCAL_HEADER.size + name_len + extra_len
+        if start + zi.compress_size > self._size:
+            raise WadError(f'Member {zi.filename} runs past end of file')
+        return start
+
+    def nested_directory(self, zi: zipfile.ZipInfo) -> WadDirectory:
+        """Return the lump directory of the WAD stored as member ``zi``."""
+        if zi.compress_type == zipfile.ZIP_STORED:
+            start = self._data_offset(zi)
+            self._raw.seek(start)
+            ident, num, offset = read_header(_read_exact(self._raw, HEADER.size))
+            length = num * ENTRY_SIZE
+            if offset < HEADER.size or offset + length > zi.file_size:
+                raise WadError('Nested lump directory runs past member end')
+            self._raw.seek(start + offset)
+            raw = _read_exact(self._raw, length)
+        else:
+            with self.zip.open(zi) as fh:
+                ident, num, offset = read_header(_read_exact(fh, HEADER.size))
+                length = num * ENTRY_SIZE
+                if offset < HEADER.size or offset + length > zi.file_size:
+                    raise WadError('Nested lump directory runs past member end')
+                _skip(fh, offset - HEADER.size)
+                raw = _read_exact(fh, length)
+        return WadDirectory(ident, parse_directory(raw, num))
+
+    def nested_summary(self) -> List[dict]:
+        """Summarize every nested WAD: lump count and map names."""
+        result = []
+        for zi in self.nested_wads():
+            try:
+                directory = self.nested_directory(zi)
+            except (OSError, WadError, zipfile.BadZipFile, RuntimeError,
+                    zlib.error, EOFError) as exc:
+                result.append({'name': zi.filename, 'error': str(exc)})
+                continue
+            result.append({
+                'name': zi.filename,
+                'ident': directory.ident,
+                'entries': len(directory),
+                'maps': list(directory.maps()),
+            })
+        return result
@@ -0,0 +1,186 @@
+"""Warm the page cache with the files of a launch before the port runs.
+
+Local files get ``posix_fadvise(WILLNEED)``, which makes the kernel
+read them ahead asynchronously. Advice does not help on network
+filesystems, and is not available everywhere, so there the files are
+read sequentially instead, several files at a time. Both paths go
+through a shared byte-rate limit and stop as soon as the run is
+cancelled.
+"""
+
+import os
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from src.workers import BackgroundJobs
+
+# Import performance settings with fallback
+try:
+    from src.performance import perf_settings
+except ImportError:
+    class FallbackPerfSettings:
+        def get(self, key, default=None):
+            return default
+    perf_settings = FallbackPerfSettings()
+
+PREFETCH_CHUNK = 4 * 1024 * 1024
+SCHEDULE_DELAY_MS = 500
+# Files read this long ago may have been evicted again
+WARM_SECONDS = 600
+NETWORK_FILESYSTEMS = {
+    'nfs', 'nfs4', 'cifs', 'smb3', 'smbfs', '9p', 'afs', 'ceph',
+    'glusterfs', 'davfs', 'fuse.sshfs', 'fuse.rclone', 'fuse.s3fs',
+}
+
+
+@lru_cache(maxsize=1)
+def _mounts() -> Tuple[Tuple[str, str], ...]:
+    """``(mount point, fs type)`` pairs, longest mount point first."""
+    try:
+        with open('/proc/self/mounts', 'r') as fh:
+            mounts = [line.split()[1:3] for line in fh if line.strip()]
+    except OSError:
+        return ()
+    mounts = [(point.replace('\\040', ' '), kind) for point, kind in mounts]
+    return tuple(sorted(mounts, key=lambda m: len(m[0]), reverse=True))
+
+
+def filesystem_type(path: str) -> str:
+    """Return the type of the filesystem holding ``path``, or ''."""
+    path = os.path.realpath(path)
+    for point, kind in _mounts():
+        if path == point or path.startswith(point.rstrip('/') + '/'):
+            return kind
+    return ''
+
+
+class RateLimiter:
+    """Token bucket shared by the prefetch workers (bytes per second)."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self._lock = threading.Lock()
+        self._next = time.monotonic()
+
+    def take(self, amount: int, cancelled: threading.Event):
+        if self.rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(self._next, now)
+            self._next = start + amount / self.rate
+        if start > now:
+            cancelled.wait(start - now)
+
+
+def prefetch_file(path: str, limiter: RateLimiter,
+                  cancelled: threading.Event) -> Tuple[Tuple[int, int], int]:
+    """Pull ``path`` into the page cache.
+
+    Returns ``((size, mtime_ns), bytes)`` where ``bytes`` is how much
+    was advised or read before finishing or being cancelled.
+    """
+    with open(path, 'rb', buffering=0) as fh:
+        fd = fh.fileno()
+        st = os.fstat(fd)
+        done = 0
+        if hasattr(os, 'posix_fadvise') \
+                and filesystem_type(path) not in NETWORK_FILESYSTEMS:
+            while done < st.st_size and not cancelled.is_set():
+                amount = min(PREFETCH_CHUNK, st.st_size - done)
+                limiter.take(amount, cancelled)
+                os.posix_fadvise(fd, done, amount, os.POSIX_FADV_WILLNEED)
+                done += amount
+        else:
+            buffer = bytearray(PREFETCH_CHUNK)
+            while not cancelled.is_set():
+                limiter.take(PREFETCH_CHUNK, cancelled)
+                read = fh.readinto(buffer)
+                if not read:
+                    break
+                done += read
+    return (st.st_size, st.st_mtime_ns), done
+
+
+class Prefetcher(QObject):
+    """Warms the files of the selected profile in the background.
+
+    :meth:`schedule` is cheap and debounced, so it can be called on
+    every profile switch or list edit; only the last file set is
+    fetched, in load order. Files already warmed recently and unchanged
+    since are skipped. :meth:`cancel` stops a run mid-file, e.g. when
+    the port is started and should have the disk to itself.
+    """
+
+    finished = pyqtSignal(int)  # bytes warmed by the run
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.enabled = perf_settings.get('prefetch_enabled', True)
+        self.limiter = RateLimiter(perf_settings.get('prefetch_rate_mb', 200) * 1024 * 1024)
+        self.jobs = BackgroundJobs(self, maxThreads=perf_settings.get('prefetch_threads', 4))
+        self.jobs.resultReady.connect(self._onDone)
+        self._warm: Dict[str, Tuple[Tuple[int, int], float]] = {}
+        self._paths: List[str] = []
+        self._running: set = set()
+        self._bytes = 0
+        self._cancelled = threading.Event()
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(SCHEDULE_DELAY_MS)
+        self._timer.timeout.connect(self._start)
+
+    def schedule(self, paths: Iterable[str]):
+        """Prefetch ``paths`` once they stop changing for a moment."""
+        if not self.enabled:
+            return
+        self._paths = list(dict.fromkeys(paths))
+        self._timer.start()
+
+    def cancel(self):
+        self._timer.stop()
+        self._cancelled.set()
+        self.jobs.cancel()
+        self._running.clear()
+
+    def _key(self, path: str) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_size, st.st_mtime_ns
+
+    def isWarm(self, paths: Iterable[str]) -> bool:
+        """Whether every file in ``paths`` was prefetched recently."""
+        now = time.monotonic()
+        for path in paths:
+            hit = self._warm.get(path)
+            if hit is None or now - hit[1] > WARM_SECONDS or hit[0] != self._key(path):
+                return False
+        return True
+
+    def _start(self):
+        self.cancel()
+        self._cancelled = threading.Event()
+        self._bytes = 0
+        for path in self._paths:
+            if path in self._running or self.isWarm([path]):
+                continue
+            self._running.add(path)
+            self.jobs.submit(path, prefetch_file, path, self.limiter, self._cancelled)
+        if not self._running:
+            self.finished.emit(0)
+
+    def _onDone(self, path, result):
+        self._running.discard(path)
+        if not isinstance(result, Exception):
+            key, done = result
+            self._bytes += done
+            if done >= key[0]:
+                self._warm[path] = (key, time.monotonic())
+        if not self._running:
+            self.finished.emit(self._bytes)
@@ -0,0 +1,229 @@
+"""Named launch profiles with prebuilt, pre-validated command lines."""
+
+import os
+import shlex
+import shutil
+import threading
+import weakref
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from PyQt5.QtCore import QObject, QFileSystemWatcher, QTimer, QProcessEnvironment, pyqtSignal
+
+from src.config_store import read_config, write_json_atomic
+from src.paths import config_dir
+from src.workers import BackgroundJobs
+
+PROFILES_NAME = 'profiles.json'
+SAVE_DELAY_MS = 500
+
+
+class LaunchCommand(NamedTuple):
+    program: str
+    args: List[str]
+    env: Optional[QProcessEnvironment]
+    errors: List[str]
+
+
+class LaunchProfile:
+    """Source port, IWAD, ordered PWADs, options and environment.
+
+    :meth:`command` builds the argument list once and keeps it until
+    :meth:`invalidate` is called, which :class:`ProfileStore` does when
+    one of the referenced files changes on disk. Commands are built on
+    worker threads too; one that was started before an invalidation is
+    returned to its caller but not kept.
+    """
+
+    FIELDS = ('port', 'iwad', 'pwads', 'options', 'env')
+
+    def __init__(self, name: str = '', port: str = 'gzdoom', iwad: str = '',
+                 pwads: Iterable[str] = (), options: str = '',
+                 env: Optional[Dict[str, str]] = None):
+        self.name = name
+        self.port = port
+        self.iwad = iwad
+        self.pwads = tuple(pwads)
+        self.options = options
+        self.env = dict(env or {})
+        self._command: Optional[LaunchCommand] = None
+        self._version = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_dict(cls, name: str, data: dict) -> 'LaunchProfile':
+        return cls(name, **{k: data[k] for k in cls.FIELDS if k in data})
+
+    def to_dict(self) -> dict:
+        return {'port': self.port, 'iwad': self.iwad, 'pwads': list(self.pwads),
+                'options': self.options, 'env': self.env}
+
+    def fields(self) -> Tuple:
+        return (self.port, self.iwad, self.pwads, self.options,
+                tuple(sorted(self.env.items())))
+
+    def files(self) -> List[str]:
+        """Every file the command line depends on."""
+        files = [p for p in (self.iwad, *self.pwads) if p]
+        if os.sep in self.port or (os.altsep and os.altsep in self.port):
+            files.append(self.port)
+        return files
+
+    def invalidate(self):
+        with self._lock:
+            self._version += 1
+            self._command = None
+
+    def compile(self) -> LaunchCommand:
+        """Validate the referenced files and build the argument list."""
+        errors = []
+        program = self.port
+        if not program:
+            errors.append('No source port set')
+        elif not (os.sep in program or (os.altsep and os.altsep in program)):
+            program = shutil.which(program) or program
+        if program and not os.access(program, os.X_OK):
+            errors.append(f'Source port not executable: {program}')
+        for path in (self.iwad, *self.pwads):
+            if path and not os.access(path, os.R_OK):
+                errors.append(f'Missing or unreadable: {path}')
+        args = []
+        if self.iwad:
+            args += ['-iwad', self.iwad]
+        if self.pwads:
+            args += ['-file', *self.pwads]
+        if self.options:
+            try:
+                args += shlex.split(self.options)
+            except ValueError as exc:
+                errors.append(f'Bad options: {exc}')
+        env = None
+        if self.env:
+            env = QProcessEnvironment.systemEnvironment()
+            for key, value in self.env.items():
+                env.insert(key, str(value))
+        return LaunchCommand(program, args, env, errors)
+
+    def command(self) -> LaunchCommand:
+        """Return the cached command, building it on first use."""
+        with self._lock:
+            command, version = self._command, self._version
+        if command is None:
+            command = self.compile()
+            with self._lock:
+                if self._version == version:
+                    self._command = command
+        return command
+
+
+class ProfileStore(QObject):
+    """Profiles indexed by name, plus an index of the files they use.
+
+    Referenced files are watched; a change invalidates only the profiles
+    that use that file, and their commands are rebuilt on the worker
+    pool so the next switch or launch finds them ready. The store is
+    saved to ``profiles.json`` in the config directory, debounced and
+    atomically.
+    """
+
+    profilesChanged = pyqtSignal()
+
+    def __init__(self, path=None, parent=None):
+        super().__init__(parent)
+        self.path = path or str(config_dir() / PROFILES_NAME)
+        self.profiles: Dict[str, LaunchProfile] = {}
+        self._users: Dict[str, weakref.WeakSet] = {}
+        self._dirty = False
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(self._onFileChanged)
+        self.watcher.directoryChanged.connect(self._onDirectoryChanged)
+        self._missing: Dict[str, Set[str]] = {}
+        self.jobs = BackgroundJobs(self, maxThreads=1)
+        self._saveTimer = QTimer(self)
+        self._saveTimer.setSingleShot(True)
+        self._saveTimer.setInterval(SAVE_DELAY_MS)
+        self._saveTimer.timeout.connect(self.flush)
+        data = read_config(self.path) or {}
+        for name, fields in data.items():
+            if isinstance(fields, dict):
+                self._add(LaunchProfile.from_dict(name, fields))
+
+    def names(self) -> List[str]:
+        return sorted(self.profiles, key=str.lower)
+
+    def get(self, name: str) -> Optional[LaunchProfile]:
+        return self.profiles.get(name)
+
+    def _add(self, profile: LaunchProfile):
+        self.profiles[profile.name] = profile
+        self.watch(profile)
+
+    def put(self, profile: LaunchProfile):
+        """Add or replace the profile named ``profile.name``."""
+        self.profiles.pop(profile.name, None)
+        self._add(profile)
+        self._dirty = True
+        self._saveTimer.start()
+        self.profilesChanged.emit()
+
+    def remove(self, name: str):
+        if self.profiles.pop(name, None) is not None:
+            self._dirty = True
+            self._saveTimer.start()
+            self.profilesChanged.emit()
+
+    def watch(self, profile: LaunchProfile):
+        """Invalidate ``profile`` when a file it references changes.
+
+        Profiles are held weakly, so unsaved working profiles can be
+        watched too and simply drop out once discarded. Files that do
+        not exist yet are picked up when they appear in their folder.
+        """
+        watched = set(self.watcher.files())
+        for path in profile.files():
+            users = self._users.get(path)
+            if users is None:
+                users = self._users[path] = weakref.WeakSet()
+            users.add(profile)
+            if path not in watched:
+                self._track(path)
+        if profile._command is None:
+            self.jobs.submit(profile.name, profile.command)
+
+    def _track(self, path: str):
+        # Watch the file itself, or its folder until the file exists
+        if os.path.exists(path):
+            self.watcher.addPath(path)
+            return
+        folder = os.path.dirname(path) or os.curdir
+        self._missing.setdefault(folder, set()).add(path)
+        if os.path.isdir(folder) and folder not in self.watcher.directories():
+            self.watcher.addPath(folder)
+
+    def _invalidateUsers(self, path: str):
+        for profile in list(self._users.get(path, ())):
+            profile.invalidate()
+            self.jobs.submit(profile.name, profile.command)
+
+    def _onFileChanged(self, path):
+        self._invalidateUsers(path)
+        # Files replaced by rename or deleted drop out of the watcher
+        if path not in self.watcher.files():
+            self._track(path)
+
+    def _onDirectoryChanged(self, folder):
+        paths = self._missing.get(folder, set())
+        for path in [p for p in paths if os.path.exists(p)]:
+            paths.discard(path)
+            self.watcher.addPath(path)
+            self._invalidateUsers(path)
+        if not paths:
+            self._missing.pop(folder, None)
+            self.watcher.removePath(folder)
+
+    def flush(self):
+        self._saveTimer.stop()
+        if not self._dirty:
+            return
+        self._dirty = False
+        write_json_atomic(self.path, {
+            name: profile.to_dict() for name, profile in self.profiles.items()})
@@ -0,0 +1,202 @@
+"""Per-launch log files with an incremental line index.
+
+Each launch streams its output to ``<session>.log`` from a writer
+thread and appends the end offset of every line to ``<session>.log.idx``
+(little-endian uint64). Readers memory-map the index, so jumping to a
+line or searching a huge log never loads the log itself into memory.
+Finished sessions are gzipped and the oldest are deleted once the
+directory exceeds its size budget.
+"""
+
+import datetime
+import gzip
+import os
+import queue
+import re
+import shutil
+import threading
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+from src.paths import cache_dir
+
+LOG_BUDGET = 256 * 1024 * 1024
+KEEP_SESSIONS = 50
+SEARCH_CHUNK = 4 * 1024 * 1024
+INDEX_DTYPE = np.dtype('<u8')
+
+
+def sessions_dir() -> Path:
+    path = cache_dir() / 'sessions'
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def index_path(log_path) -> str:
+    """Return the index file of a session, compressed or not."""
+    log_path = str(log_path)
+    if log_path.endswith('.gz'):
+        log_path = log_path[:-3]
+    return f'{log_path}.idx'
+
+
+class SessionWriter:
+    """Streams one launch's output to disk on a background thread.
+
+    :meth:`write` only queues bytes, so the GUI thread never waits on
+    the disk. Data should be whole lines; a trailing partial line is
+    indexed once its newline arrives.
+    """
+
+    def __init__(self, directory=None, name: Optional[str] = None):
+        directory = Path(directory) if directory else sessions_dir()
+        name = name or datetime.datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+        self.path = str(directory / f'{name}.log')
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='session-log', daemon=True)
+        self._thread.start()
+
+    def write(self, data: bytes):
+        if data:
+            self._queue.put(data)
+
+    def close(self):
+        """Flush everything queued and stop the writer thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        written = 0
+        with open(self.path, 'wb') as log, open(index_path(self.path), 'wb') as idx:
+            while True:
+                chunks = [self._queue.get()]
+                # Drain whatever else is waiting into the same write
+                while chunks[-1] is not None:
+                    try:
+                        chunks.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                done = chunks[-1] is None
+                data = b''.join(c for c in chunks if c is not None)
+                if data:
+                    log.write(data)
+                    ends = np.flatnonzero(np.frombuffer(data, np.uint8) == 0x0A)
+                    idx.write((ends + written + 1).astype(INDEX_DTYPE).tobytes())
+                    written += len(data)
+                    log.flush()
+                    idx.flush()
+                if done:
+                    return
+
+
+class SessionReader:
+    """Random access and regex search over a session log on disk."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.index = index_path(self.path)
+
+    def _ends(self) -> np.ndarray:
+        # Re-mapped on every call: a live session keeps growing
+        try:
+            count = os.path.getsize(self.index) // INDEX_DTYPE.itemsize
+        except OSError:
+            count = 0
+        if count == 0:
+            return np.empty(0, dtype=INDEX_DTYPE)
+        return np.memmap(self.index, dtype=INDEX_DTYPE, mode='r', shape=(count,))
+
+    def __len__(self):
+        try:
+            return os.path.getsize(self.index) // INDEX_DTYPE.itemsize
+        except OSError:
+            return 0
+
+    def _open(self):
+        if self.path.endswith('.gz'):
+            return gzip.open(self.path, 'rb')
+        return open(self.path, 'rb')
+
+    def lines(self, start: int, count: int) -> List[str]:
+        """Return up to ``count`` lines starting at line ``start``."""
+        ends = self._ends()
+        start = max(0, min(start, len(ends)))
+        stop = min(len(ends), start + count)
+        if start >= stop:
+            return []
+        begin = int(ends[start - 1]) if start else 0
+        end = int(ends[stop - 1])
+        with self._open() as fh:
+            fh.seek(begin)
+            data = fh.read(end - begin)
+        return data.decode('utf-8', 'replace').splitlines()
+
+    def search(self, pattern: str, start: int = 0,
+               flags: int = re.IGNORECASE) -> Optional[int]:
+        """Return the first line at or after ``start`` matching ``pattern``.
+
+        The log is scanned in fixed-size chunks cut at line boundaries;
+        match offsets are mapped to line numbers through the index.
+        """
+        regex = re.compile(pattern.encode('utf-8'), flags | re.MULTILINE)
+        ends = self._ends()
+        if start >= len(ends):
+            return None
+        offset = int(ends[start - 1]) if start else 0
+        limit = int(ends[-1])
+        carry = b''
+        with self._open() as fh:
+            fh.seek(offset)
+            while offset < limit:
+                chunk = fh.read(min(SEARCH_CHUNK, limit - offset))
+                if not chunk:
+                    break
+                offset += len(chunk)
+                data = carry + chunk
+                cut = data.rfind(b'\n') + 1 if offset < limit else len(data)
+                match = regex.search(data, 0, cut)
+                if match:
+                    pos = offset - len(data) + match.start()
+                    return int(np.searchsorted(ends, pos, side='right'))
+                carry = data[cut:]
+        return None
+
+
+def list_sessions(directory=None) -> List[str]:
+    """Return session logs, newest first."""
+    directory = Path(directory) if directory else sessions_dir()
+    logs = [str(p) for p in directory.iterdir()
+            if p.name.endswith(('.log', '.log.gz'))]
+    return sorted(logs, key=lambda p: os.path.basename(p), reverse=True)
+
+
+def rotate_sessions(directory=None, budget: int = LOG_BUDGET,
+                    keep: int = KEEP_SESSIONS, active: Iterable[str] = ()):
+    """Compress finished sessions and drop the oldest beyond the limits.
+
+    ``active`` names the logs still being written or shown in a log
+    window, which are left alone.
+    """
+    active = set(active)
+    sessions = [p for p in list_sessions(directory) if p not in active]
+    for path in sessions:
+        if path.endswith('.log'):
+            with open(path, 'rb') as src, gzip.open(f'{path}.gz.tmp', 'wb', 6) as dst:
+                shutil.copyfileobj(src, dst, SEARCH_CHUNK)
+            os.replace(f'{path}.gz.tmp', f'{path}.gz')
+            os.remove(path)
+    total = 0
+    for i, path in enumerate(list_sessions(directory)):
+        if path in active:
+            continue
+        files = [path, index_path(path)]
+        size = sum(os.path.getsize(f) for f in files if os.path.exists(f))
+        total += size
+        if i >= keep or total > budget:
+            for f in files:
+                try:
+                    os.remove(f)
+                except OSError:
+                    pass
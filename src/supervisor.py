@@ -0,0 +1,204 @@
+"""Running several source-port instances side by side."""
+
+import time
+from collections import deque
+from typing import List, Optional
+
+from PyQt5.QtCore import QObject, QProcess, QProcessEnvironment, QTimer, pyqtSignal
+
+from src.profiles import LaunchCommand
+from src.session_log import SessionWriter
+from src.telemetry import ProcessSampler
+
+# Import performance settings with fallback
+try:
+    from src.performance import perf_settings
+except ImportError:
+    class FallbackPerfSettings:
+        def get(self, key, default=None):
+            return default
+    perf_settings = FallbackPerfSettings()
+
+KILL_DELAY_MS = 3000
+
+
+def netgame_args(args: List[str], players: int) -> List[List[str]]:
+    """Argument lists for a local game: one ``-host`` and ``-join`` clients."""
+    host = [*args, '-host', str(players)]
+    return [host] + [[*args, '-join', '127.0.0.1'] for _ in range(players - 1)]
+
+
+class PortInstance(QObject):
+    """One source-port process with its own session log and telemetry.
+
+    Output is split into whole lines, written to the session log and
+    emitted as ``linesRead``; :meth:`note` adds launcher messages to the
+    same stream so line numbers match the session log. ``finished`` is
+    emitted exactly once, also when the port could not be started or the
+    instance was cancelled while still queued.
+    """
+
+    linesRead = pyqtSignal(list)
+    started = pyqtSignal()
+    finished = pyqtSignal(int)
+
+    def __init__(self, name: str, command: LaunchCommand,
+                 args: Optional[List[str]] = None, parent=None):
+        super().__init__(parent)
+        self.name = name
+        self.program = command.program
+        self.args = list(command.args if args is None else args)
+        self.env = command.env
+        self.session = SessionWriter()
+        self.sampler = ProcessSampler(self)
+        self.process = QProcess(self)
+        self.process.readyReadStandardOutput.connect(self._read)
+        self.process.readyReadStandardError.connect(self._read)
+        self.process.started.connect(self._onStarted)
+        self.process.finished.connect(self._onFinished)
+        self.process.errorOccurred.connect(self._onError)
+        self._tails = [b'', b'']
+        self.startTime: Optional[float] = None
+        self.hasStarted = False
+        self.firstOutput: Optional[float] = None
+        self.exitCode: Optional[int] = None
+
+    def isRunning(self) -> bool:
+        return self.process.state() != QProcess.NotRunning
+
+    def isDone(self) -> bool:
+        return self.exitCode is not None
+
+    def start(self):
+        self.process.setProgram(self.program)
+        self.process.setArguments(self.args)
+        # An empty environment makes QProcess inherit ours
+        self.process.setProcessEnvironment(self.env or QProcessEnvironment())
+        self.startTime = time.monotonic()
+        self.process.start()
+
+    def cancel(self):
+        """Ask the port to quit, and kill it if it does not."""
+        if self.isRunning():
+            self.note('Stopping...')
+            self.process.terminate()
+            QTimer.singleShot(KILL_DELAY_MS, self._kill)
+        elif not self.isDone():
+            self.note('Cancelled before start')
+            self._done(-1)
+
+    def _kill(self):
+        if self.isRunning():
+            self.process.kill()
+
+    def note(self, text: str):
+        """Add a launcher message to the output stream."""
+        self._emit([text])
+
+    def _emit(self, lines: List[str]):
+        if self.session is not None:
+            self.session.write(''.join(f'{line}\n' for line in lines).encode('utf-8'))
+        self.linesRead.emit(lines)
+
+    def _read(self):
+        chunks = (self.process.readAllStandardOutput(),
+                  self.process.readAllStandardError())
+        for channel, chunk in enumerate(chunks):
+            data = self._tails[channel] + bytes(chunk)
+            if not data:
+                continue
+            # Keep an unterminated last line for the next chunk
+            complete, _, self._tails[channel] = data.rpartition(b'\n')
+            if complete:
+                if self.firstOutput is None:
+                    self.firstOutput = time.monotonic() - self.startTime
+                if self.session is not None:
+                    self.session.write(complete + b'\n')
+                self.linesRead.emit(complete.decode('utf-8', 'ignore').split('\n'))
+
+    def _onStarted(self):
+        self.hasStarted = True
+        self.sampler.start(self.process.processId())
+        self.started.emit()
+
+    def _onError(self, error):
+        # A port that never started emits no finished() of its own
+        if error == QProcess.FailedToStart and not self.isDone():
+            self.note(f'Failed to start {self.program}: {self.process.errorString()}')
+            self._done(-1)
+
+    def _onFinished(self, code, _status):
+        self._read()
+        self.sampler.stop()
+        tails = [t.decode('utf-8', 'ignore') for t in self._tails if t]
+        self._tails = [b'', b'']
+        if tails:
+            self._emit(tails)
+        self._done(code, f'Process finished with code {code}')
+
+    def _done(self, code: int, footer: Optional[str] = None):
+        self.exitCode = code
+        self.finished.emit(code)
+        if footer:
+            self.note(footer)
+        if self.session is not None:
+            self.session.close()
+            self.session = None
+
+
+class LaunchSupervisor(QObject):
+    """Starts port instances, at most ``maxRunning`` at a time.
+
+    Instances beyond the limit wait in a queue and start as running ones
+    exit. Each instance keeps its own process, log and telemetry, so one
+    can be cancelled without touching the others.
+    """
+
+    instanceStarted = pyqtSignal(object)
+    instanceFinished = pyqtSignal(object)
+    allFinished = pyqtSignal()
+
+    def __init__(self, parent=None, maxRunning: Optional[int] = None):
+        super().__init__(parent)
+        self.maxRunning = max(1, maxRunning or perf_settings.get('max_instances', 4))
+        self.instances: List[PortInstance] = []
+        self._queue = deque()
+
+    def running(self) -> List[PortInstance]:
+        return [i for i in self.instances if i.isRunning()]
+
+    def isBusy(self) -> bool:
+        return any(not i.isDone() for i in self.instances)
+
+    def launch(self, instance: PortInstance):
+        """Queue ``instance``; it starts as soon as a slot is free."""
+        instance.setParent(self)
+        instance.started.connect(lambda: self.instanceStarted.emit(instance))
+        instance.finished.connect(lambda _code: self._onFinished(instance))
+        self.instances.append(instance)
+        self._queue.append(instance)
+        self._startQueued()
+
+    def cancelAll(self):
+        for instance in list(self.instances):
+            instance.cancel()
+
+    def _active(self) -> int:
+        return sum(1 for i in self.instances
+                   if i.startTime is not None and not i.isDone())
+
+    def _startQueued(self):
+        while self._queue and self._active() < self.maxRunning:
+            instance = self._queue.popleft()
+            if not instance.isDone():
+                instance.start()
+
+    def _onFinished(self, instance: PortInstance):
+        if instance in self._queue:
+            self._queue.remove(instance)
+        self.instances.remove(instance)
+        instance.deleteLater()
+        self.instanceFinished.emit(instance)
+        self._startQueued()
+        if not self.instances:
+            self.allFinished.emit()
@@ -0,0 +1,145 @@
+"""Resource sampling of the launched source port."""
+
+import time
+from typing import Optional
+
+import numpy as np
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+try:
+    import psutil
+except ImportError:  # telemetry is simply unavailable
+    psutil = None
+
+# Import performance settings with fallback
+try:
+    from src.performance import perf_settings
+except ImportError:
+    class FallbackPerfSettings:
+        def get(self, key, default=None):
+            return default
+    perf_settings = FallbackPerfSettings()
+
+SAMPLE_DTYPE = np.dtype([
+    ('time', '<f4'),         # seconds since the sampler started
+    ('cpu', '<f4'),          # percent of one core
+    ('rss', '<u8'),          # bytes
+    ('read_bytes', '<u8'),
+    ('write_bytes', '<u8'),
+    ('threads', '<u2'),
+])
+
+
+class TelemetryBuffer:
+    """Fixed-size ring of samples in one structured array."""
+
+    def __init__(self, capacity: int = 3600):
+        self._data = np.zeros(capacity, dtype=SAMPLE_DTYPE)
+        self._count = 0
+
+    def __len__(self):
+        return min(self._count, len(self._data))
+
+    def append(self, sample: tuple):
+        self._data[self._count % len(self._data)] = sample
+        self._count += 1
+
+    def samples(self) -> np.ndarray:
+        """Return the samples oldest first (a copy once it has wrapped)."""
+        capacity = len(self._data)
+        if self._count <= capacity:
+            return self._data[:self._count]
+        split = self._count % capacity
+        return np.concatenate([self._data[split:], self._data[:split]])
+
+    def last(self) -> Optional[np.void]:
+        if not self._count:
+            return None
+        return self._data[(self._count - 1) % len(self._data)]
+
+    def peak(self, field: str):
+        count = len(self)
+        return self._data[field][:count].max() if count else None
+
+    def clear(self):
+        self._count = 0
+
+
+class ProcessSampler(QObject):
+    """Samples CPU, RSS, I/O and threads of a process and its children.
+
+    Children are included because ports are often started through a
+    wrapper script or sandbox. Every field is read within one
+    ``oneshot()`` block per process, which is a few /proc reads, so
+    sampling on the GUI thread is cheap.
+    """
+
+    sampled = pyqtSignal(object)  # the TelemetryBuffer
+
+    def __init__(self, parent=None, interval: Optional[int] = None):
+        super().__init__(parent)
+        self.buffer = TelemetryBuffer(perf_settings.get('telemetry_samples', 3600))
+        self._process = None
+        self._children = {}
+        self._started = 0.0
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval or perf_settings.get('telemetry_interval_ms', 500))
+        self._timer.timeout.connect(self.sample)
+
+    @staticmethod
+    def available() -> bool:
+        return psutil is not None
+
+    def start(self, pid: int):
+        self.stop()
+        self.buffer.clear()
+        if psutil is None or pid <= 0:
+            return
+        try:
+            self._process = psutil.Process(pid)
+            self._process.cpu_percent(None)  # first call only sets the baseline
+        except psutil.Error:
+            self._process = None
+            return
+        self._started = time.monotonic()
+        self._timer.start()
+
+    def stop(self):
+        self._timer.stop()
+        self._process = None
+        self._children = {}
+
+    def _read(self, process):
+        with process.oneshot():
+            cpu = process.cpu_percent(None)
+            rss = process.memory_info().rss
+            threads = process.num_threads()
+            try:
+                io = process.io_counters()
+                read, write = io.read_bytes, io.write_bytes
+            except (AttributeError, psutil.AccessDenied):
+                read = write = 0
+        return cpu, rss, read, write, threads
+
+    def sample(self):
+        process = self._process
+        if process is None:
+            return
+        try:
+            totals = list(self._read(process))
+            children = {}
+            for child in process.children(recursive=True):
+                # Reuse Process objects so cpu_percent has a baseline
+                child = self._children.get(child.pid, child)
+                children[child.pid] = child
+                try:
+                    for i, value in enumerate(self._read(child)):
+                        totals[i] += value
+                except psutil.Error:
+                    continue
+            self._children = children
+        except psutil.Error:
+            self.stop()
+            return
+        self.buffer.append((time.monotonic() - self._started, *totals))
+        self.sampled.emit(self.buffer)
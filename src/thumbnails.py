@@ -0,0 +1,211 @@
+"""Title screen thumbnails for mods, cached on disk by content hash."""
+
+import hashlib
+import io
+import os
+import struct
+import zipfile
+from typing import List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from src.lump_index import lump_name
+from src.paths import cache_dir
+from src.pk3 import is_zip
+from src.wad import WadFile, WadError
+
+TITLE_LUMPS = ('TITLEPIC', 'INTERPIC')
+PATCH_HEADER = struct.Struct('<HHhh')
+RAW_SCREEN = (200, 320)
+PNG_MAGIC = b'\x89PNG'
+THUMBNAIL_SIZE = (320, 200)
+CACHE_BUDGET = 64 * 1024 * 1024
+
+# Fallback when neither the mod nor the IWAD has a PLAYPAL
+GRAYSCALE = np.repeat(np.arange(256, dtype=np.uint8)[:, None], 3, axis=1)
+
+
+class PictureError(Exception):
+    """Raised when a lump is not a decodable picture."""
+
+
+def _palette(data) -> Optional[np.ndarray]:
+    if data is None or len(data) < 768:
+        return None
+    return np.frombuffer(bytes(data[:768]), dtype=np.uint8).reshape(256, 3)
+
+
+def decode_patch(data, palette: np.ndarray) -> np.ndarray:
+    """Decode a Doom picture (patch) lump into an RGBA array.
+
+    Posts are walked column by column to collect runs; the pixels are
+    then scattered and palette-mapped in single NumPy operations.
+    """
+    data = bytes(data)
+    if len(data) < PATCH_HEADER.size:
+        raise PictureError('Patch too short')
+    width, height, _left, _top = PATCH_HEADER.unpack_from(data, 0)
+    if not (0 < width <= 4096 and 0 < height <= 4096) or \
+            len(data) < PATCH_HEADER.size + 4 * width:
+        raise PictureError('Bad patch header')
+    columns = np.frombuffer(data, '<u4', count=width, offset=PATCH_HEADER.size)
+    if columns.max() >= len(data):
+        raise PictureError('Patch column offset out of range')
+
+    cols, rows, srcs, lengths = [], [], [], []
+    for x, pos in enumerate(columns.tolist()):
+        top = -1
+        while pos + 1 < len(data) and data[pos] != 0xFF:
+            delta, length = data[pos], data[pos + 1]
+            # Tall patches stack deltas once they stop increasing
+            top = top + delta if delta <= top else delta
+            cols.append(x)
+            rows.append(top)
+            srcs.append(pos + 3)
+            lengths.append(length)
+            pos += length + 4
+
+    index = np.zeros((height, width), dtype=np.uint8)
+    alpha = np.zeros((height, width), dtype=np.uint8)
+    if lengths:
+        lengths = np.array(lengths, dtype=np.int64)
+        step = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        y = np.repeat(rows, lengths) + step
+        x = np.repeat(cols, lengths)
+        src = np.repeat(srcs, lengths) + step
+        keep = (y < height) & (src < len(data))
+        pixels = np.frombuffer(data, dtype=np.uint8)
+        index[y[keep], x[keep]] = pixels[src[keep]]
+        alpha[y[keep], x[keep]] = 255
+    return np.dstack([palette[index], alpha])
+
+
+def decode_raw_screen(data, palette: np.ndarray) -> np.ndarray:
+    """Decode a headerless 320x200 fullscreen lump (Heretic/Hexen style)."""
+    index = np.frombuffer(bytes(data), dtype=np.uint8).reshape(RAW_SCREEN)
+    return np.dstack([palette[index], np.full(RAW_SCREEN, 255, np.uint8)])
+
+
+def decode_picture(data, palette: np.ndarray) -> np.ndarray:
+    """Decode PNG/JPEG, Doom patch or raw screen data into RGBA."""
+    head = bytes(data[:4])
+    if head == PNG_MAGIC or head[:3] == b'\xff\xd8\xff':
+        with Image.open(io.BytesIO(bytes(data))) as img:
+            return np.asarray(img.convert('RGBA'))
+    try:
+        return decode_patch(data, palette)
+    except PictureError:
+        if len(data) == RAW_SCREEN[0] * RAW_SCREEN[1]:
+            return decode_raw_screen(data, palette)
+        raise
+
+
+def _wad_lumps(path: str, names: Tuple[str, ...]) -> List[Optional[bytes]]:
+    try:
+        with WadFile(path) as wad:
+            found = []
+            for name in names:
+                idx = wad.find(name)
+                found.append(bytes(wad.lump(idx)) if idx is not None else None)
+            return found
+    except (OSError, WadError):
+        return [None] * len(names)
+
+
+def _pk3_lumps(path: str, names: Tuple[str, ...]) -> List[Optional[bytes]]:
+    try:
+        with zipfile.ZipFile(path) as zf:
+            # Last entry with a matching lump name wins, like the engine
+            members = {lump_name(zi.filename): zi for zi in zf.infolist()
+                       if not zi.is_dir()}
+            return [zf.read(members[n]) if n in members else None for n in names]
+    except (OSError, zipfile.BadZipFile):
+        return [None] * len(names)
+
+
+def read_lumps(path: str, names: Tuple[str, ...]) -> List[Optional[bytes]]:
+    """Return the data of each named lump in a WAD or PK3, or None."""
+    try:
+        archive = is_zip(path)
+    except OSError:
+        return [None] * len(names)
+    return (_pk3_lumps if archive else _wad_lumps)(path, names)
+
+
+class ThumbnailCache:
+    """Directory of PNG thumbnails named by content hash, bounded in bytes.
+
+    The key covers the picture data, the palette and the target size,
+    so the same graphic is decoded once no matter which mod ships it.
+    Least recently used files are evicted once ``budget`` is exceeded.
+    """
+
+    def __init__(self, directory: Optional[str] = None, budget: int = CACHE_BUDGET):
+        self.directory = directory or str(cache_dir() / 'thumbnails')
+        self.budget = budget
+        os.makedirs(self.directory, exist_ok=True)
+
+    def key(self, data, palette: np.ndarray, size: Tuple[int, int]) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(bytes(data))
+        digest.update(palette.tobytes())
+        digest.update(struct.pack('<II', *size))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        path = os.path.join(self.directory, f'{key}.png')
+        try:
+            os.utime(path)  # mark as recently used
+        except OSError:
+            return None
+        return path
+
+    def put(self, key: str, rgba: np.ndarray) -> str:
+        path = os.path.join(self.directory, f'{key}.png')
+        tmp = f'{path}.tmp'
+        Image.fromarray(rgba, 'RGBA').save(tmp, format='PNG')
+        os.replace(tmp, path)
+        self.evict()
+        return path
+
+    def evict(self):
+        with os.scandir(self.directory) as it:
+            files = [(e.stat().st_mtime, e.stat().st_size, e.path)
+                     for e in it if e.name.endswith('.png')]
+        total = sum(f[1] for f in files)
+        for _mtime, size, path in sorted(files):
+            if total <= self.budget:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+
+def title_thumbnail(path: str, iwad: Optional[str] = None,
+                    size: Tuple[int, int] = THUMBNAIL_SIZE,
+                    cache: Optional[ThumbnailCache] = None) -> Optional[str]:
+    """Return the path of a cached PNG of the mod's title screen, or None."""
+    title, inter, playpal = read_lumps(path, TITLE_LUMPS + ('PLAYPAL',))
+    data = title or inter
+    if data is None:
+        return None
+    palette = _palette(playpal)
+    if palette is None and iwad:
+        palette = _palette(read_lumps(iwad, ('PLAYPAL',))[0])
+    if palette is None:
+        palette = GRAYSCALE
+    cache = cache or ThumbnailCache()
+    key = cache.key(data, palette, size)
+    hit = cache.get(key)
+    if hit:
+        return hit
+    try:
+        rgba = decode_picture(data, palette)
+    except (PictureError, OSError, ValueError):
+        return None
+    image = Image.fromarray(np.ascontiguousarray(rgba), 'RGBA')
+    image.thumbnail(size, Image.NEAREST)
+    return cache.put(key, np.asarray(image))
@@ -0,0 +1,140 @@
+"""Pre-launch checks of the IWAD and PWADs, cached per file version."""
+
+import os
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from src.pk3 import LOCAL_HEADER
+from src.wad import ENTRY_SIZE, HEADER, WadError, parse_directory, read_header
+
+VALIDATE_THREADS = 8
+
+
+def check_wad(fh, size: int) -> Optional[str]:
+    """Check a WAD's header and that every lump lies inside the file."""
+    try:
+        _ident, count, offset = read_header(fh.read(HEADER.size))
+    except WadError as exc:
+        return str(exc)
+    if offset + count * ENTRY_SIZE > size:
+        return 'Lump directory runs past end of file'
+    fh.seek(offset)
+    entries = parse_directory(fh.read(count * ENTRY_SIZE), count)
+    ends = entries['offset'].astype(np.uint64) + entries['size']
+    bad = np.flatnonzero(ends > size)
+    if len(bad):
+        name = entries['name'][bad[0]].split(b'\0', 1)[0].decode('latin-1')
+        return f'{len(bad)} lumps run past end of file (first: {name})'
+    return None
+
+
+def check_zip(path: str, size: int) -> Optional[str]:
+    """Check a ZIP/PK3's central directory and its member offsets."""
+    try:
+        with zipfile.ZipFile(path) as archive:
+            infos = archive.infolist()
+    except (zipfile.BadZipFile, zipfile.LargeZipFile, NotImplementedError,
+            ValueError) as exc:
+        return f'Bad ZIP central directory: {exc}'
+    except FileNotFoundError:
+        return 'File not found'
+    except OSError as exc:
+        # Removed or made unreadable since the magic was read
+        return f'Unreadable: {exc.strerror or exc}'
+    for info in infos:
+        encoding = 'utf-8' if info.flag_bits & 0x800 else 'cp437'
+        name_size = len(info.orig_filename.encode(encoding))
+        end = info.header_offset + LOCAL_HEADER.size + name_size + info.compress_size
+        if end > size:
+            return f'Member {info.filename} runs past end of file'
+    return None
+
+
+def validate_file(path: str) -> Optional[str]:
+    """Return what is wrong with ``path`` as a mod file, or None."""
+    try:
+        with open(path, 'rb') as fh:
+            size = os.fstat(fh.fileno()).st_size
+            magic = fh.read(4)
+            fh.seek(0)
+            if magic in (b'IWAD', b'PWAD'):
+                return check_wad(fh, size)
+    except FileNotFoundError:
+        return 'File not found'
+    except OSError as exc:
+        return f'Unreadable: {exc.strerror or exc}'
+    if magic[:2] == b'PK' or path.lower().endswith(('.pk3', '.pk7', '.zip', '.ipk3')):
+        return check_zip(path, size)
+    if path.lower().endswith('.wad'):
+        return 'Not a WAD file'
+    # DEH/BEX patches and other loose files only need to be readable
+    return None
+
+
+class LaunchValidator:
+    """Validates a load order concurrently and remembers the verdicts.
+
+    Verdicts are keyed by ``(size, mtime_ns)``, so validating an
+    unchanged profile again costs one ``stat`` per file and no reads.
+    """
+
+    def __init__(self, threads: int = VALIDATE_THREADS):
+        self.threads = threads
+        self._lock = threading.Lock()
+        self._verdicts: Dict[str, Tuple[Tuple[int, int], Optional[str]]] = {}
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def _lookup(self, path: str):
+        """Return ``(key, verdict, fresh)``; ``fresh`` is False on a miss."""
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None, 'File not found', True
+        except OSError as exc:
+            return None, f'Unreadable: {exc.strerror or exc}', True
+        key = (st.st_size, st.st_mtime_ns)
+        with self._lock:
+            hit = self._verdicts.get(path)
+        if hit is not None and hit[0] == key:
+            return key, hit[1], True
+        return key, None, False
+
+    def _check(self, path: str, key: Tuple[int, int]) -> Optional[str]:
+        verdict = validate_file(path)
+        with self._lock:
+            self._verdicts[path] = (key, verdict)
+        return verdict
+
+    def validate(self, paths: Iterable[str]) -> List[Tuple[str, str]]:
+        """Return ``[(path, problem), ...]`` in load order.
+
+        Cached verdicts are looked up on the calling thread; only new or
+        changed files are read, on the thread pool.
+        """
+        paths = list(dict.fromkeys(paths))
+        verdicts: Dict[str, Optional[str]] = {}
+        misses = []
+        for path in paths:
+            key, verdict, fresh = self._lookup(path)
+            if fresh:
+                verdicts[path] = verdict
+            else:
+                misses.append((path, key))
+        if len(misses) == 1:
+            verdicts[misses[0][0]] = self._check(*misses[0])
+        elif misses:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(
+                        self.threads, thread_name_prefix='validate')
+            results = self._pool.map(self._check, *zip(*misses))
+            verdicts.update(zip((p for p, _k in misses), results))
+        return [(p, verdicts[p]) for p in paths if verdicts[p] is not None]
+
+
+# Global instance shared by the launcher widgets
+launch_validator = LaunchValidator()
@@ -0,0 +1,240 @@
+"""Memory-mapped WAD reader with a fully indexed lump directory."""
+
+import mmap
+import struct
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+HEADER = struct.Struct('<4sII')
+ENTRY_SIZE = 16
+
+# One directory entry as stored on disk: filepos, size, 8-byte name
+DIRECTORY_DTYPE = np.dtype([
+    ('offset', '<u4'),
+    ('size', '<u4'),
+    ('name', 'S8'),
+])
+
+# Lumps that may follow a binary (Doom/Hexen) map marker
+MAP_LUMPS = frozenset({
+    'THINGS', 'LINEDEFS', 'SIDEDEFS', 'VERTEXES', 'SEGS', 'SSECTORS',
+    'NODES', 'SECTORS', 'REJECT', 'BLOCKMAP', 'BEHAVIOR', 'SCRIPTS',
+    'GL_VERT', 'GL_SEGS', 'GL_SSECT', 'GL_NODES', 'GL_PVS',
+})
+
+# Doubled namespace markers (SS_START, FF_END, ...) are aliases
+NAMESPACE_ALIASES = {'SS': 'S', 'FF': 'F', 'PP': 'P'}
+
+
+class WadError(Exception):
+    """Raised when a file is not a readable WAD."""
+
+
+def read_header(buf) -> Tuple[str, int, int]:
+    """Return ``(ident, numlumps, diroffset)`` from the first 12 bytes."""
+    if len(buf) < HEADER.size:
+        raise WadError('File too short for a WAD header')
+    ident, num, offset = HEADER.unpack_from(buf, 0)
+    ident = ident.decode('ascii', 'ignore')
+    if ident not in {'IWAD', 'PWAD'}:
+        raise WadError(f'Bad WAD ident {ident!r}')
+    return ident, num, offset
+
+
+def parse_directory(buf, count: int, offset: int = 0) -> np.ndarray:
+    """Decode ``count`` directory entries from ``buf`` in one pass."""
+    return np.frombuffer(
+        buf, DIRECTORY_DTYPE, count=count, offset=offset).copy()
+
+
+def _decode_names(raw: np.ndarray) -> np.ndarray:
+    # Names are NUL padded but may carry garbage after the first NUL;
+    # blank everything past it and upper-case on the raw bytes
+    chars = np.ascontiguousarray(raw).view(np.uint8).reshape(-1, 8).copy()
+    chars[np.cumsum(chars == 0, axis=1) > 0] = 0
+    lower = (chars >= ord('a')) & (chars <= ord('z'))
+    chars[lower] -= 32
+    raw = chars.view('S8').ravel()
+    try:
+        return raw.astype('U8')
+    except UnicodeDecodeError:
+        return np.char.decode(raw, 'latin-1')
+
+
+class WadDirectory:
+    """Indexed view over a decoded lump directory.
+
+    ``entries`` is a structured array of ``DIRECTORY_DTYPE``. Names are
+    looked up through a dict built once, so :meth:`find` is O(1) and, like
+    the engine, resolves duplicate names to the last lump.
+    """
+
+    def __init__(self, ident: str, entries: np.ndarray):
+        self.ident = ident
+        self.entries = entries
+        self.names = _decode_names(entries['name'])
+        self._names = self.names.tolist()
+        self._index = dict(zip(self._names, range(len(self._names))))
+        self._namespaces = None
+        self._maps = None
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, name: str):
+        return name.upper() in self._index
+
+    @property
+    def offsets(self) -> np.ndarray:
+        return self.entries['offset']
+
+    @property
+    def sizes(self) -> np.ndarray:
+        return self.entries['size']
+
+    def name(self, index: int) -> str:
+        return self._names[index]
+
+    def find(self, name: str) -> Optional[int]:
+        """Return the index of the last lump called ``name`` or None."""
+        return self._index.get(name.upper())
+
+    def find_all(self, name: str) -> np.ndarray:
+        """Return the indices of every lump called ``name``."""
+        return np.flatnonzero(self.names == name.upper())
+
+    def _build_namespaces(self):
+        spaces: Dict[str, List[Tuple[int, int]]] = {}
+        starts = np.flatnonzero(np.char.endswith(self.names, '_START'))
+        ends = np.flatnonzero(np.char.endswith(self.names, '_END'))
+        open_blocks: Dict[str, int] = {}
+        # Markers are rare, so walking the merged marker list is cheap
+        for idx in np.sort(np.concatenate([starts, ends])).tolist():
+            prefix, _, kind = self._names[idx].rpartition('_')
+            prefix = NAMESPACE_ALIASES.get(prefix, prefix)
+            if kind == 'START':
+                open_blocks.setdefault(prefix, idx)
+            elif prefix in open_blocks:
+                start = open_blocks.pop(prefix)
+                spaces.setdefault(prefix, []).append((start + 1, idx))
+        self._namespaces = spaces
+
+    def namespace_ranges(self, prefix: str) -> List[Tuple[int, int]]:
+        """Return ``[(first, stop), ...]`` lump ranges inside X_START/X_END."""
+        if self._namespaces is None:
+            self._build_namespaces()
+        prefix = prefix.upper()
+        return self._namespaces.get(NAMESPACE_ALIASES.get(prefix, prefix), [])
+
+    def namespace(self, prefix: str) -> np.ndarray:
+        """Return the lump indices between matching namespace markers."""
+        ranges = self.namespace_ranges(prefix)
+        if not ranges:
+            return np.empty(0, dtype=np.intp)
+        return np.concatenate([np.arange(a, b) for a, b in ranges])
+
+    def _build_maps(self):
+        maps: Dict[str, Tuple[int, int]] = {}
+        count = len(self._names)
+        following = self.names[1:]
+        markers = np.flatnonzero(
+            (following == 'THINGS') | (following == 'TEXTMAP'))
+        for idx in markers.tolist():
+            name = self._names[idx]
+            stop = idx + 1
+            if self._names[stop] == 'TEXTMAP':
+                while stop < count and self._names[stop] != 'ENDMAP':
+                    stop += 1
+                stop = min(stop + 1, count)
+            else:
+                while stop < count and self._names[stop] in MAP_LUMPS:
+                    stop += 1
+            maps[name] = (idx, stop)
+        self._maps = maps
+
+    def maps(self) -> Dict[str, Tuple[int, int]]:
+        """Return ``{marker: (marker_index, stop)}`` for every map block."""
+        if self._maps is None:
+            self._build_maps()
+        return self._maps
+
+    def map_lump(self, mapname: str, lump: str) -> Optional[int]:
+        """Return the index of ``lump`` inside the block of ``mapname``."""
+        block = self.maps().get(mapname.upper())
+        if block is None:
+            return None
+        start, stop = block
+        lump = lump.upper()
+        for idx in range(start + 1, stop):
+            if self._names[idx] == lump:
+                return idx
+        return None
+
+
+class WadBuffer(WadDirectory):
+    """A WAD held in a bytes-like object, e.g. a member read from a PK3."""
+
+    def __init__(self, data):
+        self._view = memoryview(data)
+        ident, num, offset = read_header(self._view)
+        if offset + num * ENTRY_SIZE > len(self._view):
+            raise WadError('Lump directory runs past end of data')
+        super().__init__(ident, parse_directory(self._view, num, offset))
+
+    def raw(self) -> memoryview:
+        """Return the whole WAD as a memoryview."""
+        return self._view
+
+    def lump(self, key: Union[int, str]) -> memoryview:
+        """Return the data of a lump, by index or name, without copying."""
+        index = self.find(key) if isinstance(key, str) else key
+        if index is None:
+            raise KeyError(key)
+        offset = int(self.entries['offset'][index])
+        size = int(self.entries['size'][index])
+        if offset + size > len(self._view):
+            raise WadError(f'Lump {self.name(index)} runs past end of data')
+        return self._view[offset:offset + size]
+
+
+class WadFile(WadBuffer):
+    """A WAD on disk, mapped into memory.
+
+    Lump data is returned as memoryview slices of the mapping, so nothing
+    is copied until the caller asks for bytes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as fh:
+            try:
+                self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as exc:  # empty file
+                raise WadError(str(exc)) from exc
+        self._view = None
+        try:
+            super().__init__(self._mm)
+        except Exception:
+            if self._view is not None:
+                self._view.release()
+                self._view = None
+            self._mm.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        view, self._view = self._view, None
+        if view is None:
+            return
+        view.release()
+        try:
+            self._mm.close()
+        except BufferError:
+            # Lump views are still alive; the mapping goes with the last one
+            pass
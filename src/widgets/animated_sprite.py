@@ -2,23 +2,29 @@ from PyQt5.QtWidgets import QLabel
 from PyQt5.QtGui import QPixmap
 from PyQt5.QtCore import QTimer, QRect
 
+from src.pixmap_cache import pixmap_cache
+
 
 class AnimatedSprite(QLabel):
-    """Optimized animated sprite sheet display with frame caching."""
+    """Optimized animated sprite sheet display with frame caching.
+
+    The sheet and its frames live in the shared pixmap cache, so sprites
+    of the same sheet share frames and count against one memory budget.
+    """
 
     def __init__(self, path: str, columns: int, rows: int,
                  interval: int = 120):
         super().__init__()
-        self._sheet = QPixmap(path)
+        self._path = path
+        sheet = self._sheet()
         self._columns = columns
         self._rows = rows
-        self._frame_w = self._sheet.width() // columns
-        self._frame_h = self._sheet.height() // rows
+        self._frame_w = sheet.width() // columns
+        self._frame_h = sheet.height() // rows
         self._frame = 0
         self._total_frames = columns * rows
         
         # Pre-cache all frames for better performance
-        self._frame_cache = []
         self._cache_frames()
         
         self._timer = QTimer(self)
@@ -26,18 +32,29 @@ class AnimatedSprite(QLabel):
         self._timer.start(interval)
         self._update_pixmap()
 
+    def _sheet(self):
+        return pixmap_cache.get_or_create(
+            ('sprite_sheet', self._path), lambda: QPixmap(self._path))
+
+    def _copy_frame(self, frame):
+        col = frame % self._columns
+        row = frame // self._columns
+        rect = QRect(
+            col * self._frame_w,
+            row * self._frame_h,
+            self._frame_w,
+            self._frame_h,
+        )
+        return self._sheet().copy(rect)
+
+    def _cached_frame(self, frame):
+        key = ('sprite', self._path, self._columns, self._rows, frame)
+        return pixmap_cache.get_or_create(key, lambda: self._copy_frame(frame))
+
     def _cache_frames(self):
         """Pre-cache all sprite frames to avoid repeated copy operations."""
         for frame in range(self._total_frames):
-            col = frame % self._columns
-            row = frame // self._columns
-            rect = QRect(
-                col * self._frame_w,
-                row * self._frame_h,
-                self._frame_w,
-                self._frame_h,
-            )
-            self._frame_cache.append(self._sheet.copy(rect))
+            self._cached_frame(frame)
 
     def _next_frame(self):
         self._frame = (self._frame + 1) % self._total_frames
@@ -45,4 +62,4 @@ class AnimatedSprite(QLabel):
 
     def _update_pixmap(self):
         # Use cached frame instead of copying from sheet
-        self.setPixmap(self._frame_cache[self._frame])
+        self.setPixmap(self._cached_frame(self._frame))
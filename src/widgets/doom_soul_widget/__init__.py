@@ -1,11 +1,13 @@
-import sys, os, tempfile, shutil
+import sys, os
 import numpy as np
 from PyQt5.QtWidgets import QWidget, QApplication, QSizePolicy
 from PyQt5.QtGui import QPainter, QPixmap, QImage, QMovie
 from PyQt5.QtCore import Qt, QTimer, QSize
-from PIL import Image
 from datetime import datetime
 
+from src.paths import cache_dir
+from src.pixmap_cache import pixmap_cache
+
 # Import performance settings with fallback
 try:
     from src.performance import perf_settings
@@ -22,90 +24,130 @@ except ImportError:
             return 50
     perf_settings = FallbackPerfSettings()
 
+TILE_VERSION = 2  # bump when the generator output changes
+TILE_CACHE_KEEP = 8
+EMBER_RADII = (2, 3)
+
+
+def _ember_kernel(radius):
+    """Offsets and glow of one ember, computed once per radius."""
+    dy, dx = np.mgrid[-radius:radius + 1, -radius:radius + 1]
+    dist = np.sqrt(dx * dx + dy * dy)
+    inside = dist <= radius
+    glow = (220 - dist * 38).astype(np.int32)
+    return dy[inside], dx[inside], glow[inside]
+
+
+EMBER_KERNELS = {radius: _ember_kernel(radius) for radius in EMBER_RADII}
+CRACK_OFFSETS = np.mgrid[-1:2, -1:2].reshape(2, -1)
+
+
 def generate_hell_tile_array(width, height, seed=None):
     """
-    Optimized hellish background tile generation using vectorized operations.
+    Hellish background tile built from whole-array NumPy operations.
+    Cracks are scattered as 3x3 stamps through index arrays and embers
+    are stamped with precomputed kernels summed by ``np.bincount``.
     Returns: np.ndarray (height, width, 4) RGBA
     """
-    if seed is not None:
-        np.random.seed(seed)
-    
-    # Create coordinate grids for vectorized operations
-    y_coords, x_coords = np.mgrid[0:height, 0:width]
-    
-    # Vectorized sinusoidal base calculations
-    r = np.clip(26 + 32 * np.sin(0.11 * y_coords + 0.19 * x_coords) + 38, 0, 255)
-    g = np.clip(7 + 9 * np.cos(0.19 * y_coords + 0.13 * x_coords), 0, 255)
-    b = np.clip(2 + 6 * np.sin(0.09 * x_coords - 0.11 * y_coords), 0, 255)
-    
-    # Create the array
-    arr = np.zeros((height, width, 4), dtype=np.uint8)
-    arr[:, :, 0] = r
-    arr[:, :, 1] = g
-    arr[:, :, 2] = b
+    rng = np.random.RandomState(seed)
+    y_coords, x_coords = np.ogrid[0:height, 0:width]
+    y_coords = y_coords.astype(np.float32)
+    x_coords = x_coords.astype(np.float32)
+
+    arr = np.empty((height, width, 4), dtype=np.uint8)
+    arr[:, :, 0] = np.clip(64 + 32 * np.sin(0.11 * y_coords + 0.19 * x_coords), 0, 255)
+    arr[:, :, 1] = np.clip(7 + 9 * np.cos(0.19 * y_coords + 0.13 * x_coords), 0, 255)
+    arr[:, :, 2] = np.clip(2 + 6 * np.sin(0.09 * x_coords - 0.11 * y_coords), 0, 255)
     arr[:, :, 3] = 255
-    
-    # Simplified crack generation (fewer cracks for performance)
-    cracks = np.random.rand(3, 4) * np.array([[width, height, 2*np.pi, width/3]])
-    for cx, cy, a, l in cracks:
-        t_vals = np.arange(0, int(l), 2)  # Skip every other point for performance
-        px = ((cx + t_vals * np.cos(a + np.sin(t_vals * 0.19))) % width).astype(int)
-        py = ((cy + t_vals * np.sin(a + np.cos(t_vals * 0.12))) % height).astype(int)
-        # Vectorized crack drawing
-        for i in range(len(px)):
-            y_slice = slice(max(0, py[i]-1), min(height, py[i]+2))
-            x_slice = slice(max(0, px[i]-1), min(width, px[i]+2))
-            arr[y_slice, x_slice, :3] = 0
-    
-    # Reduced ember count for performance
-    ember_count = (width * height) // 1280  # Half the original count
-    for _ in range(ember_count):
-        ex, ey = np.random.randint(0, width), np.random.randint(0, height)
-        radius = np.random.randint(2, 4)  # Smaller radius
-        y_slice = slice(max(0, ey-radius), min(height, ey+radius+1))
-        x_slice = slice(max(0, ex-radius), min(width, ex+radius+1))
-        
-        # Vectorized ember glow
-        dy, dx = np.mgrid[y_slice, x_slice] - np.array([[ey], [ex]])
-        dist = np.sqrt(dx*dx + dy*dy)
-        mask = dist <= radius
-        glow = (220 - dist * 38).astype(int)
-        
-        arr[y_slice, x_slice, 0] = np.where(mask, 
-                                           np.clip(arr[y_slice, x_slice, 0] + glow, 0, 255),
-                                           arr[y_slice, x_slice, 0])
-        arr[y_slice, x_slice, 1] = np.where(mask,
-                                           np.clip(arr[y_slice, x_slice, 1] + glow//3, 0, 255),
-                                           arr[y_slice, x_slice, 1])
-    
-    # Vectorized vignette
-    cy, cx = height/2, width/2
-    d = np.sqrt((x_coords-cx)**2 + (y_coords-cy)**2)
-    fade = 0.85 + 0.15 * np.cos(np.pi * d / (0.7*max(width, height)))
-    arr[:, :, :3] = (arr[:, :, :3].astype(np.float32) * fade[:, :, np.newaxis]).astype(np.uint8)
-    
+
+    # Cracks: every point of every crack at once, then one scatter
+    cracks = rng.rand(3, 4) * np.array([[width, height, 2 * np.pi, width / 3]])
+    lengths = (np.ceil(cracks[:, 3] / 2)).astype(np.intp)
+    owner = np.repeat(np.arange(len(cracks)), lengths)
+    t_vals = (np.arange(owner.size) - np.repeat(np.cumsum(lengths) - lengths, lengths)) * 2.0
+    cx, cy, angle = cracks[owner, 0], cracks[owner, 1], cracks[owner, 2]
+    px = ((cx + t_vals * np.cos(angle + np.sin(t_vals * 0.19))) % width).astype(np.intp)
+    py = ((cy + t_vals * np.sin(angle + np.cos(t_vals * 0.12))) % height).astype(np.intp)
+    ys = (py[:, None] + CRACK_OFFSETS[0]).ravel()
+    xs = (px[:, None] + CRACK_OFFSETS[1]).ravel()
+    keep = (ys >= 0) & (ys < height) & (xs >= 0) & (xs < width)
+    arr[ys[keep], xs[keep], :3] = 0
+
+    # Embers: glow is positive, so summing then clipping once matches
+    # clipping after each ember
+    ember_count = (width * height) // 1280
+    ex = rng.randint(0, width, ember_count)
+    ey = rng.randint(0, height, ember_count)
+    radii = rng.randint(EMBER_RADII[0], EMBER_RADII[-1] + 1, ember_count)
+    red = np.zeros(height * width, dtype=np.int64)
+    green = np.zeros(height * width, dtype=np.int64)
+    for radius, (dy, dx, glow) in EMBER_KERNELS.items():
+        chosen = radii == radius
+        ys = (ey[chosen, None] + dy).ravel()
+        xs = (ex[chosen, None] + dx).ravel()
+        keep = (ys >= 0) & (ys < height) & (xs >= 0) & (xs < width)
+        flat = ys[keep] * width + xs[keep]
+        glows = np.broadcast_to(glow, (chosen.sum(), glow.size)).ravel()[keep]
+        red += np.bincount(flat, weights=glows, minlength=red.size).astype(np.int64)
+        green += np.bincount(flat, weights=glows // 3, minlength=green.size).astype(np.int64)
+    arr[:, :, 0] = np.clip(arr[:, :, 0] + red.reshape(height, width), 0, 255)
+    arr[:, :, 1] = np.clip(arr[:, :, 1] + green.reshape(height, width), 0, 255)
+
+    # Vignette
+    d = np.sqrt((x_coords - width / 2) ** 2 + (y_coords - height / 2) ** 2)
+    fade = 0.85 + 0.15 * np.cos(np.pi * d / (0.7 * max(width, height)))
+    arr[:, :, :3] = (arr[:, :, :3] * fade[:, :, np.newaxis]).astype(np.uint8)
+
     return arr
 
-def save_hell_tile_png(arr, path):
-    img = Image.fromarray(arr, "RGBA")
-    img.save(path)
 
-def get_temp_tile_path(tag="doomed_by_python_tile"):
-    tempdir = tempfile.gettempdir()
-    # Use a name that is unique for the tile size, for robustness
-    return os.path.join(tempdir, f"{tag}_{os.getpid()}.png")
+def tile_cache_path(tile_w, tile_h, seed):
+    return cache_dir() / 'tiles' / f'hell_v{TILE_VERSION}_{tile_w}x{tile_h}_{seed}.npy'
+
 
-def ensure_tile_file(tile_w, tile_h, seed=None, keep_existing=False):
+def load_hell_tile(tile_w, tile_h, seed=None):
     """
-    If tile PNG exists, use it. Otherwise, generate and save.
-    Returns the PNG path.
+    Return the tile for (w, h, seed), generating and caching it on disk
+    as a raw .npy array on first use.
     """
-    path = get_temp_tile_path()
-    if keep_existing and os.path.isfile(path):
-        return path
+    if seed is None:
+        return generate_hell_tile_array(tile_w, tile_h)
+    path = tile_cache_path(tile_w, tile_h, seed)
+    try:
+        arr = np.load(path)
+        if arr.shape == (tile_h, tile_w, 4) and arr.dtype == np.uint8:
+            return arr
+    except (OSError, ValueError):
+        pass
     arr = generate_hell_tile_array(tile_w, tile_h, seed)
-    save_hell_tile_png(arr, path)
-    return path
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix('.tmp')
+        with open(tmp, 'wb') as fh:
+            np.save(fh, arr)
+        os.replace(tmp, path)
+        # One tile per day: drop all but the most recent few
+        tiles = sorted(path.parent.glob('hell_*.npy'), key=lambda p: p.stat().st_mtime)
+        for old in tiles[:-TILE_CACHE_KEEP]:
+            old.unlink()
+    except OSError:
+        pass  # the cache is only an optimisation
+    return arr
+
+
+def _tile_pixmap(tile_w, tile_h, seed):
+    arr = np.ascontiguousarray(load_hell_tile(tile_w, tile_h, seed))
+    image = QImage(arr.data, tile_w, tile_h, arr.strides[0], QImage.Format_RGBA8888)
+    # QImage does not own the array memory; the pixmap takes a copy
+    return QPixmap.fromImage(image)
+
+
+def hell_tile_pixmap(tile_w, tile_h, seed=None):
+    """Tile pixmap built straight from the array buffer, shared via the pixmap cache."""
+    return pixmap_cache.get_or_create(
+        ('hell_tile', tile_w, tile_h, seed),
+        lambda: _tile_pixmap(tile_w, tile_h, seed))
+
 
 class DoomSoulWidget(QWidget):
     def __init__(self, skull_gif_path: str, parent=None, tile_w=96, tile_h=64, animated_background=False):
@@ -118,15 +160,13 @@ class DoomSoulWidget(QWidget):
         # Only generate tile if animated background is enabled
         if self._animated_background:
             day_seed = int(datetime.now().strftime('%Y%m%d'))
-            self._tile_path = ensure_tile_file(tile_w, tile_h, seed=day_seed)
-            self._tile_pixmap = QPixmap(self._tile_path)
+            self._tile_pixmap = hell_tile_pixmap(tile_w, tile_h, seed=day_seed)
         else:
-            self._tile_path = None
             self._tile_pixmap = None
         
         self._scroll = 0
-        self._cached_skull = None
-        self._cached_skull_size = 0
+        self._skull_path = skull_gif_path
+        self._skull_index = 0
 
         self._timer = QTimer(self)
         self._timer.timeout.connect(self._tick)
@@ -143,10 +183,17 @@ class DoomSoulWidget(QWidget):
         # Cache the frame conversion to avoid repeated operations
         frame = self.skull_gif.currentPixmap().toImage().convertToFormat(QImage.Format_ARGB32)
         self.skull_frame = frame
-        # Invalidate cached skull when frame changes
-        self._cached_skull = None
+        self._skull_index = idx
         self.update()
 
+    def _scaledSkull(self, size):
+        """Scaled skull frame; every frame is scaled once per size."""
+        transform_mode = Qt.SmoothTransformation if perf_settings.get('skull_scaling_quality') == 'smooth' else Qt.FastTransformation
+        frame = self.skull_frame
+        return pixmap_cache.get_or_create(
+            ('skull', self._skull_path, self._skull_index, size, int(transform_mode)),
+            lambda: frame.scaled(QSize(size, size), Qt.KeepAspectRatio, transform_mode))
+
     def _tick(self):
         if self._animated_background:
             self._scroll = (self._scroll + 1) % self._tile_w  # Slower scroll for performance
@@ -177,18 +224,9 @@ class DoomSoulWidget(QWidget):
         # Draw the animated skull with caching
         if self.skull_frame:
             size = int(min(w, h) * 0.82)
-            
-            # Use cached scaled skull if size hasn't changed
-            if self._cached_skull is None or self._cached_skull_size != size:
-                transform_mode = Qt.SmoothTransformation if perf_settings.get('skull_scaling_quality') == 'smooth' else Qt.FastTransformation
-                self._cached_skull = self.skull_frame.scaled(
-                    QSize(size, size), Qt.KeepAspectRatio, transform_mode
-                )
-                self._cached_skull_size = size
-            
             sx = (w - size) // 2
             sy = (h - size) // 2
-            painter.drawImage(sx, sy, self._cached_skull)
+            painter.drawImage(sx, sy, self._scaledSkull(size))
 
     def setAnimatedBackground(self, enabled):
         """Enable or disable the animated background."""
@@ -198,8 +236,7 @@ class DoomSoulWidget(QWidget):
             # Generate tile if not already done
             if not self._tile_pixmap:
                 day_seed = int(datetime.now().strftime('%Y%m%d'))
-                self._tile_path = ensure_tile_file(self._tile_w, self._tile_h, seed=day_seed)
-                self._tile_pixmap = QPixmap(self._tile_path)
+                self._tile_pixmap = hell_tile_pixmap(self._tile_w, self._tile_h, seed=day_seed)
             # Start animation timer
             if not self._timer.isActive():
                 self._timer.start(33)
@@ -209,15 +246,6 @@ class DoomSoulWidget(QWidget):
         
         self.update()
 
-    def closeEvent(self, event):
-        # Clean up our temp file ONLY if we "own" it
-        try:
-            if self._tile_path and os.path.isfile(self._tile_path):
-                os.remove(self._tile_path)
-        except Exception:
-            pass
-        event.accept()
-
 if __name__ == "__main__":
     # Demo: run this as a standalone test
     app = QApplication(sys.argv)
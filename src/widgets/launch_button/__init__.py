@@ -1,10 +1,44 @@
+import time
+from functools import partial
+
 from PyQt5.QtWidgets import QPushButton, QApplication
 from PyQt5.Qt import Qt
-from PyQt5.QtCore import QProcess
-import shlex
+from PyQt5.QtCore import QTimer, pyqtSignal
+
+from src.launch_history import files_version, history_key, launch_history
+from src.prefetch import Prefetcher
+from src.profiles import LaunchProfile
+from src.session_log import KEEP_SESSIONS, LOG_BUDGET, rotate_sessions
+from src.supervisor import LaunchSupervisor, PortInstance, netgame_args
+from src.validation import launch_validator
+from src.widgets.log_window import LogWindow
+from src.workers import BackgroundJobs
+
+PREPARE_DELAY_MS = 400
 
 
 class LaunchButton(QPushButton):
+    """Starts the source port with the command of the current profile.
+
+    The inputs are mirrored into ``profile``; while they match it, its
+    prebuilt command is reused, so launching does no parsing or
+    validation. Editing any input starts an unnamed working profile.
+
+    The files of the current profile are validated and prefetched into
+    the page cache in the background while the user is still choosing,
+    so the check before starting the port is normally a cache hit.
+
+    Ports run as :class:`src.supervisor.PortInstance` objects under a
+    :class:`src.supervisor.LaunchSupervisor`: with ``instances`` above
+    one, a local netgame (one ``-host``, the rest ``-join``) or several
+    independent copies are started, each with its own log window,
+    session log, telemetry and Stop button. The first instance is the
+    one measured: time to the first map load (warm or cold cache), peak
+    RSS, time to the first output line and runtime go to the launch
+    history and are compared with earlier launches.
+    """
+
+    profileChanged = pyqtSignal(object)
 
     def __init__(
         self,
@@ -23,52 +57,233 @@ class LaunchButton(QPushButton):
         self.optionsInput = optionsInput
         self.logWindow = logWindow
         self.loadingWindow = loadingWindow
-        self.process = QProcess()
-        self.process.readyReadStandardOutput.connect(self._readOutput)
-        self.process.readyReadStandardError.connect(self._readOutput)
-        self.process.finished.connect(self._finished)
         self.clicked.connect(self.onClick)
+        self.jobs = BackgroundJobs(self, maxThreads=1)
+        self.prefetcher = Prefetcher(self)
+        self.supervisor = LaunchSupervisor(self)
+        self.instances = 1
+        self.netgame = True
+        self.extraLogWindows = []
+        self._windowInstances = {}
+        self._launch = None
+        self._waiting = False
+
+        self.profile = LaunchProfile()
+        self._applying = False
+        # Validate and prefetch once typing pauses, not on every keystroke
+        self._prepareTimer = QTimer(self)
+        self._prepareTimer.setSingleShot(True)
+        self._prepareTimer.setInterval(PREPARE_DELAY_MS)
+        self._prepareTimer.timeout.connect(self._prepare)
+        for widget in (portPathInput, iwadInput, optionsInput):
+            widget.textChanged.connect(self._syncProfile)
+        pwadList.orderChanged.connect(self._syncProfile)
+        self._syncProfile()
+
+    def _fields(self):
+        return (self.portPathInput.text(), self.iwadInput.text(),
+                tuple(self.pwadList.paths()), self.optionsInput.text(),
+                tuple(sorted(self.profile.env.items())))
+
+    def _syncProfile(self):
+        if self._applying:
+            return
+        fields = self._fields()
+        if fields != self.profile.fields():
+            port, iwad, pwads, options, env = fields
+            self.profile = LaunchProfile('', port, iwad, pwads, options, dict(env))
+            self.profileChanged.emit(self.profile)
+            self._prepareTimer.start()
+
+    def setProfile(self, profile: LaunchProfile):
+        """Show ``profile`` in the inputs and launch with its command."""
+        self._applying = True
+        try:
+            self.portPathInput.setText(profile.port)
+            self.iwadInput.setText(profile.iwad)
+            self.pwadList.setWads(profile.pwads)
+            self.optionsInput.setText(profile.options)
+        finally:
+            self._applying = False
+        self.profile = profile
+        if profile.fields() != self._fields():
+            # The inputs normalised something; start a working profile
+            self._syncProfile()
+        else:
+            self._prepareTimer.start()
+
+    def _prepare(self):
+        profile = self.profile
+        self.prefetcher.schedule(profile.files())
+        self.jobs.submit('validate', launch_validator.validate,
+                         [p for p in (profile.iwad, *profile.pwads) if p])
+
+    def setInstances(self, count: int, netgame: bool = True):
+        """Start ``count`` ports per launch, as a netgame or as copies."""
+        self.instances = max(1, count)
+        self.netgame = netgame
+
+    def stopAll(self):
+        self.supervisor.cancelAll()
+
+    def _logWindowFor(self, index: int) -> LogWindow:
+        if index == 0:
+            return self.logWindow
+        while len(self.extraLogWindows) < index:
+            self.extraLogWindows.append(LogWindow(self.logWindow.parent()))
+        return self.extraLogWindows[index - 1]
+
+    def _bind(self, window: LogWindow, instance: PortInstance):
+        """Show ``instance`` in ``window``; Stop there cancels only it."""
+        if window not in self._windowInstances:
+            window.stopRequested.connect(partial(self._stopWindow, window))
+        self._windowInstances[window] = instance
+        window.clear()
+        window.setSession(instance.session.path)
+        window.setWindowTitle(f'GZDoom Log - {instance.name}')
+        window.show()
+        instance.linesRead.connect(window.appendLines)
+        instance.sampler.sampled.connect(window.setTelemetry)
+
+    def _stopWindow(self, window: LogWindow):
+        instance = self._windowInstances.get(window)
+        if instance is not None and not instance.isDone():
+            instance.cancel()
 
     def onClick(self):
-        """Launch the source port and display its output."""
-        self.logWindow.textEdit.clear()
-        self.logWindow.show()
+        """Launch the source port(s) and display their output."""
+        if self.supervisor.isBusy():
+            self.logWindow.append('Already running; stop the running ports first')
+            self.logWindow.show()
+            self.logWindow.raise_()
+            return
+        self._prepareTimer.stop()
+
+        problems = launch_validator.validate(
+            [p for p in (self.profile.iwad, *self.profile.pwads) if p])
+        if problems:
+            self.logWindow.clear()
+            self.logWindow.show()
+            for path, problem in problems:
+                self.logWindow.append(f'Error: {path}: {problem}')
+            self.logWindow.append('Launch cancelled')
+            return
+
+        command = self.profile.command()
+        if command.errors:
+            # Files may have appeared since the command was built
+            self.profile.invalidate()
+            command = self.profile.command()
+
+        count = self.instances
+        if count > 1 and self.netgame:
+            # Every player of a netgame has to run at the same time
+            count = min(count, self.supervisor.maxRunning)
+            argLists = netgame_args(command.args, count)
+            names = ['Host'] + [f'Player {i}' for i in range(2, count + 1)]
+        else:
+            argLists = [command.args] * count
+            names = ['Port'] if count == 1 else [f'Instance {i}' for i in range(1, count + 1)]
+
+        # The port should have the disk to itself from here on
+        files = self.profile.files()
+        warm = self.prefetcher.isWarm(files)
+        self.prefetcher.cancel()
 
         self.loadingWindow.setRange(0, 0)
         self.loadingWindow.setValue(0)
         self.loadingWindow.show()
-        self.process.started.connect(self.loadingWindow.hide)
-        self.process.finished.connect(self.loadingWindow.hide)
-
         QApplication.setOverrideCursor(Qt.WaitCursor)
-        self.process.finished.connect(QApplication.restoreOverrideCursor)
-        self.process.started.connect(QApplication.restoreOverrideCursor)
-
-        wads = [item.data(0, Qt.UserRole) for item in self.pwadList.getItems()]
-        args = []
-        if self.iwadInput.text():
-            args += ['-iwad', self.iwadInput.text()]
-        if wads:
-            args += ['-file', *wads]
-        if self.optionsInput.text():
-            args += shlex.split(self.optionsInput.text())
-
-        self.process.setProgram(self.portPathInput.text())
-        self.process.setArguments(args)
-        self.process.start()
-
-    def _readOutput(self):
-        data = bytes(
-            self.process.readAllStandardOutput()).decode('utf-8', 'ignore')
-        if data:
-            for line in data.splitlines():
-                self.logWindow.append(line)
-        err = bytes(
-            self.process.readAllStandardError()).decode('utf-8', 'ignore')
-        if err:
-            for line in err.splitlines():
-                self.logWindow.append(line)
-
-    def _finished(self):
-        code = self.process.exitCode()
-        self.logWindow.append(f'Process finished with code {code}')
+        self._waiting = True
+
+        instances = []
+        for index, (name, args) in enumerate(zip(names, argLists)):
+            instance = PortInstance(name, command, args)
+            self._bind(self._logWindowFor(index), instance)
+            for error in command.errors:
+                instance.note(f'Warning: {error}')
+            if count > self.supervisor.maxRunning and index >= self.supervisor.maxRunning:
+                instance.note('Waiting for a free slot...')
+            instances.append(instance)
+
+        primary = instances[0]
+        self._launch = {'key': history_key(files), 'warm': warm,
+                        'profile': self.profile.name, 'version': files_version(files),
+                        'instances': count, 'first_frame': None, 'instance': primary}
+        primary.linesRead.connect(self._checkFirstFrame)
+        primary.started.connect(self._endWait)
+        primary.finished.connect(self._primaryFinished)
+        # Older sessions are compressed or pruned off the GUI thread; any
+        # still open in a log window are left alone
+        windows = [self.logWindow, *self.extraLogWindows]
+        openLogs = [w.reader.path for w in windows if w.reader is not None]
+        self.jobs.submit('rotate', rotate_sessions, None, LOG_BUDGET, KEEP_SESSIONS,
+                         [i.session.path for i in instances] + openLogs)
+        for instance in instances:
+            self.supervisor.launch(instance)
+
+    def _endWait(self):
+        if self._waiting:
+            self._waiting = False
+            self.loadingWindow.hide()
+            QApplication.restoreOverrideCursor()
+
+    def _checkFirstFrame(self, _lines):
+        launch = self._launch
+        if launch and launch['first_frame'] is None \
+                and self.logWindow.classifier.hits['map_load']:
+            launch['first_frame'] = time.monotonic() - launch['instance'].startTime
+            self._reportFirstFrame(launch)
+
+    def _primaryFinished(self, code: int):
+        self._endWait()
+        launch, self._launch = self._launch, None
+        if not launch:
+            return
+        instance = launch['instance']
+        if not instance.hasStarted:
+            return
+        peak = instance.sampler.buffer.peak('rss')
+        record = {
+            'profile': launch['profile'], 'version': launch['version'],
+            'instances': launch['instances'], 'warm': launch['warm'],
+            'first_frame': launch['first_frame'],
+            'first_output': instance.firstOutput,
+            'runtime': time.monotonic() - instance.startTime,
+            'peak_rss': None if peak is None else int(peak),
+            'exit_code': code,
+        }
+        self._reportSummary(instance, record, launch_history.records(launch['key']))
+        self.jobs.submit('history', launch_history.record, launch['key'], record)
+
+    def _reportSummary(self, instance, record, history):
+        def describe(r):
+            parts = []
+            if r.get('peak_rss') is not None:
+                parts.append(f"peak RSS {r['peak_rss'] / (1024 * 1024):.0f} MB")
+            if r.get('first_output') is not None:
+                parts.append(f"first output {r['first_output']:.2f} s")
+            parts.append(f"runtime {r['runtime']:.1f} s")
+            return ', '.join(parts)
+
+        text = describe(record)
+        text = text[0].upper() + text[1:]
+        if history and history[-1].get('runtime') is not None:
+            previous = history[-1]
+            changed = ' (mods changed)' if previous.get('version') != record['version'] else ''
+            text += f'; previous launch{changed}: {describe(previous)}'
+        instance.note(text)
+
+    def _reportFirstFrame(self, launch):
+        first = launch['first_frame']
+        key = launch['key']
+        if launch['warm']:
+            cold = launch_history.median(key, 'first_frame', warm=False)
+            detail = 'prefetched' if cold is None else \
+                f'prefetched; cold median {cold:.2f} s, saved {cold - first:.2f} s'
+        else:
+            warm = launch_history.median(key, 'first_frame', warm=True)
+            detail = 'cold cache' if warm is None else \
+                f'cold cache; prefetched median {warm:.2f} s'
+        launch['instance'].note(f'First map loaded after {first:.2f} s ({detail})')
+
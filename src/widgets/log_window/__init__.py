@@ -1,22 +1,332 @@
-from PyQt5.QtWidgets import QDialog, QVBoxLayout, QPlainTextEdit
-from PyQt5.QtCore import Qt
+from collections import deque
+from typing import Iterable
+
+from PyQt5.QtWidgets import (
+    QDialog,
+    QVBoxLayout,
+    QHBoxLayout,
+    QListView,
+    QAbstractItemView,
+    QApplication,
+    QLineEdit,
+    QPushButton,
+    QLabel,
+    QWidget,
+)
+from PyQt5.QtCore import Qt, QTimer, QAbstractListModel, QModelIndex, pyqtSignal
+from PyQt5.QtGui import QKeySequence
+
+from src.log_classifier import LABELS, OutputClassifier
+from src.session_log import SessionReader
+from src.widgets.sparkline import Sparkline
+from src.workers import BackgroundJobs
+
+# Import performance settings with fallback
+try:
+    from src.performance import perf_settings
+except ImportError:
+    class FallbackPerfSettings:
+        def get(self, key, default=None):
+            return default
+        def get_timer_interval(self):
+            return 50
+    perf_settings = FallbackPerfSettings()
+
+
+class LogModel(QAbstractListModel):
+    """The last ``capacity`` log lines, stored in a ring buffer."""
+
+    def __init__(self, capacity: int, parent=None):
+        super().__init__(parent)
+        self.lines = deque(maxlen=capacity)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.lines)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and index.isValid():
+            return self.lines[index.row()]
+        return None
+
+    def extend(self, lines):
+        """Append lines, evicting the oldest, as one remove + one insert."""
+        capacity = self.lines.maxlen
+        if len(lines) >= capacity:
+            self.beginResetModel()
+            self.lines.clear()
+            self.lines.extend(lines[-capacity:])
+            self.endResetModel()
+            return
+        overflow = len(self.lines) + len(lines) - capacity
+        if overflow > 0:
+            self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+            for _ in range(overflow):
+                self.lines.popleft()
+            self.endRemoveRows()
+        first = len(self.lines)
+        self.beginInsertRows(QModelIndex(), first, first + len(lines) - 1)
+        self.lines.extend(lines)
+        self.endInsertRows()
+
+    def clear(self):
+        self.replace([])
+
+    def replace(self, lines):
+        self.beginResetModel()
+        self.lines.clear()
+        self.lines.extend(lines)
+        self.endResetModel()
 
 
 class LogWindow(QDialog):
-    """Simple window to display GZDoom output."""
+    """Window displaying GZDoom output.
+
+    Lines are queued in a fixed-size ring buffer and handed to the view
+    in one batch per frame. The view is a list over another ring buffer
+    of ``capacity`` lines and only paints the rows on screen, so memory
+    and redraw cost stay flat however long the port keeps printing.
+
+    The whole session is also on disk (see :mod:`src.session_log`);
+    the search box runs regex searches over it in the background and
+    ``:N`` jumps to line N, showing that part of the file until
+    "Follow" switches back to the live tail. Incoming lines are also
+    classified (script errors, missing textures, ...); each category
+    button shows a live count and jumps to its next line. Resource
+    samples of the running port are drawn as sparklines beside the log.
+    """
+
+    BROWSE_LINES = 1000
 
-    def __init__(self, parent=None):
+    stopRequested = pyqtSignal()
+
+    def __init__(self, parent=None, capacity=None):
         super().__init__(parent)
         self.setWindowTitle('GZDoom Log')
         self.resize(600, 400)
+        self.capacity = capacity or perf_settings.get('log_capacity', 5000)
         layout = QVBoxLayout()
-        self.textEdit = QPlainTextEdit()
-        self.textEdit.setReadOnly(True)
-        layout.addWidget(self.textEdit)
+        self.model = LogModel(self.capacity, self)
+        self.view = QListView()
+        self.view.setObjectName('doomLog')  # For CSS styling
+        self.view.setModel(self.model)
+        self.view.setUniformItemSizes(True)
+        self.view.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.view.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+
+        self.searchInput = QLineEdit()
+        self.searchInput.setPlaceholderText('Regex search, or :N to go to line N')
+        self.searchInput.returnPressed.connect(self.search)
+        self.followButton = QPushButton('Follow')
+        self.followButton.setToolTip('Show the latest output again')
+        self.followButton.clicked.connect(self.follow)
+        self.followButton.hide()
+        self.status = QLabel()
+        self.stopButton = QPushButton('Stop')
+        self.stopButton.setToolTip('Stop the port shown in this window')
+        self.stopButton.clicked.connect(self.stopRequested)
+        searchLayout = QHBoxLayout()
+        searchLayout.addWidget(self.searchInput, 1)
+        searchLayout.addWidget(self.followButton)
+        searchLayout.addWidget(self.status)
+        searchLayout.addWidget(self.stopButton)
+
+        self.classifier = OutputClassifier()
+        self.categoryButtons = {}
+        categoryLayout = QHBoxLayout()
+        for key, label in LABELS.items():
+            button = QPushButton()
+            button.setFlat(True)
+            button.setEnabled(False)
+            button.setToolTip(f'Jump to the next line in "{label}"')
+            button.clicked.connect(lambda _checked, key=key: self.jumpTo(key))
+            categoryLayout.addWidget(button)
+            self.categoryButtons[key] = button
+        categoryLayout.addStretch(1)
+        self._counts = None
+        self._updateCounts()
+
+        self.sparklines = {
+            'cpu': Sparkline('CPU', '%'),
+            'rss': Sparkline('RSS', ' MB', 1024 * 1024),
+            'read_bytes': Sparkline('Read', ' MB', 1024 * 1024),
+            'threads': Sparkline('Threads'),
+        }
+        self.telemetry = QWidget()
+        telemetryLayout = QVBoxLayout(self.telemetry)
+        telemetryLayout.setContentsMargins(0, 0, 0, 0)
+        for sparkline in self.sparklines.values():
+            telemetryLayout.addWidget(sparkline)
+        telemetryLayout.addStretch(1)
+        self.telemetry.setFixedWidth(160)
+        self.telemetry.hide()
+        logLayout = QHBoxLayout()
+        logLayout.addWidget(self.view, 1)
+        logLayout.addWidget(self.telemetry)
+
+        layout.addLayout(searchLayout)
+        layout.addLayout(categoryLayout)
+        layout.addLayout(logLayout)
         self.setLayout(layout)
 
+        self.reader = None
+        self.live = True
+        self.tail = deque(maxlen=self.capacity)
+        self._lastHit = None
+        self._position = -1
+        self.jobs = BackgroundJobs(self, maxThreads=1)
+        self.jobs.resultReady.connect(self._onSearchResult)
+
+        self._pending = deque(maxlen=self.capacity)
+        self._dropped = 0
+        self._flushTimer = QTimer(self)
+        self._flushTimer.setInterval(perf_settings.get_timer_interval())
+        self._flushTimer.timeout.connect(self._flush)
+
     def append(self, text: str):
-        """Append a line of text to the log."""
-        self.textEdit.appendPlainText(text.rstrip())
-        # Ensure the latest text is visible
-        self.textEdit.moveCursor(self.textEdit.textCursor().End)
+        """Show a launcher message that is not part of the session log.
+
+        It is not classified, so the classifier's line numbers stay
+        those of the session log.
+        """
+        self._queue([text.rstrip()])
+
+    def appendLines(self, lines: Iterable[str]):
+        """Queue session lines for the next flush and classify them."""
+        lines = [line.rstrip() for line in lines]
+        self.classifier.feed(lines)
+        self._queue(lines)
+
+    def _queue(self, lines):
+        # The oldest lines drop out when the queue is full
+        before = len(self._pending)
+        added = len(lines)
+        self._pending.extend(lines)
+        self._dropped += max(0, before + added - self.capacity)
+        if added and not self._flushTimer.isActive():
+            self._flushTimer.start()
+
+    def clear(self):
+        self._pending.clear()
+        self._dropped = 0
+        self.tail.clear()
+        self.model.clear()
+        self.jobs.cancel()
+        self.reader = None
+        self.classifier.reset()
+        self._position = -1
+        self._updateCounts()
+        self.telemetry.hide()
+        self.follow()
+
+    def setSession(self, path: str):
+        """Search and browse the session log written to ``path``."""
+        self.jobs.cancel()
+        self.reader = SessionReader(path)
+        self._lastHit = None
+        self.status.clear()
+        self._counts = None
+        self._updateCounts()
+
+    def follow(self):
+        """Leave browsing and show the live tail again."""
+        if not self.live:
+            self.live = True
+            self.model.replace(self.tail)
+            self.view.scrollToBottom()
+        self.followButton.hide()
+
+    def goto(self, line: int):
+        """Show the logged lines around ``line`` (0-based) and select it."""
+        if self.reader is None:
+            return
+        total = len(self.reader)
+        line = max(0, min(line, total - 1))
+        start = max(0, line - self.BROWSE_LINES // 2)
+        self.live = False
+        self.followButton.show()
+        self.model.replace(self.reader.lines(start, self.BROWSE_LINES))
+        index = self.model.index(line - start)
+        self.view.setCurrentIndex(index)
+        self.view.scrollTo(index, QAbstractItemView.PositionAtCenter)
+        self.status.setText(f'Line {line + 1} of {total}')
+        self._position = line
+
+    def jumpTo(self, category: str):
+        """Show the next line of ``category`` after the current one."""
+        line = self.classifier.next_hit(category, self._position)
+        if line >= 0:
+            self.goto(line)
+
+    def _updateCounts(self):
+        counts = self.classifier.counts()
+        if counts == self._counts:
+            return
+        self._counts = counts
+        for key, button in self.categoryButtons.items():
+            button.setText(f'{LABELS[key]}: {counts[key]}')
+            button.setEnabled(bool(counts[key]) and self.reader is not None)
+
+    def search(self):
+        text = self.searchInput.text().strip()
+        if not text or self.reader is None:
+            return
+        if text.startswith(':') and text[1:].isdigit():
+            self.goto(int(text[1:]) - 1)
+            return
+        start = 0 if self._lastHit is None or self._lastHit[0] != text \
+            else self._lastHit[1] + 1
+        self.status.setText('Searching...')
+        self.jobs.cancel()
+        self.jobs.submit(text, self.reader.search, text, start)
+
+    def _onSearchResult(self, pattern, line):
+        if isinstance(line, Exception):
+            self.status.setText(f'Bad pattern: {line}')
+        elif line is None:
+            self._lastHit = None
+            self.status.setText('No more matches')
+        else:
+            self._lastHit = (pattern, line)
+            self.goto(line)
+
+    def setTelemetry(self, buffer):
+        """Show the samples of a :class:`src.telemetry.TelemetryBuffer`."""
+        if not self.isVisible():
+            return
+        samples = buffer.samples()
+        for field, sparkline in self.sparklines.items():
+            sparkline.setValues(samples[field])
+        self.telemetry.show()
+
+    def text(self) -> str:
+        """Return the lines currently held by the view."""
+        return '\n'.join(self.model.lines)
+
+    def _flush(self):
+        if not self._pending:
+            self._flushTimer.stop()
+            return
+        self._updateCounts()
+        bar = self.view.verticalScrollBar()
+        following = bar.value() >= bar.maximum() - 1
+        lines = list(self._pending)
+        self._pending.clear()
+        if self._dropped:
+            lines.insert(0, f'... {self._dropped} lines skipped ...')
+            self._dropped = 0
+        self.tail.extend(lines)
+        if not self.live:
+            return
+        self.model.extend(lines)
+        # Keep the latest text visible unless the user scrolled up
+        if following:
+            self.view.scrollToBottom()
+
+    def keyPressEvent(self, event):
+        if event.matches(QKeySequence.Copy):
+            rows = sorted(i.row() for i in self.view.selectionModel().selectedRows())
+            lines = self.model.lines
+            QApplication.clipboard().setText('\n'.join(lines[r] for r in rows))
+        else:
+            super().keyPressEvent(event)
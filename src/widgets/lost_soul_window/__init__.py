@@ -17,64 +17,47 @@ except ImportError:
             return 50
     perf_settings = FallbackPerfSettings()
 
-class BloodTextureCache:
-    """Cache for pre-generated blood texture frames to avoid real-time generation."""
-    _instance = None
-    _cache = {}
-    
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-        return cls._instance
-    
-    def get_texture(self, width, height, frame):
-        key = (width, height, frame)
-        if key not in self._cache:
-            self._cache[key] = self._generate_blood_frame(width, height, frame)
-            # Limit cache size to prevent memory issues
-            if len(self._cache) > 100:
-                # Remove oldest entries
-                oldest_key = next(iter(self._cache))
-                del self._cache[oldest_key]
-        return self._cache[key]
-    
-    def _generate_blood_frame(self, width, height, t):
-        """Generate a single blood texture frame - optimized version."""
-        # Pre-calculate common values
-        base = np.zeros((height, width, 3), dtype=np.uint8)
-        
-        # Vectorized operations for better performance
-        y_indices = np.arange(height).reshape(-1, 1)
-        x_indices = np.arange(width).reshape(1, -1)
-        
-        # Base color calculations (vectorized)
-        ymod = (y_indices + t // 3) % height
-        r_base = 160 + 40 * np.sin(ymod * 0.18 + t * 0.04)
-        g_base = 0 + 18 * np.cos(ymod * 0.13 + t * 0.03)
-        b_base = 0 + 10 * np.sin(ymod * 0.27 + t * 0.01)
-        
-        # Wave effects (vectorized)
-        blood_wave = 10 * np.sin((x_indices + t) * 0.09 + ymod * 0.08)
-        drip = 18 * np.cos(x_indices * 0.08 + t * 0.06)
-        
-        # Combine and clip
-        red = np.clip(r_base + blood_wave + drip, 90, 255)
-        green = np.clip(g_base + 6 * np.sin(x_indices * 0.15), 0, 64)
-        blue = np.clip(b_base + 8 * np.cos(x_indices * 0.12), 0, 40)
-        
-        base[:, :, 0] = red
-        base[:, :, 1] = green
-        base[:, :, 2] = blue
-        
-        image = QImage(base.data, width, height, 3 * width, QImage.Format_RGB888)
-        return QPixmap.fromImage(image)
+from src.pixmap_cache import pixmap_cache
+
+def generate_blood_frame(width, height, t):
+    """Generate a single blood texture frame - optimized version."""
+    # Pre-calculate common values
+    base = np.zeros((height, width, 3), dtype=np.uint8)
+
+    # Vectorized operations for better performance
+    y_indices = np.arange(height).reshape(-1, 1)
+    x_indices = np.arange(width).reshape(1, -1)
+
+    # Base color calculations (vectorized)
+    ymod = (y_indices + t // 3) % height
+    r_base = 160 + 40 * np.sin(ymod * 0.18 + t * 0.04)
+    g_base = 0 + 18 * np.cos(ymod * 0.13 + t * 0.03)
+    b_base = 0 + 10 * np.sin(ymod * 0.27 + t * 0.01)
+
+    # Wave effects (vectorized)
+    blood_wave = 10 * np.sin((x_indices + t) * 0.09 + ymod * 0.08)
+    drip = 18 * np.cos(x_indices * 0.08 + t * 0.06)
+
+    # Combine and clip
+    red = np.clip(r_base + blood_wave + drip, 90, 255)
+    green = np.clip(g_base + 6 * np.sin(x_indices * 0.15), 0, 64)
+    blue = np.clip(b_base + 8 * np.cos(x_indices * 0.12), 0, 40)
+
+    base[:, :, 0] = red
+    base[:, :, 1] = green
+    base[:, :, 2] = blue
+
+    image = QImage(base.data, width, height, 3 * width, QImage.Format_RGB888)
+    return QPixmap.fromImage(image)
 
 def generate_doom2_blood_texture(width, height, t=0):
-    """Optimized blood texture generation using cache."""
-    cache = BloodTextureCache()
+    """Blood texture frame from the shared pixmap cache."""
     # Reduce frame granularity to improve cache hits
-    frame = (t // 4) % 60  # 60 cached frames should be enough
-    return cache.get_texture(width, height, frame)
+    frames = max(1, perf_settings.get('blood_texture_cache_size', 60))
+    frame = (t // 4) % frames
+    return pixmap_cache.get_or_create(
+        ('blood', width, height, frame),
+        lambda: generate_blood_frame(width, height, frame))
 
 class ScrollingDoom2Texture(QWidget):
     """Optimized widget with cached blood texture background."""
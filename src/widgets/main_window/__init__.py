@@ -1,5 +1,4 @@
 import sys
-import json
 from PyQt5.Qt import Qt
 from PyQt5.QtCore import QEvent
 from PyQt5.QtWidgets import *  # noqa: F401,F403
@@ -19,8 +18,13 @@ from src.widgets.path_input import PathInput
 from src.widgets.launch_button import LaunchButton
 from src.widgets.log_window import LogWindow
 from src.widgets.pwad_info import PWadInfo
+from src.widgets.profile_bar import ProfileBar
 from src.widgets.lost_soul_window import LostSoulWindow
 from src.widgets.doom_soul_widget import DoomSoulWidget
+from src.library import LibraryService
+from src.conflicts import ConflictTracker
+from src.config_store import ConfigStore
+from src.profiles import LaunchProfile, ProfileStore
 
 from pathlib import Path, PurePath
 
@@ -131,9 +135,9 @@ class MainWindow(QMainWindow):
         self.pwadList = PWadList()
         self.pwadList.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         self.pwadList.setMinimumHeight(120)
-        for wad in self.config.get('lastPWads', []):
-            self.pwadList.addWad(wad)
+        self.pwadList.addWads(self.config.get('lastPWads', []))
         self.pwadList.orderChanged.connect(self.saveConfig)
+        self.pwadList.orderChanged.connect(self.updateConflicts)
         pwadLayout.addWidget(self.pwadList)
         
         # PWAD buttons
@@ -175,6 +179,22 @@ class MainWindow(QMainWindow):
         self.extraOptionsInput.setToolTip('Additional command line arguments')
         self.extraOptionsInput.setText(self.config.get('lastOptions', ''))
         optionsLayout.addWidget(self.extraOptionsInput)
+
+        # Several instances: a local netgame or parallel test copies
+        self.instancesInput = QSpinBox()
+        self.instancesInput.setRange(1, 8)
+        self.instancesInput.setValue(self.config.get('instances', 1))
+        self.instancesInput.setToolTip('Number of source port instances to start')
+        self.netgameCheck = QCheckBox('Local netgame')
+        self.netgameCheck.setChecked(self.config.get('netgame', True))
+        self.netgameCheck.setToolTip(
+            'Start one -host game and -join clients instead of independent copies')
+        instancesLayout = QHBoxLayout()
+        instancesLayout.addWidget(QLabel('Instances:'))
+        instancesLayout.addWidget(self.instancesInput)
+        instancesLayout.addWidget(self.netgameCheck)
+        instancesLayout.addStretch()
+        optionsLayout.addLayout(instancesLayout)
         
         # Launch button
         self.launchButton = LaunchButton(
@@ -187,6 +207,23 @@ class MainWindow(QMainWindow):
         )
         self.launchButton.setMinimumHeight(40)
         self.launchButton.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+        self.instancesInput.valueChanged.connect(self.updateInstances)
+        self.netgameCheck.toggled.connect(self.updateInstances)
+        self.updateInstances()
+
+        # Launch profiles
+        self.profiles = ProfileStore(parent=self)
+        self.profileGroup = QGroupBox("Launch Profile")
+        profileLayout = QVBoxLayout(self.profileGroup)
+        self.profileBar = ProfileBar(self.profiles)
+        self.profileBar.profileChosen.connect(self.applyProfile)
+        self.profileBar.saveRequested.connect(self.saveProfile)
+        self.profileBar.deleteRequested.connect(self.profiles.remove)
+        profileLayout.addWidget(self.profileBar)
+        self.launchButton.profileChanged.connect(self.onProfileChanged)
+        self.profiles.watch(self.launchButton.profile)
+        if self.config.get('lastProfile') in self.profiles.profiles:
+            self.applyProfile(self.config['lastProfile'])
         
         # === RIGHT PANEL WIDGETS ===
         
@@ -211,10 +248,20 @@ class MainWindow(QMainWindow):
         self.launchButton.logWindow = self.logWindow
         self.launchButton.loadingWindow = self.loadingWindow
         
+        # Load-order conflicts shown alongside the mod info
+        self.conflicts = ConflictTracker(self)
+        self.pwadInfo.conflicts = self.conflicts
+        self.conflicts.conflictsChanged.connect(self.pwadInfo.refresh)
+        self.updateConflicts()
+
         # Connect signals
         self.pwadList.itemSelectionChanged.connect(self.updatePWadInfo)
         self.updatePWadInfo()
 
+        # Background index of the mod folders
+        self.library = LibraryService(self)
+        self.library.setRoots(self.libraryRoots())
+
         self.installResponsiveLayout()
 
     def createMenu(self):
@@ -257,6 +304,7 @@ class MainWindow(QMainWindow):
         """Install the responsive layout with proper widget arrangement."""
         
         # === LEFT PANEL LAYOUT ===
+        self.leftLayout.addWidget(self.profileGroup)
         self.leftLayout.addWidget(self.sourcePortGroup)
         self.leftLayout.addWidget(self.iwadGroup)
         self.leftLayout.addWidget(self.pwadGroup, 1)  # Give PWAD list most space
@@ -286,32 +334,16 @@ class MainWindow(QMainWindow):
         self.iwadInput.setText(wad)
 
     def addPWads(self, wads: list):
-        dialog = self.loadingWindow
-        dialog.setRange(0, len(wads))
-        dialog.setValue(0)
-        dialog.show()
-        QApplication.setOverrideCursor(Qt.WaitCursor)
-        try:
-            for i, wad in enumerate(wads):
-                dialog.setValue(i)
-                if not self.pwadList.addWad(wad):
-                    msg = (
-                        f"The wad {wad} has already "
-                        "been added to the wad list."
-                    )
-                    self.errorDialog.showMessage(msg)
-                QApplication.processEvents()
-            dialog.setValue(len(wads))
-        finally:
-            QApplication.restoreOverrideCursor()
-            dialog.hide()
-        self.saveConfig()
+        # One batch: the list emits orderChanged (and so saves) only once
+        duplicates = self.pwadList.addWads(wads)
+        if duplicates:
+            shown = '<br>'.join(duplicates[:20])
+            more = '<br>...' if len(duplicates) > 20 else ''
+            self.errorDialog.showMessage(
+                f"Already in the wad list:<br>{shown}{more}")
 
     def removeSelectedPWads(self):
-        for item in self.pwadList.selectedItems():
-            index = self.pwadList.indexOfTopLevelItem(item)
-            self.pwadList.takeTopLevelItem(index)
-        self.saveConfig()
+        self.pwadList.removeSelected()
 
     def center(self):
         qr = self.frameGeometry()
@@ -326,43 +358,45 @@ class MainWindow(QMainWindow):
         else:
             if filename:
                 self.config["pwadDir"] = str(PurePath(filename[0]).parent)
+                self.library.setRoots(self.libraryRoots())
         self.saveConfig()
 
+    def libraryRoots(self):
+        """Folders indexed by the mod library.
+
+        The default pwadDir is the home directory, which is never walked;
+        extra folders can be listed under "libraryRoots" in the config.
+        """
+        roots = list(self.config.get('libraryRoots', []))
+        pwadDir = self.config.get('pwadDir')
+        if pwadDir and Path(pwadDir) != Path.home():
+            roots.append(pwadDir)
+        return roots
+
     def saveSourcePortPath(self, filename: str):
         self.config["sourcePortDir"] = str(PurePath(filename).parent)
         self.config["lastSourcePort"] = filename
         self.saveConfig()
 
     def getConfig(self):
-        configData = {}
-        if Path("config.json").exists():
-            with open('config.json', 'r') as fp:
-                configData = json.load(fp)
-        else:
-            home = str(Path.home())
-            configData = {
-                "sourcePortDir": home,
-                "iwadDir": home,
-                "pwadDir": home,
-                "lastIWad": "",
-                "lastPWads": [],
-                "lastSourcePort": "gzdoom",
-                "lastOptions": "",
-                "animatedBackground": False,
-            }
-        return configData
+        config = ConfigStore(parent=self)
+        QApplication.instance().aboutToQuit.connect(config.flush)
+        return config
 
     def saveConfig(self):
+        """Copy the UI state into the config store.
+
+        The store only schedules a (coalesced) write when a value
+        actually changed, so this is cheap to call after every edit.
+        """
         self.config["lastIWad"] = self.iwadInput.text()
-        self.config["lastPWads"] = [
-            item.data(0, Qt.UserRole) for item in self.pwadList.getItems()
-        ]
+        self.config["lastPWads"] = self.pwadList.paths()
         self.config["lastSourcePort"] = self.sourcePortPathInput.text()
         self.config["lastOptions"] = self.extraOptionsInput.text()
+        self.config["instances"] = self.instancesInput.value()
+        self.config["netgame"] = self.netgameCheck.isChecked()
         self.config["animatedBackground"] = self.animatedBgAction.isChecked()
         self.config["performanceMode"] = getattr(self, 'performanceModeAction', type('obj', (object,), {'isChecked': lambda: False})()).isChecked()
-        with open('config.json', 'w') as fp:
-            json.dump(self.config, fp)
 
     def resizeEvent(self, event):
         """Handle window resize to adjust layout dynamically."""
@@ -403,15 +437,49 @@ class MainWindow(QMainWindow):
 
     def closeEvent(self, event):
         self.saveConfig()
+        self.config.flush()
+        self.profiles.flush()
         super().closeEvent(event)
 
+    def applyProfile(self, name: str):
+        """Switch the inputs and the launch command to a saved profile."""
+        profile = self.profiles.get(name)
+        if profile is None:
+            return
+        self.launchButton.setProfile(profile)
+        self.profileBar.setCurrent(name)
+        self.config['lastProfile'] = name
+        self.saveConfig()
+
+    def saveProfile(self, name: str):
+        current = self.launchButton.profile
+        profile = LaunchProfile(name, current.port, current.iwad, current.pwads,
+                                current.options, current.env)
+        self.profiles.put(profile)
+        self.applyProfile(name)
+
+    def onProfileChanged(self, profile):
+        """An input was edited: watch the working profile's files."""
+        self.profiles.watch(profile)
+        self.profileBar.setCurrent(profile.name)
+        if not profile.name:
+            self.config['lastProfile'] = ''
+
+    def updateInstances(self):
+        self.launchButton.setInstances(
+            self.instancesInput.value(), self.netgameCheck.isChecked())
+        self.netgameCheck.setEnabled(self.instancesInput.value() > 1)
+        self.saveConfig()
+
     def updatePWadInfo(self):
         """Update the mod info panel based on current selection."""
-        paths = [
-            item.data(0, Qt.UserRole)
-            for item in self.pwadList.selectedItems()
-        ]
-        self.pwadInfo.showInfo(paths)
+        self.pwadInfo.showInfo(
+            self.pwadList.selectedPaths(), self.iwadInput.text())
+
+    def updateConflicts(self):
+        """Feed the current load order to the conflict tracker."""
+        if hasattr(self, 'conflicts'):
+            self.conflicts.setOrder(self.pwadList.paths())
 
     def toggleAnimatedBackground(self):
         """Toggle the animated background on/off."""
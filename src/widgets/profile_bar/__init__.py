@@ -0,0 +1,83 @@
+from PyQt5.QtWidgets import (
+    QWidget,
+    QHBoxLayout,
+    QComboBox,
+    QPushButton,
+    QInputDialog,
+)
+from PyQt5.QtCore import pyqtSignal
+
+UNSAVED = '(current settings)'
+
+
+class ProfileBar(QWidget):
+    """Combo box of saved launch profiles with save and delete buttons."""
+
+    profileChosen = pyqtSignal(str)
+    saveRequested = pyqtSignal(str)
+    deleteRequested = pyqtSignal(str)
+
+    def __init__(self, store):
+        super().__init__()
+        self.store = store
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(4)
+
+        self.combo = QComboBox()
+        self.combo.setToolTip('Switch between saved launch setups')
+        self.combo.activated.connect(self._onActivated)
+
+        self.saveButton = QPushButton('Save As...')
+        self.saveButton.setToolTip('Save the current setup as a profile')
+        self.saveButton.clicked.connect(self._onSave)
+
+        self.deleteButton = QPushButton('Delete')
+        self.deleteButton.setToolTip('Delete the selected profile')
+        self.deleteButton.clicked.connect(self._onDelete)
+
+        layout.addWidget(self.combo, 1)
+        layout.addWidget(self.saveButton)
+        layout.addWidget(self.deleteButton)
+
+        store.profilesChanged.connect(self.reload)
+        self.reload()
+
+    def current(self) -> str:
+        return self.combo.currentData() or ''
+
+    def reload(self):
+        current = self.current()
+        self.combo.blockSignals(True)
+        self.combo.clear()
+        self.combo.addItem(UNSAVED, '')
+        for name in self.store.names():
+            self.combo.addItem(name, name)
+        self.combo.blockSignals(False)
+        self.setCurrent(current)
+
+    def setCurrent(self, name: str):
+        """Select ``name`` without emitting ``profileChosen``."""
+        index = self.combo.findData(name) if name else 0
+        self.combo.blockSignals(True)
+        self.combo.setCurrentIndex(max(index, 0))
+        self.combo.blockSignals(False)
+        self.deleteButton.setEnabled(bool(self.current()))
+
+    def _onActivated(self, index):
+        name = self.combo.itemData(index) or ''
+        self.deleteButton.setEnabled(bool(name))
+        if name:
+            self.profileChosen.emit(name)
+
+    def _onSave(self):
+        name, ok = QInputDialog.getText(
+            self, 'Save Profile', 'Profile name:', text=self.current())
+        name = name.strip()
+        if ok and name:
+            self.saveRequested.emit(name)
+
+    def _onDelete(self):
+        name = self.current()
+        if name:
+            self.deleteRequested.emit(name)
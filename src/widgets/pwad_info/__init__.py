@@ -1,70 +1,147 @@
-import os
 import datetime
-import struct
 import zipfile
 from PyQt5.QtWidgets import (
     QGroupBox,
     QVBoxLayout,
     QPlainTextEdit,
-    QApplication,
+    QLabel,
+    QComboBox,
 )
+from PyQt5.QtGui import QPixmap
+from PyQt5.QtCore import QTimer
 from PyQt5.Qt import Qt
 
+from src.map_preview import render_preview
+from src.file_info import stat_cache
+from src.map_stats import analyze_wad, format_stats
+from src.metadata_cache import metadata_cache
+from src.pk3 import Pk3Inspector, is_zip
+from src.thumbnails import title_thumbnail
+from src.wad import WadFile, WadError
+from src.workers import BackgroundJobs
 
-def _wad_details(path: str) -> str:
-    info = []
+
+LISTING_LIMIT = 20
+# Bump when the summary layout changes so stale cache records are reparsed
+SUMMARY_VERSION = 3
+
+
+def _wad_summary(path: str) -> dict:
     try:
-        with open(path, 'rb') as fh:
-            ident = fh.read(4).decode('ascii', 'ignore')
-            if ident not in {'IWAD', 'PWAD'}:
-                return ''
-            num = struct.unpack('<I', fh.read(4))[0]
-            offset = struct.unpack('<I', fh.read(4))[0]
-            info.append(f'Type: {ident}')
-            info.append(f'Lumps: {num}')
-            fh.seek(offset)
-            for i in range(min(num, 20)):
-                pos, size = struct.unpack('<II', fh.read(8))
-                name = fh.read(8).decode('ascii', 'ignore').rstrip('\0')
-                info.append(f' {i:03d}: {name} ({size} bytes)')
-        if num > 20:
-            info.append(' ...')
-    except OSError:
-        pass
-    return '\n'.join(info)
+        with WadFile(path) as wad:
+            count = min(len(wad), LISTING_LIMIT)
+            return {
+                'kind': 'wad',
+                'ident': wad.ident,
+                'entries': len(wad),
+                'maps': list(wad.maps()),
+                'mapstats': analyze_wad(wad),
+                'listing': list(zip(
+                    wad.names[:count].tolist(), wad.sizes[:count].tolist())),
+            }
+    except (OSError, WadError):
+        return {}
 
 
-def _pk3_details(path: str) -> str:
-    info = []
+def _pk3_summary(path: str) -> dict:
     try:
-        with zipfile.ZipFile(path) as zf:
-            info.append(f'ZIP entries: {len(zf.infolist())}')
-            for zi in zf.infolist()[:20]:
-                info.append(f' {zi.filename} ({zi.file_size} bytes)')
-            if len(zf.infolist()) > 20:
-                info.append(' ...')
+        with Pk3Inspector(path) as pk3:
+            files = pk3.files()
+            return {
+                'kind': 'pk3',
+                'entries': len(files),
+                'folders': pk3.folders(),
+                'nested': pk3.nested_summary(),
+                'listing': [
+                    (zi.filename, zi.file_size)
+                    for zi in files[:LISTING_LIMIT]
+                ],
+            }
     except (OSError, zipfile.BadZipFile):
-        pass
+        return {}
+
+
+def _wad_details(summary: dict) -> str:
+    info = [f'Type: {summary["ident"]}', f'Lumps: {summary["entries"]}']
+    mapstats = summary.get('mapstats')
+    if mapstats:
+        info.append(
+            f'Maps: {len(mapstats)} (monsters/items easy/medium/hard)')
+        for name, stats in mapstats.items():
+            info.append(format_stats(name, stats))
+    for i, (name, size) in enumerate(summary['listing']):
+        info.append(f' {i:03d}: {name} ({size} bytes)')
+    if summary['entries'] > LISTING_LIMIT:
+        info.append(' ...')
+    return '\n'.join(info)
+
+
+def _pk3_details(summary: dict) -> str:
+    info = [f'ZIP entries: {summary["entries"]}']
+    folders = summary.get('folders')
+    if folders:
+        info.append('Folders: ' + ', '.join(
+            f'{name or "/"} ({count})' for name, count in sorted(folders.items())))
+    for nested in summary.get('nested', []):
+        if 'error' in nested:
+            info.append(f' {nested["name"]}: {nested["error"]}')
+            continue
+        maps = ', '.join(nested['maps'])
+        info.append(
+            f' {nested["name"]}: {nested["ident"]}, {nested["entries"]} lumps'
+            + (f', maps {maps}' if maps else ''))
+    for name, size in summary['listing']:
+        info.append(f' {name} ({size} bytes)')
+    if summary['entries'] > LISTING_LIMIT:
+        info.append(' ...')
     return '\n'.join(info)
 
 
+def summarize(path: str, stat=None) -> dict:
+    """Return the parsed summary of a mod, served from the cache if fresh."""
+    if stat is None:
+        stat = stat_cache.stat(path)
+        if stat is None:
+            return {}
+    summary = metadata_cache.get(path, stat)
+    if summary is None or summary.get('version') != SUMMARY_VERSION:
+        try:
+            archive = path.lower().endswith('.pk3') or is_zip(path)
+        except OSError:
+            archive = False
+        if archive:
+            summary = _pk3_summary(path)
+        else:
+            summary = _wad_summary(path)
+        summary['version'] = SUMMARY_VERSION
+        metadata_cache.put(path, stat, summary)
+    return summary
+
+
+def map_ids(path: str) -> list:
+    """Return the maps of a mod as ids accepted by :func:`render_preview`."""
+    summary = summarize(path)
+    if summary.get('kind') == 'pk3':
+        return [
+            f'{nested["name"]}:{name}'
+            for nested in summary.get('nested', []) for name in nested.get('maps', [])
+        ]
+    return list(summary.get('maps', []))
+
+
 def describe(path: str) -> str:
     lines = [f'Path: {path}']
-    try:
-        stat = os.stat(path)
-        lines.append(f'Size: {stat.st_size} bytes')
-        mtime = datetime.datetime.fromtimestamp(stat.st_mtime)
-        lines.append(f'Modified: {mtime:%Y-%m-%d %H:%M:%S}')
-    except OSError:
-        pass
-    if path.lower().endswith('.pk3') or zipfile.is_zipfile(path):
-        detail = _pk3_details(path)
-        if detail:
-            lines.append(detail)
-    else:
-        detail = _wad_details(path)
-        if detail:
-            lines.append(detail)
+    stat = stat_cache.stat(path)
+    if stat is None:
+        return lines[0]
+    lines.append(f'Size: {stat.st_size} bytes')
+    mtime = datetime.datetime.fromtimestamp(stat.st_mtime)
+    lines.append(f'Modified: {mtime:%Y-%m-%d %H:%M:%S}')
+    summary = summarize(path, stat)
+    if summary.get('kind') == 'pk3':
+        lines.append(_pk3_details(summary))
+    elif summary.get('kind') == 'wad':
+        lines.append(_wad_details(summary))
     return '\n'.join(lines)
 
 
@@ -85,21 +162,126 @@ class PWadInfo(QGroupBox):
         from PyQt5.QtWidgets import QSizePolicy
         self.text.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         
+        # Title screen of the first selected mod, when it has one
+        self.thumbnail = QLabel()
+        self.thumbnail.setAlignment(Qt.AlignCenter)
+        self.thumbnail.hide()
+
+        # Automap-style overview of the map picked in the combo box
+        self.maps = QComboBox()
+        self.maps.setToolTip('Preview a map of the first selected mod')
+        self.maps.currentIndexChanged.connect(self._onMapChosen)
+        self.maps.hide()
+        self.preview = QLabel()
+        self.preview.setAlignment(Qt.AlignCenter)
+        self.preview.hide()
+
+        layout.addWidget(self.thumbnail)
+        layout.addWidget(self.maps)
+        layout.addWidget(self.preview)
         layout.addWidget(self.text)
         self.setLayout(layout)
 
-    def showInfo(self, paths):
-        """Display information for selected mod paths with a busy cursor."""
-        if not paths:
+        self._paths = []
+        self._details = {}
+        self.conflicts = None  # set by MainWindow
+        self.jobs = BackgroundJobs(self)
+        self.jobs.resultReady.connect(self._onResult)
+        # Results for large selections arrive in bursts; redraw once per burst
+        self._renderTimer = QTimer(self)
+        self._renderTimer.setSingleShot(True)
+        self._renderTimer.setInterval(50)
+        self._renderTimer.timeout.connect(self._render)
+
+    def showInfo(self, paths, iwad=None):
+        """Display information for selected mod paths as it is parsed.
+
+        Parsing runs on the worker pool; each file's description replaces
+        its placeholder as soon as it is ready. A new selection cancels
+        whatever is still outstanding from the previous one. ``iwad``
+        supplies the fallback palette for title screen thumbnails.
+        """
+        self.jobs.cancel()
+        self._paths = list(paths)
+        self._details = {}
+        self.thumbnail.hide()
+        self._showMaps([])
+        if not self._paths:
             self.text.clear()
             return
+        self.jobs.submit(('thumbnail', self._paths[0]), title_thumbnail,
+                         self._paths[0], iwad or None)
+        self.jobs.submit(('maps', self._paths[0]), map_ids, self._paths[0])
+        for path in self._paths:
+            self.jobs.submit(path, describe, path)
+        self._render()
 
-        # Indicate the UI is busy while large mods are parsed
-        self.text.setPlainText("Loading...")
-        QApplication.processEvents()
-        QApplication.setOverrideCursor(Qt.WaitCursor)
-        try:
-            details = '\n\n'.join(describe(p) for p in paths)
-            self.text.setPlainText(details)
-        finally:
-            QApplication.restoreOverrideCursor()
+    def _onResult(self, path, result):
+        if isinstance(path, tuple):
+            kind = path[0]
+            if kind == 'thumbnail':
+                self._showThumbnail(result)
+            elif kind == 'maps' and not isinstance(result, Exception):
+                self._showMaps(result)
+            elif kind == 'preview' and path[2] == self.maps.currentText():
+                self._showPreview(result)
+            return
+        if isinstance(result, Exception):
+            result = f'Path: {path}\nError: {result}'
+        self._details[path] = result
+        if not self._renderTimer.isActive():
+            self._renderTimer.start()
+
+    def _showThumbnail(self, png):
+        if not png or isinstance(png, Exception):
+            return
+        pixmap = QPixmap(png)
+        if pixmap.isNull():
+            return
+        width = max(64, self.text.width())
+        self.thumbnail.setPixmap(pixmap.scaledToWidth(
+            min(width, pixmap.width() * 2), Qt.FastTransformation))
+        self.thumbnail.show()
+
+    def _showMaps(self, ids):
+        self.maps.blockSignals(True)
+        self.maps.clear()
+        self.maps.addItems(ids)
+        self.maps.blockSignals(False)
+        self.maps.setVisible(bool(ids))
+        self.preview.hide()
+        if ids:
+            self._onMapChosen(0)
+
+    def _onMapChosen(self, index):
+        if index < 0 or not self._paths:
+            return
+        map_id = self.maps.itemText(index)
+        self.jobs.submit(('preview', self._paths[0], map_id),
+                         render_preview, self._paths[0], map_id)
+
+    def _showPreview(self, png):
+        pixmap = QPixmap(png) if png and not isinstance(png, Exception) else QPixmap()
+        if pixmap.isNull():
+            self.preview.hide()
+            return
+        self.preview.setPixmap(pixmap)
+        self.preview.show()
+
+    def _render(self):
+        details = '\n\n'.join(self._describe(p) for p in self._paths)
+        scroll = self.text.verticalScrollBar().value()
+        self.text.setPlainText(details)
+        self.text.verticalScrollBar().setValue(scroll)
+
+    def _describe(self, path):
+        text = self._details.get(path, f'Path: {path}\nLoading...')
+        report = self.conflicts.summary(path) if self.conflicts else None
+        if report:
+            text = f'{text}\n{report}'
+        return text
+
+    def refresh(self):
+        """Re-render the panel without reparsing the selected mods."""
+        if self._paths:
+            self._render()
@@ -1,99 +1,330 @@
+import datetime
 import os
+from typing import Dict, Iterable, List, Optional
+
 from PyQt5.Qt import Qt
-from PyQt5.QtWidgets import (
-    QTreeWidget,
-    QTreeWidgetItem,
-    QAbstractItemView,
+from PyQt5.QtWidgets import QTreeView, QAbstractItemView
+from PyQt5.QtCore import (
+    QAbstractTableModel,
+    QMimeData,
+    QModelIndex,
+    pyqtSignal,
 )
-from PyQt5.QtCore import pyqtSignal
 
+from src.file_info import stat_cache
+from src.workers import BackgroundJobs
+
+ROW_MIME_TYPE = 'application/x-doomed-pwad-rows'
+INFO_BATCH = 64
+PENDING = '…'
 
-def _file_size(path: str) -> str:
+
+def _file_size(info: Optional[dict]) -> str:
     """Return file size in kilobytes formatted as a string."""
-    try:
-        size_kb = os.path.getsize(path) // 1024
-        return f"{size_kb} KB"
-    except OSError:
+    if info is None:
         return "?"
+    return f"{info['size'] // 1024} KB"
+
 
+class PWadModel(QAbstractTableModel):
+    """Ordered list of mod paths with a path -> row index.
 
-class PWadList(QTreeWidget):
-    """Tree widget listing PWAD/PK3 files."""
+    Rows live in plain lists indexed by row number; ``_rows`` maps each
+    path back to its row so duplicate checks are O(1). Every bulk
+    operation is a single model transaction and emits ``orderChanged``
+    once, however many rows it touches.
+
+    Size, type and lump count are filled in from the shared stat cache
+    by background jobs, one batch of rows per job, so adding mods never
+    touches the filesystem on the GUI thread.
+    """
+
+    COLUMNS = ("Mod", "Size", "Type", "Lumps", "Folder")
 
     orderChanged = pyqtSignal()
 
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._paths: List[str] = []
+        self._info: List[Optional[dict]] = []
+        self._loaded: List[bool] = []
+        self._rows: Dict[str, int] = {}
+        self.jobs = BackgroundJobs(self)
+        self.jobs.resultReady.connect(self._onInfo)
+
+    # --- Qt model interface -------------------------------------------
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._paths)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        path = self._paths[row]
+        if role == Qt.DisplayRole:
+            column = index.column()
+            if column == 0:
+                return os.path.basename(path)
+            if column == len(self.COLUMNS) - 1:
+                return os.path.dirname(path)
+            if not self._loaded[row]:
+                return PENDING
+            info = self._info[row]
+            if column == 1:
+                return _file_size(info)
+            if info is None:
+                return "?"
+            if column == 2:
+                return info['type']
+            return "?" if info['lumps'] is None else str(info['lumps'])
+        if role == Qt.TextAlignmentRole and index.column() in (1, 3):
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        if role == Qt.ToolTipRole and index.column() == 0:
+            info = self._info[row]
+            if info is None:
+                return path
+            mtime = datetime.datetime.fromtimestamp(info['mtime'])
+            return f'{path}\nModified: {mtime:%Y-%m-%d %H:%M:%S}'
+        if role == Qt.UserRole:
+            return path
+        return None
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if index.isValid():
+            return flags | Qt.ItemIsDragEnabled
+        return flags | Qt.ItemIsDropEnabled
+
+    def supportedDropActions(self):
+        return Qt.MoveAction
+
+    def mimeTypes(self):
+        return [ROW_MIME_TYPE]
+
+    def mimeData(self, indexes):
+        rows = sorted({i.row() for i in indexes})
+        mime = QMimeData()
+        mime.setData(ROW_MIME_TYPE, ','.join(map(str, rows)).encode('ascii'))
+        return mime
+
+    def dropMimeData(self, data, action, row, column, parent):
+        if action != Qt.MoveAction or not data.hasFormat(ROW_MIME_TYPE):
+            return False
+        rows = [int(r) for r in bytes(data.data(ROW_MIME_TYPE)).decode().split(',') if r]
+        if row < 0:
+            row = parent.row() if parent.isValid() else len(self._paths)
+        self.moveRowsTo(rows, row)
+        # The rows were moved here already; the view must not remove them
+        return False
+
+    # --- Row store ------------------------------------------------------
+
+    def paths(self) -> List[str]:
+        return list(self._paths)
+
+    def path(self, row: int) -> str:
+        return self._paths[row]
+
+    def rowOf(self, path: str) -> int:
+        return self._rows.get(path, -1)
+
+    def __contains__(self, path: str):
+        return path in self._rows
+
+    def _reindex(self, start: int = 0):
+        for row in range(start, len(self._paths)):
+            self._rows[self._paths[row]] = row
+
+    def addPaths(self, paths: Iterable[str]) -> List[str]:
+        """Append every path not yet listed; returns the skipped duplicates."""
+        fresh, duplicates, seen = [], [], set()
+        for path in paths:
+            if path in self._rows or path in seen:
+                duplicates.append(path)
+            else:
+                seen.add(path)
+                fresh.append(path)
+        if fresh:
+            first = len(self._paths)
+            self.beginInsertRows(QModelIndex(), first, first + len(fresh) - 1)
+            self._paths.extend(fresh)
+            self._info.extend([None] * len(fresh))
+            self._loaded.extend([False] * len(fresh))
+            self._reindex(first)
+            self.endInsertRows()
+            self.orderChanged.emit()
+            self.refreshInfo(fresh)
+        return duplicates
+
+    def setPaths(self, paths: Iterable[str]):
+        """Replace the whole list in one model reset."""
+        paths = list(dict.fromkeys(paths))
+        if paths == self._paths:
+            return
+        self.beginResetModel()
+        self._paths = paths
+        self._info = [None] * len(paths)
+        self._loaded = [False] * len(paths)
+        self._rows = {}
+        self._reindex()
+        self.endResetModel()
+        self.orderChanged.emit()
+        self.refreshInfo()
+
+    def refreshInfo(self, paths: Optional[Iterable[str]] = None):
+        """Queue metadata lookups for ``paths`` (default: every row)."""
+        paths = list(self._paths if paths is None else paths)
+        for start in range(0, len(paths), INFO_BATCH):
+            batch = paths[start:start + INFO_BATCH]
+            self.jobs.submit('info', stat_cache.infos, batch)
+
+    def _onInfo(self, _key, result):
+        if isinstance(result, Exception):
+            return
+        rows = []
+        for path, info in result:
+            row = self._rows.get(path)
+            if row is not None:
+                self._info[row] = info
+                self._loaded[row] = True
+                rows.append(row)
+        if rows:
+            self.dataChanged.emit(
+                self.index(min(rows), 1),
+                self.index(max(rows), len(self.COLUMNS) - 2))
+
+    def removeRowList(self, rows: Iterable[int]):
+        """Remove the given rows, one Qt notification per contiguous run."""
+        rows = sorted(set(r for r in rows if 0 <= r < len(self._paths)))
+        if not rows:
+            return
+        # Collapse into runs and remove bottom-up so row numbers stay valid
+        runs = []
+        for row in rows:
+            if runs and runs[-1][1] == row - 1:
+                runs[-1][1] = row
+            else:
+                runs.append([row, row])
+        for first, last in reversed(runs):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            for path in self._paths[first:last + 1]:
+                del self._rows[path]
+            del self._paths[first:last + 1]
+            del self._info[first:last + 1]
+            del self._loaded[first:last + 1]
+            self.endRemoveRows()
+        self._reindex(rows[0])
+        self.orderChanged.emit()
+
+    def _reorder(self, order: List[int]):
+        """Apply a permutation (new row -> old row) as one layout change."""
+        if order == list(range(len(order))):
+            return
+        self.layoutAboutToBeChanged.emit()
+        new_row = [0] * len(order)
+        for new, old in enumerate(order):
+            new_row[old] = new
+        self._paths = [self._paths[i] for i in order]
+        self._info = [self._info[i] for i in order]
+        self._loaded = [self._loaded[i] for i in order]
+        self._reindex()
+        persistent = self.persistentIndexList()
+        self.changePersistentIndexList(persistent, [
+            self.index(new_row[i.row()], i.column()) for i in persistent
+        ])
+        self.layoutChanged.emit()
+        self.orderChanged.emit()
+
+    def moveRowsTo(self, rows: Iterable[int], destination: int):
+        """Move ``rows`` (kept in order) so they land before ``destination``."""
+        moving = sorted(set(r for r in rows if 0 <= r < len(self._paths)))
+        if not moving:
+            return
+        selected = set(moving)
+        before = [r for r in range(destination) if r not in selected]
+        after = [r for r in range(destination, len(self._paths)) if r not in selected]
+        self._reorder(before + moving + after)
+
+    def shiftRows(self, rows: Iterable[int], delta: int):
+        """Move each of ``rows`` one step up (-1) or down (+1).
+
+        Rows blocked by the list edge or by another moving row that is
+        blocked stay put, like repeatedly pressing the move buttons.
+        """
+        selected = set(rows)
+        order = list(range(len(self._paths)))
+        scan = range(len(order)) if delta < 0 else range(len(order) - 1, -1, -1)
+        for pos in scan:
+            target = pos + delta
+            if order[pos] in selected and 0 <= target < len(order) \
+                    and order[target] not in selected:
+                order[pos], order[target] = order[target], order[pos]
+        self._reorder(order)
+
+
+class PWadList(QTreeView):
+    """Tree view listing PWAD/PK3 files, backed by :class:`PWadModel`."""
+
+    orderChanged = pyqtSignal()
+    itemSelectionChanged = pyqtSignal()
+
     def __init__(self):
         super().__init__()
-        self.setColumnCount(3)
-        self.setHeaderLabels(["Mod", "Size", "Folder"])
+        self.pwadModel = PWadModel(self)
+        self.setModel(self.pwadModel)
+        self.pwadModel.orderChanged.connect(self.orderChanged)
+        self.selectionModel().selectionChanged.connect(self.itemSelectionChanged)
         self.setDragDropMode(QAbstractItemView.InternalMove)
+        self.setDefaultDropAction(Qt.MoveAction)
         self.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.setRootIsDecorated(False)
+        self.setUniformRowHeights(True)
         self.setToolTip('Drag to reorder mods. Delete key removes entries.')
 
+    def selectedRows(self) -> List[int]:
+        return sorted(i.row() for i in self.selectionModel().selectedRows())
+
+    def selectedPaths(self) -> List[str]:
+        return [self.pwadModel.path(r) for r in self.selectedRows()]
+
+    def paths(self) -> List[str]:
+        return self.pwadModel.paths()
+
     def moveUp(self):
         """Move the selected items up by one position."""
-        selected = self.selectedItems()
-        if not selected:
-            return
-        for item in selected:
-            idx = self.indexOfTopLevelItem(item)
-            if idx > 0:
-                self.takeTopLevelItem(idx)
-                self.insertTopLevelItem(idx - 1, item)
-                self.setCurrentItem(item)
-        if selected:
-            self.orderChanged.emit()
+        self.pwadModel.shiftRows(self.selectedRows(), -1)
 
     def moveDown(self):
         """Move the selected items down by one position."""
-        selected = self.selectedItems()
-        if not selected:
-            return
-        # process in reverse to avoid leapfrogging
-        for item in reversed(selected):
-            idx = self.indexOfTopLevelItem(item)
-            if idx < self.topLevelItemCount() - 1:
-                self.takeTopLevelItem(idx)
-                self.insertTopLevelItem(idx + 1, item)
-                self.setCurrentItem(item)
-        if selected:
-            self.orderChanged.emit()
+        self.pwadModel.shiftRows(self.selectedRows(), 1)
+
+    def removeSelected(self):
+        self.pwadModel.removeRowList(self.selectedRows())
 
     def keyPressEvent(self, event):
         if event.key() == Qt.Key_Delete:
-            deleted = False
-            for item in self.selectedItems():
-                index = self.indexOfTopLevelItem(item)
-                self.takeTopLevelItem(index)
-                deleted = True
-            if deleted:
-                self.orderChanged.emit()
+            self.removeSelected()
         else:
             super().keyPressEvent(event)
 
-    def dropEvent(self, event):
-        super().dropEvent(event)
-        self.orderChanged.emit()
+    def addWads(self, paths: Iterable[str]) -> List[str]:
+        """Add several wads at once; returns those already in the list."""
+        return self.pwadModel.addPaths(paths)
 
-    def getItems(self):
-        items = []
-        for n in range(self.topLevelItemCount()):
-            items.append(self.topLevelItem(n))
-        return items
+    def setWads(self, paths: Iterable[str]):
+        """Replace the list, e.g. when switching launch profiles."""
+        self.pwadModel.setPaths(paths)
 
     def addWad(self, path: str):
         """Add a wad entry with size information if not already present."""
-        paths = [i.data(0, Qt.UserRole) for i in self.getItems()]
-        if path in paths:
-            return False
-        item = QTreeWidgetItem([
-            os.path.basename(path),
-            _file_size(path),
-            os.path.dirname(path),
-        ])
-        item.setToolTip(0, path)
-        item.setData(0, Qt.UserRole, path)
-        self.addTopLevelItem(item)
-        self.orderChanged.emit()
-        return True
+        return not self.addWads([path])
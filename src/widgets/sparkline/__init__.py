@@ -0,0 +1,56 @@
+import numpy as np
+from PyQt5.QtWidgets import QWidget, QSizePolicy
+from PyQt5.QtCore import QPointF, QSize, Qt
+from PyQt5.QtGui import QPainter, QPen, QColor, QPolygonF
+
+
+class Sparkline(QWidget):
+    """Small line chart of a series with its latest value as text.
+
+    Series longer than the widget is wide are reduced to one maximum per
+    pixel column, so spikes stay visible and painting stays cheap.
+    """
+
+    def __init__(self, title: str, unit: str = '', scale: float = 1.0,
+                 color: str = '#FFFF00'):
+        super().__init__()
+        self.title = title
+        self.unit = unit
+        self.scale = scale
+        self.color = QColor(color)
+        self._values = np.empty(0, dtype=np.float32)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+
+    def sizeHint(self):
+        return QSize(160, 48)
+
+    def minimumSizeHint(self):
+        return QSize(80, 48)
+
+    def setValues(self, values):
+        self._values = np.asarray(values, dtype=np.float32) / self.scale
+        self.update()
+
+    def _columns(self, width: int) -> np.ndarray:
+        values = self._values
+        if len(values) <= width:
+            return values
+        edges = np.linspace(0, len(values), width + 1).astype(np.intp)
+        return np.maximum.reduceat(values, edges[:-1])
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        rect = self.rect().adjusted(1, self.fontMetrics().height() + 2, -1, -1)
+        painter.setPen(self.palette().windowText().color())
+        latest = f'{self._values[-1]:.0f}{self.unit}' if len(self._values) else '-'
+        painter.drawText(self.rect().adjusted(2, 0, -2, 0), Qt.AlignTop | Qt.AlignLeft, self.title)
+        painter.drawText(self.rect().adjusted(2, 0, -2, 0), Qt.AlignTop | Qt.AlignRight, latest)
+        values = self._columns(max(1, rect.width()))
+        if len(values) < 2:
+            return
+        top = max(float(values.max()), 1e-6)
+        xs = rect.left() + np.arange(len(values)) * (rect.width() / (len(values) - 1))
+        ys = rect.bottom() - values / top * rect.height()
+        painter.setRenderHint(QPainter.Antialiasing, False)
+        painter.setPen(QPen(self.color, 1))
+        painter.drawPolyline(QPolygonF([QPointF(x, y) for x, y in zip(xs.tolist(), ys.tolist())]))
@@ -0,0 +1,68 @@
+"""Background job helpers built on QThreadPool."""
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class _JobSignals(QObject):
+    done = pyqtSignal(int, object, object)
+
+
+class _Job(QRunnable):
+
+    def __init__(self, owner, generation, key, fn, args):
+        super().__init__()
+        self.owner = owner
+        self.generation = generation
+        self.key = key
+        self.fn = fn
+        self.args = args
+        self.signals = _JobSignals()
+        self.signals.done.connect(owner._onDone)
+
+    def run(self):
+        # Skip work that was superseded while waiting in the queue
+        if self.generation != self.owner.generation:
+            return
+        try:
+            result = self.fn(*self.args)
+        except Exception as exc:  # delivered to the GUI thread instead
+            result = exc
+        self.signals.done.emit(self.generation, self.key, result)
+
+
+class BackgroundJobs(QObject):
+    """Run callables on a private thread pool and stream results back.
+
+    Every :meth:`cancel` starts a new generation: queued jobs of the old
+    one are dropped from the pool, and results from jobs that were
+    already running are discarded instead of being emitted.
+    ``resultReady(key, result)`` fires on the GUI thread; ``result`` is
+    the exception instance if the callable raised.
+    """
+
+    resultReady = pyqtSignal(object, object)
+
+    def __init__(self, parent=None, maxThreads: int = 4):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(
+            max(1, min(maxThreads, QThreadPool.globalInstance().maxThreadCount())))
+        self.generation = 0
+        self.pending = 0
+
+    def submit(self, key, fn, *args):
+        """Queue ``fn(*args)``; its result is emitted with ``key``."""
+        self.pending += 1
+        self.pool.start(_Job(self, self.generation, key, fn, args))
+
+    def cancel(self):
+        """Drop queued jobs and ignore results of running ones."""
+        self.generation += 1
+        self.pending = 0
+        self.pool.clear()
+
+    def _onDone(self, generation, key, result):
+        if generation != self.generation:
+            return
+        self.pending -= 1
+        self.resultReady.emit(key, result)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Exercise the timedemo benchmark runner against its stand-in port."""
+
+import csv
+import os
+import sys
+import tempfile
+
+from src.benchmark import (RUN_FIELDS, SUMMARY_FIELDS, parse_timedemo,
+                           run_benchmark, write_csv)
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_parse_timedemo():
+    """Both the ZDoom and the PrBoom+ result lines are recognised."""
+    zdoom = parse_timedemo('timed 2134 gametics in 1000 realtics (74.7 fps)')
+    assert zdoom == {'gametics': 2134, 'realtics': 1000, 'fps': 74.7}
+    prboom = parse_timedemo(
+        'Timed 2134 gametics in 1000 realtics = 74.7 frames per second')
+    assert prboom == {'gametics': 2134, 'realtics': 1000, 'fps': 74.7}
+    bare = parse_timedemo('timed 350 gametics in 175 realtics')
+    assert bare['fps'] == 70.0
+    assert parse_timedemo('W_Init: Init WADfiles.') is None
+
+
+def test_fake_port_benchmark():
+    """Run a small matrix with the fake port and check the summary and CSVs."""
+    spec = {
+        'demo': 'demo1',
+        'runs': 3,
+        'jobs': 2,
+        'ports': [[sys.executable, '-m', 'src.benchmark', '--fake-port']],
+        'sets': [{'name': 'fake', 'env': {'PYTHONPATH': ROOT}}],
+        'options': ['', '+vid_rendermode 1'],
+    }
+    results = run_benchmark(spec)
+
+    runs = results['runs']
+    assert len(runs) == 6
+    for record in runs:
+        assert record['error'] is None, record['error']
+        assert record['exit_code'] == 0
+        assert record['fps'] > 0
+
+    summary = results['summary']
+    assert [row['options'] for row in summary] == ['', '+vid_rendermode 1']
+    for row in summary:
+        assert set(row) == set(SUMMARY_FIELDS)
+        assert row['runs'] == 3 and row['failed'] == 0
+        assert row['fps_min'] <= row['fps_mean'] <= row['fps_max']
+        assert abs(row['fps_variance'] - row['fps_stdev'] ** 2) < 1e-9
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, rows, fields in (('summary.csv', summary, SUMMARY_FIELDS),
+                                   ('runs.csv', runs, RUN_FIELDS)):
+            path = os.path.join(tmp, name)
+            write_csv(path, rows, fields)
+            with open(path, newline='') as fh:
+                reader = csv.DictReader(fh)
+                assert reader.fieldnames == list(fields)
+                assert len(list(reader)) == len(rows)
+
+
+if __name__ == '__main__':
+    test_parse_timedemo()
+    test_fake_port_benchmark()
+    print('Benchmark runner OK')